@@ -4,5 +4,14 @@ AI处理包
 """
 
 from .content_processor import ContentProcessor, BestPracticesExtractor, PracticesIntegrator
+from .result_cache import ResultCache
+from .html_reducer import HTMLReducer
+from .chunker import MarkdownChunker
+from .map_reduce import MapReduceExecutor
+from .dedup import SectionDeduplicator
+from .model_router import ModelRouter
+from .practice_records import PracticeRecord, PracticeExtraction, PracticeRecordMerger
 
-__all__ = ['ContentProcessor', 'BestPracticesExtractor', 'PracticesIntegrator']
\ No newline at end of file
+__all__ = ['ContentProcessor', 'BestPracticesExtractor', 'PracticesIntegrator', 'ResultCache', 'HTMLReducer',
+           'MarkdownChunker', 'MapReduceExecutor', 'PracticeRecord', 'PracticeExtraction', 'PracticeRecordMerger',
+           'SectionDeduplicator', 'ModelRouter']
\ No newline at end of file
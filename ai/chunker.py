@@ -0,0 +1,144 @@
+"""
+Markdown分块模块
+按章节标题将长文档拆分为符合token预算的分块
+"""
+
+import re
+from typing import List
+from utils import TokenHelper
+
+
+class MarkdownChunker:
+    """按标题切分Markdown的分块器"""
+
+    HEADING_PATTERN = re.compile(r'^#{1,6}\s')
+    FENCE_PATTERN = re.compile(r'^\s*(```|~~~)')
+
+    def split_sections(self, markdown: str) -> List[str]:
+        """
+        按标题把文档拆成章节，代码块内的#不视为标题
+
+        Args:
+            markdown: Markdown内容
+
+        Returns:
+            List[str]: 章节列表，每个章节以标题行开头（首个章节可能没有标题）
+        """
+        sections: List[str] = []
+        current: List[str] = []
+        in_fence = False
+
+        for line in markdown.split('\n'):
+            if self.FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+            if not in_fence and self.HEADING_PATTERN.match(line) and current:
+                sections.append('\n'.join(current).strip())
+                current = []
+            current.append(line)
+
+        if current:
+            sections.append('\n'.join(current).strip())
+
+        return [section for section in sections if section]
+
+    def split(self, markdown: str, max_tokens: int) -> List[str]:
+        """
+        将文档拆分为不超过token预算的分块，尽量保持章节完整
+
+        Args:
+            markdown: Markdown内容
+            max_tokens: 每个分块的最大估算token数
+
+        Returns:
+            List[str]: 分块列表
+        """
+        pieces: List[str] = []
+        for section in self.split_sections(markdown):
+            if TokenHelper.estimate_tokens(section) <= max_tokens:
+                pieces.append(section)
+            else:
+                pieces.extend(self._split_oversized(section, max_tokens))
+
+        return ['\n\n'.join(group) for group in self.pack(pieces, max_tokens)]
+
+    def pack(self, texts: List[str], max_tokens: int) -> List[List[str]]:
+        """
+        按顺序把文本贪心地装入不超过token预算的分组
+
+        Args:
+            texts: 文本列表
+            max_tokens: 每组的最大估算token数
+
+        Returns:
+            List[List[str]]: 分组列表，单个超出预算的文本独占一组
+        """
+        groups: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for text in texts:
+            tokens = TokenHelper.estimate_tokens(text)
+            if current and current_tokens + tokens > max_tokens:
+                groups.append(current)
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+
+        if current:
+            groups.append(current)
+
+        return groups
+
+    def _split_oversized(self, section: str, max_tokens: int) -> List[str]:
+        """
+        拆分超出预算的章节：先按段落，仍超出时按字符截断
+
+        Args:
+            section: 章节内容
+            max_tokens: 最大估算token数
+
+        Returns:
+            List[str]: 拆分后的片段
+        """
+        pieces: List[str] = []
+        for paragraph in self._split_paragraphs(section):
+            while TokenHelper.estimate_tokens(paragraph) > max_tokens:
+                head = TokenHelper.truncate_to_tokens(paragraph, max_tokens)
+                pieces.append(head)
+                paragraph = paragraph[len(head):]
+            if paragraph.strip():
+                pieces.append(paragraph)
+
+        return [
+            '\n\n'.join(group) for group in self.pack(pieces, max_tokens)
+        ]
+
+    def _split_paragraphs(self, section: str) -> List[str]:
+        """
+        按空行拆分段落，代码块保持完整
+
+        Args:
+            section: 章节内容
+
+        Returns:
+            List[str]: 段落列表
+        """
+        paragraphs: List[str] = []
+        current: List[str] = []
+        in_fence = False
+
+        for line in section.split('\n'):
+            if self.FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+            if not in_fence and not line.strip():
+                if current:
+                    paragraphs.append('\n'.join(current))
+                    current = []
+                continue
+            current.append(line)
+
+        if current:
+            paragraphs.append('\n'.join(current))
+
+        return paragraphs
@@ -3,31 +3,142 @@ AI内容处理器模块
 提供最佳实践提取和整合功能
 """
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import re
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 from pathlib import Path
-from gemini_api import GeminiAPI
-from .prompts import PromptBuilder
+from backends import GenerationBackend, create_backend
+from utils import TimingSpans, FileHelper
+from .prompts import PromptBuilder, PROMPT_TEMPLATE_VERSION
+from .result_cache import ResultCache
+from .html_reducer import HTMLReducer
+from .chunker import MarkdownChunker
+from .map_reduce import MapReduceExecutor
+from .practice_records import PracticeExtraction, PracticeRecordMerger
+from .dedup import SectionDeduplicator
+from .model_router import ModelRouter
 
 
 class BestPracticesExtractor:
     """最佳实践提取器"""
 
-    def __init__(self, gemini_api: GeminiAPI):
+    # 提取结果必须包含的二级标题，缺失时视为输出不合格，级联路由会升级模型
+    REQUIRED_SECTIONS = ('概述', '最佳实践')
+
+    def __init__(
+        self,
+        gemini_api: GenerationBackend,
+        result_cache: Optional[ResultCache] = None,
+        chunk_token_budget: int = 12000,
+        fallback_on_error: bool = False,
+        model_router: Optional[ModelRouter] = None
+    ):
         """
         初始化提取器
 
         Args:
-            gemini_api: Gemini API实例
+            gemini_api: 生成后端实例
+            result_cache: AI结果缓存，为None时不缓存
+            chunk_token_budget: 单次提取的内容token预算，超出时按章节分块并行提取
+            fallback_on_error: 失败时是否返回错误说明文档，为False时抛出异常，避免错误内容被当作结果保存
+            model_router: 模型路由，为None时所有调用使用gemini_api的模型
         """
         self.gemini_api = gemini_api
+        self.model_router = model_router or (ModelRouter(gemini_api) if gemini_api else None)
+        self.result_cache = result_cache
+        self.fallback_on_error = fallback_on_error
         self.prompt_builder = PromptBuilder()
+        self.html_reducer = HTMLReducer()
+        self.chunker = MarkdownChunker()
+        self.chunk_token_budget = chunk_token_budget
+
+        # 提取指令与页面无关，注册为共用前缀后所有提取请求引用同一个上下文缓存
+        if self.gemini_api:
+            for instruction in self.prompt_builder.get_shared_instructions():
+                self.gemini_api.register_shared_prefix(instruction)
+
+        self.map_reduce = MapReduceExecutor(
+            generate=self._generate,
+            agenerate=self._agenerate,
+            token_budget=chunk_token_budget,
+            chunker=self.chunker
+        )
+
+    def _build_prompts(
+        self,
+        html_content: str,
+        module_name: str,
+        title: str,
+        url: str,
+        timings: TimingSpans,
+        structured: bool = False
+    ) -> List[str]:
+        """
+        精简HTML后构建提取提示词，内容超出预算时按章节拆分为多个分块提示词
+
+        Args:
+            html_content: HTML页面内容
+            module_name: 模块名称
+            title: 页面标题
+            url: 源URL
+            timings: 分阶段耗时记录
+            structured: 是否构建结构化（JSON）提取提示词
+
+        Returns:
+            List[str]: 提取提示词列表，只有一个元素时无需合并
+        """
+        with timings.span('html_cleanup'):
+            report = self.html_reducer.reduce_with_report(html_content)
+        print(f"    📉 {module_name} 内容精简: 约{report['tokens_before']} → {report['tokens_after']} tokens "
+              f"(-{report['reduction_ratio'] * 100:.0f}%)")
+
+        with timings.span('prompt_build'):
+            if report['tokens_after'] <= self.chunk_token_budget:
+                chunks = [report['content']]
+            else:
+                chunks = self.chunker.split(report['content'], self.chunk_token_budget)
+                print(f"    🧩 {module_name} 超出单次预算，拆分为 {len(chunks)} 个分块提取")
+
+            build_prompt = (self.prompt_builder.build_structured_extraction_prompt if structured
+                            else self.prompt_builder.build_extraction_prompt)
+            return [
+                build_prompt(
+                    title=title,
+                    module_name=module_name,
+                    url=url,
+                    html_content=chunk,
+                    part_info=f"{index}/{len(chunks)}" if len(chunks) > 1 else ""
+                )
+                for index, chunk in enumerate(chunks, 1)
+            ]
+
+    def _build_merge_prompt_builder(self, module_name: str, url: str):
+        """
+        获取合并分块结果的提示词构建函数
+
+        Args:
+            module_name: 模块名称
+            url: 源URL
+
+        Returns:
+            Callable: 接收一组分块结果并返回合并提示词的函数
+        """
+        def build(partial_results: List[str]) -> str:
+            return self.prompt_builder.build_extraction_merge_prompt(
+                module_name=module_name,
+                url=url,
+                partial_results=partial_results
+            )
+        return build
 
     def extract_from_html(
         self,
         html_content: str,
         module_name: str,
         title: str,
-        url: str
+        url: str,
+        timings: Optional[TimingSpans] = None
     ) -> str:
         """
         从HTML内容中提取最佳实践
@@ -37,6 +148,7 @@ class BestPracticesExtractor:
             module_name: 模块名称
             title: 页面标题
             url: 源URL
+            timings: 分阶段耗时记录，为None时不记录
 
         Returns:
             str: 生成的最佳实践markdown内容
@@ -44,26 +156,370 @@ class BestPracticesExtractor:
         if not self.gemini_api:
             return self._get_no_api_fallback(module_name, url)
 
+        timings = timings if timings is not None else TimingSpans()
         try:
-            # 构建提示词
-            prompt = self.prompt_builder.build_extraction_prompt(
-                title=title,
+            # 精简HTML并构建提示词
+            prompts = self._build_prompts(html_content, module_name, title, url, timings)
+
+            # 调用Gemini API生成最佳实践（内容未变化时直接复用缓存结果）
+            with timings.span('llm_call'):
+                return self.map_reduce.run(
+                    prompts, self._build_merge_prompt_builder(module_name, url),
+                    map_task='extraction', merge_task='extraction_merge'
+                )
+
+        except Exception as e:
+            if not self.fallback_on_error:
+                raise
+            return self.prompt_builder.build_error_fallback(
                 module_name=module_name,
-                url=url,
-                html_content=html_content
+                error_message=str(e),
+                context="最佳实践提取"
             )
 
-            # 调用Gemini API生成最佳实践
-            best_practices = self.gemini_api.generate_text(prompt)
-            return best_practices
+    async def aextract_from_html(
+        self,
+        html_content: str,
+        module_name: str,
+        title: str,
+        url: str,
+        timings: Optional[TimingSpans] = None
+    ) -> str:
+        """
+        异步从HTML内容中提取最佳实践，等待模型期间不阻塞事件循环
+
+        Args:
+            html_content: HTML页面内容
+            module_name: 模块名称
+            title: 页面标题
+            url: 源URL
+            timings: 分阶段耗时记录，为None时不记录
+
+        Returns:
+            str: 生成的最佳实践markdown内容
+        """
+        if not self.gemini_api:
+            return self._get_no_api_fallback(module_name, url)
+
+        timings = timings if timings is not None else TimingSpans()
+        try:
+            prompts = self._build_prompts(html_content, module_name, title, url, timings)
+
+            # 分块并发提取后合并
+            with timings.span('llm_call'):
+                return await self.map_reduce.arun(
+                    prompts, self._build_merge_prompt_builder(module_name, url),
+                    map_task='extraction', merge_task='extraction_merge'
+                )
 
         except Exception as e:
+            if not self.fallback_on_error:
+                raise
             return self.prompt_builder.build_error_fallback(
                 module_name=module_name,
                 error_message=str(e),
                 context="最佳实践提取"
             )
 
+    def build_prompts(
+        self,
+        html_content: str,
+        module_name: str,
+        title: str,
+        url: str,
+        timings: Optional[TimingSpans] = None
+    ) -> List[str]:
+        """
+        构建Markdown提取的分块提示词，供批处理等延迟提交的场景使用
+
+        Args:
+            html_content: HTML页面内容
+            module_name: 模块名称
+            title: 页面标题
+            url: 源URL
+            timings: 分阶段耗时记录，为None时不记录
+
+        Returns:
+            List[str]: 提取提示词列表
+        """
+        timings = timings if timings is not None else TimingSpans()
+        return self._build_prompts(html_content, module_name, title, url, timings)
+
+    def get_batch_api(self) -> GenerationBackend:
+        """
+        获取批处理提取使用的后端：批处理无法先校验再升级，使用提取路由最后一级的模型
+
+        Returns:
+            GenerationBackend: 后端实例
+        """
+        return self.model_router.get_final_api('extraction')
+
+    def get_cached_result(self, prompt: str, task: str = 'extraction') -> Optional[str]:
+        """
+        读取提示词对应的缓存结果
+
+        Args:
+            prompt: 完整提示词
+            task: 任务类型
+
+        Returns:
+            str: 缓存结果，未启用缓存或未命中时返回None
+        """
+        if not self.result_cache:
+            return None
+        return self.result_cache.get(self._make_cache_key(prompt, task))
+
+    def cache_result(self, prompt: str, result: str, task: str = 'extraction') -> None:
+        """
+        写入提示词对应的生成结果
+
+        Args:
+            prompt: 完整提示词
+            result: 生成结果
+            task: 任务类型
+        """
+        if self.result_cache:
+            self.result_cache.put(self._make_cache_key(prompt, task), result)
+
+    def _make_cache_key(self, prompt: str, task: str) -> str:
+        """生成与_generate调用批处理所用模型时一致的缓存键"""
+        gemini_api = self.get_batch_api()
+        return self.result_cache.make_key(
+            task, PROMPT_TEMPLATE_VERSION, gemini_api.model_name, gemini_api.temperature, prompt
+        )
+
+    async def amerge_partials(self, module_name: str, url: str, partials: List[str]) -> str:
+        """
+        合并已得到的分块提取结果
+
+        Args:
+            module_name: 模块名称
+            url: 源URL
+            partials: 各分块的提取结果
+
+        Returns:
+            str: 合并后的最佳实践markdown内容
+        """
+        return await self.map_reduce.areduce(
+            partials, self._build_merge_prompt_builder(module_name, url), merge_task='extraction_merge'
+        )
+
+    def extract_records_from_html(
+        self,
+        html_content: str,
+        module_name: str,
+        title: str,
+        url: str,
+        timings: Optional[TimingSpans] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        以结构化模式从HTML内容中提取最佳实践，分块结果在本地合并去重，不再调用模型合并
+
+        Args:
+            html_content: HTML页面内容
+            module_name: 模块名称
+            title: 页面标题
+            url: 源URL
+            timings: 分阶段耗时记录，为None时不记录
+
+        Returns:
+            Tuple: (由记录渲染的markdown内容, 实践记录文档)，回退内容没有记录文档
+        """
+        if not self.gemini_api:
+            return self._get_no_api_fallback(module_name, url), None
+
+        timings = timings if timings is not None else TimingSpans()
+        try:
+            prompts = self._build_prompts(html_content, module_name, title, url, timings, structured=True)
+
+            with timings.span('llm_call'):
+                extractions = [self._generate_records(prompt) for prompt in prompts]
+
+            return self._finish_records(module_name, url, extractions)
+
+        except Exception as e:
+            if not self.fallback_on_error:
+                raise
+            return self.prompt_builder.build_error_fallback(
+                module_name=module_name,
+                error_message=str(e),
+                context="最佳实践提取"
+            ), None
+
+    async def aextract_records_from_html(
+        self,
+        html_content: str,
+        module_name: str,
+        title: str,
+        url: str,
+        timings: Optional[TimingSpans] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        extract_records_from_html的异步版本，各分块并发提取
+
+        Args:
+            html_content: HTML页面内容
+            module_name: 模块名称
+            title: 页面标题
+            url: 源URL
+            timings: 分阶段耗时记录，为None时不记录
+
+        Returns:
+            Tuple: (由记录渲染的markdown内容, 实践记录文档)，回退内容没有记录文档
+        """
+        if not self.gemini_api:
+            return self._get_no_api_fallback(module_name, url), None
+
+        timings = timings if timings is not None else TimingSpans()
+        try:
+            prompts = self._build_prompts(html_content, module_name, title, url, timings, structured=True)
+
+            with timings.span('llm_call'):
+                extractions = list(await asyncio.gather(
+                    *(self._agenerate_records(prompt) for prompt in prompts)
+                ))
+
+            return self._finish_records(module_name, url, extractions)
+
+        except Exception as e:
+            if not self.fallback_on_error:
+                raise
+            return self.prompt_builder.build_error_fallback(
+                module_name=module_name,
+                error_message=str(e),
+                context="最佳实践提取"
+            ), None
+
+    def _finish_records(
+        self,
+        module_name: str,
+        url: str,
+        extractions: List[PracticeExtraction]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        合并各分块的记录并渲染markdown
+
+        Args:
+            module_name: 模块名称
+            url: 源URL
+            extractions: 各分块的提取结果
+
+        Returns:
+            Tuple: (markdown内容, 实践记录文档)
+        """
+        extraction = PracticeRecordMerger.combine(extractions)
+        if len(extractions) > 1:
+            total = sum(len(item.practices) for item in extractions)
+            print(f"    🧮 {module_name} 分块记录本地合并: {total} → {len(extraction.practices)} 条")
+
+        markdown_content = PracticeRecordMerger.render_markdown(module_name, url, extraction)
+        return markdown_content, PracticeRecordMerger.to_document(module_name, url, extraction)
+
+    def _generate_records(self, prompt: str) -> PracticeExtraction:
+        """
+        以JSON模式调用模型并解析为提取结果，启用缓存时优先读取缓存
+
+        Args:
+            prompt: 完整提示词
+
+        Returns:
+            PracticeExtraction: 提取结果
+        """
+        def call(gemini_api: GenerationBackend) -> str:
+            if self.result_cache:
+                return self.result_cache.get_or_generate(
+                    'structured_extraction', PROMPT_TEMPLATE_VERSION, gemini_api, prompt,
+                    response_schema=PracticeExtraction, validator=PracticeRecordMerger.parse,
+                    remember_rejection=not self.model_router.is_final_model('extraction', gemini_api)
+                )
+            return gemini_api.generate_text(prompt, response_schema=PracticeExtraction)
+
+        text = self.model_router.generate('extraction', call, PracticeRecordMerger.parse)
+        return PracticeRecordMerger.parse(text)
+
+    async def _agenerate_records(self, prompt: str) -> PracticeExtraction:
+        """
+        _generate_records的异步版本
+
+        Args:
+            prompt: 完整提示词
+
+        Returns:
+            PracticeExtraction: 提取结果
+        """
+        async def call(gemini_api: GenerationBackend) -> str:
+            if self.result_cache:
+                return await self.result_cache.aget_or_generate(
+                    'structured_extraction', PROMPT_TEMPLATE_VERSION, gemini_api, prompt,
+                    response_schema=PracticeExtraction, validator=PracticeRecordMerger.parse,
+                    remember_rejection=not self.model_router.is_final_model('extraction', gemini_api)
+                )
+            return await gemini_api.agenerate_text(prompt, response_schema=PracticeExtraction)
+
+        text = await self.model_router.agenerate('extraction', call, PracticeRecordMerger.parse)
+        return PracticeRecordMerger.parse(text)
+
+    @classmethod
+    def validate_markdown(cls, content: str) -> None:
+        """
+        校验Markdown提取结果包含必需的章节
+
+        Args:
+            content: 提取结果
+
+        Raises:
+            ValueError: 缺少必需章节时抛出
+        """
+        missing = [name for name in cls.REQUIRED_SECTIONS
+                   if not re.search(rf'^##\s.*{name}', content, re.MULTILINE)]
+        if missing:
+            raise ValueError(f"缺少章节: {', '.join(missing)}")
+
+    def _generate(self, prompt: str, task: str = 'extraction') -> str:
+        """
+        按提取路由调用模型生成文本，启用缓存时优先读取缓存
+
+        Args:
+            prompt: 完整提示词
+            task: 任务类型，用于区分缓存
+
+        Returns:
+            str: 生成结果
+        """
+        def call(gemini_api: GenerationBackend) -> str:
+            if self.result_cache:
+                # 只缓存通过校验的结果；低成本模型的结果未通过校验时记录下来，之后直接升级并命中后一级模型的缓存
+                return self.result_cache.get_or_generate(
+                    task, PROMPT_TEMPLATE_VERSION, gemini_api, prompt,
+                    validator=self.model_router.get_validator('extraction', gemini_api, self.validate_markdown),
+                    remember_rejection=True
+                )
+            return gemini_api.generate_text(prompt)
+
+        return self.model_router.generate('extraction', call, self.validate_markdown)
+
+    async def _agenerate(self, prompt: str, task: str = 'extraction') -> str:
+        """
+        _generate的异步版本
+
+        Args:
+            prompt: 完整提示词
+            task: 任务类型，用于区分缓存
+
+        Returns:
+            str: 生成结果
+        """
+        async def call(gemini_api: GenerationBackend) -> str:
+            if self.result_cache:
+                return await self.result_cache.aget_or_generate(
+                    task, PROMPT_TEMPLATE_VERSION, gemini_api, prompt,
+                    validator=self.model_router.get_validator('extraction', gemini_api, self.validate_markdown),
+                    remember_rejection=True
+                )
+            return await gemini_api.agenerate_text(prompt)
+
+        return await self.model_router.agenerate('extraction', call, self.validate_markdown)
+
     def _get_no_api_fallback(self, module_name: str, url: str) -> str:
         """
         API不可用时的回退内容
@@ -91,29 +547,108 @@ class BestPracticesExtractor:
 class PracticesIntegrator:
     """实践整合器"""
 
-    def __init__(self, gemini_api: GeminiAPI):
+    # 整合结果必须包含的章节，缺失时视为输出不合格，级联路由会升级模型
+    REQUIRED_SECTIONS = ('核心原则', '推荐做法', '禁止做法')
+
+    def __init__(
+        self,
+        gemini_api: GenerationBackend,
+        result_cache: Optional[ResultCache] = None,
+        integration_token_budget: int = 24000,
+        fallback_on_error: bool = False,
+        deduplicator: Optional[SectionDeduplicator] = None,
+        model_router: Optional[ModelRouter] = None
+    ):
         """
         初始化整合器
 
         Args:
-            gemini_api: Gemini API实例
+            gemini_api: 生成后端实例
+            result_cache: AI结果缓存，为None时不缓存
+            integration_token_budget: 单次整合的内容token预算，超出时分批整合后再合并
+            fallback_on_error: 失败时是否返回错误说明文档，为False时抛出异常
+            deduplicator: 章节去重聚类器，为None时使用默认参数新建
+            model_router: 模型路由，为None时所有调用使用gemini_api的模型
         """
         self.gemini_api = gemini_api
+        self.model_router = model_router or (ModelRouter(gemini_api) if gemini_api else None)
+        self.result_cache = result_cache
+        self.fallback_on_error = fallback_on_error
+        self.deduplicator = deduplicator or SectionDeduplicator()
         self.prompt_builder = PromptBuilder()
+        self.chunker = MarkdownChunker()
+        self.integration_token_budget = integration_token_budget
+        self.map_reduce = MapReduceExecutor(
+            generate=self._generate,
+            agenerate=self._agenerate,
+            token_budget=integration_token_budget,
+            chunker=self.chunker
+        )
+
+    def _build_prompts(
+        self,
+        module_name: str,
+        practices: List[Dict[str, str]],
+        max_content_per_practice: Optional[int]
+    ) -> List[str]:
+        """
+        构建整合提示词，实践总量超出预算时按预算分批
+
+        Args:
+            module_name: 一级模块名称
+            practices: 最佳实践列表
+            max_content_per_practice: 每个实践的最大内容长度，为None时不截断
+
+        Returns:
+            List[str]: 整合提示词列表，只有一个元素时无需合并
+        """
+        sections = self._build_practice_sections(practices, max_content_per_practice)
+        groups = self.chunker.pack(sections, self.integration_token_budget)
+        if len(groups) > 1:
+            print(f"    🧩 {module_name} 共 {len(practices)} 个实践超出单次预算，分 {len(groups)} 批整合")
+
+        return [
+            self.prompt_builder.build_integration_prompt(
+                module_name=module_name,
+                practices_content="\n".join(group)
+            )
+            for group in groups
+        ]
+
+    def _build_merge_prompt_builder(self, module_name: str):
+        """
+        获取合并分批整合结果的提示词构建函数
+
+        Args:
+            module_name: 一级模块名称
+
+        Returns:
+            Callable: 接收一组分批结果并返回合并提示词的函数
+        """
+        def build(partial_results: List[str]) -> str:
+            practices_content = "\n".join(
+                f"### 分批整合结果 {index}\n{partial}\n"
+                for index, partial in enumerate(partial_results, 1)
+            )
+            return self.prompt_builder.build_integration_prompt(
+                module_name=module_name,
+                practices_content=practices_content
+            )
+        return build
 
     def integrate_practices(
         self,
         module_name: str,
         practices: List[Dict[str, str]],
-        max_content_per_practice: int = 2000
+        max_content_per_practice: Optional[int] = None
     ) -> str:
         """
         整合多个最佳实践为Cursor Rules格式
 
         Args:
             module_name: 一级模块名称
-            practices: 最佳实践列表，每个元素包含filename和content
-            max_content_per_practice: 每个实践的最大内容长度
+            practices: 最佳实践列表，每个元素包含filename和content，结构化模式下还可包含records
+            max_content_per_practice: 每个实践的最大内容长度，为None时不截断
 
         Returns:
             str: 整合后的Cursor Rules内容
@@ -122,49 +657,286 @@ class PracticesIntegrator:
             return self._get_no_integration_fallback(module_name)
 
         try:
-            # 构建所有实践内容的摘要
-            practices_summary = self._build_practices_summary(
-                practices, max_content_per_practice
+            # 构建整合提示词（超出预算时分批）
+            prompts = self._build_prompts(module_name, practices, max_content_per_practice)
+
+            # 调用Gemini API生成整合的Cursor Rules（输入未变化时直接复用缓存结果）
+            return self.map_reduce.run(
+                prompts, self._build_merge_prompt_builder(module_name),
+                map_task='integration', merge_task='integration_merge'
             )
 
-            # 构建整合提示词
-            prompt = self.prompt_builder.build_integration_prompt(
+        except Exception as e:
+            if not self.fallback_on_error:
+                raise
+            return self.prompt_builder.build_integration_error(
                 module_name=module_name,
-                practices_content=practices_summary
+                error_message=str(e)
             )
 
-            # 调用Gemini API生成整合的Cursor Rules
-            integrated_content = self.gemini_api.generate_text(prompt)
-            return integrated_content
+    async def aintegrate_practices(
+        self,
+        module_name: str,
+        practices: List[Dict[str, str]],
+        max_content_per_practice: Optional[int] = None
+    ) -> str:
+        """
+        异步整合多个最佳实践为Cursor Rules格式
+
+        Args:
+            module_name: 一级模块名称
+            practices: 最佳实践列表，每个元素包含filename和content，结构化模式下还可包含records
+            max_content_per_practice: 每个实践的最大内容长度，为None时不截断
+
+        Returns:
+            str: 整合后的Cursor Rules内容
+        """
+        if not self.gemini_api or not practices:
+            return self._get_no_integration_fallback(module_name)
+
+        try:
+            # 章节聚类等本地计算放到线程中，不阻塞其他模块的并发整合
+            prompts = await asyncio.to_thread(
+                self._build_prompts, module_name, practices, max_content_per_practice
+            )
+
+            # 分批并发整合后合并
+            return await self.map_reduce.arun(
+                prompts, self._build_merge_prompt_builder(module_name),
+                map_task='integration', merge_task='integration_merge'
+            )
 
         except Exception as e:
+            if not self.fallback_on_error:
+                raise
             return self.prompt_builder.build_integration_error(
                 module_name=module_name,
                 error_message=str(e)
             )
 
+    async def aintegrate_practices_to_file(
+        self,
+        module_name: str,
+        practices: List[Dict[str, str]],
+        output_file: Path,
+        max_content_per_practice: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        异步整合多个最佳实践，最终结果流式写入输出文件，生成中途失败时不会留下半写的文件
+
+        Args:
+            module_name: 一级模块名称
+            practices: 最佳实践列表，每个元素包含filename和content，结构化模式下还可包含records
+            output_file: 输出文件路径
+            max_content_per_practice: 每个实践的最大内容长度，为None时不截断
+
+        Returns:
+            Dict: 包含chars（写入字符数）、ttft（首token耗时秒数，未调用模型时为None）、from_cache
+        """
+        if not self.gemini_api or not practices:
+            return self._write_output(output_file, self._get_no_integration_fallback(module_name))
+
+        async def stream_final(prompt: str, task: str) -> Dict[str, Any]:
+            return await self._astream_to_file(prompt, task, output_file)
+
+        try:
+            prompts = await asyncio.to_thread(
+                self._build_prompts, module_name, practices, max_content_per_practice
+            )
+
+            # 分批整合的中间结果仍在内存中合并，只有最终结果流式写入
+            return await self.map_reduce.arun(
+                prompts, self._build_merge_prompt_builder(module_name),
+                map_task='integration', merge_task='integration_merge', afinal=stream_final
+            )
+
+        except Exception as e:
+            if not self.fallback_on_error:
+                raise
+            return self._write_output(output_file, self.prompt_builder.build_integration_error(
+                module_name=module_name,
+                error_message=str(e)
+            ))
+
+    async def _astream_to_file(self, prompt: str, task: str, output_file: Path) -> Dict[str, Any]:
+        """
+        流式生成并写入文件，启用缓存时优先读取缓存，生成完成后把文件复制到缓存
+
+        Args:
+            prompt: 完整提示词
+            task: 任务类型，用于区分缓存
+            output_file: 输出文件路径
+
+        Returns:
+            Dict: 包含chars、ttft、from_cache
+        """
+        # 流式结果边生成边写入，无法先校验再升级，直接使用路由中最后一级模型
+        gemini_api = self.model_router.get_final_api('integration')
+        key = None
+        if self.result_cache:
+            key = self.result_cache.make_key(
+                task, PROMPT_TEMPLATE_VERSION, gemini_api.model_name, gemini_api.temperature, prompt
+            )
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                return {**self._write_output(output_file, cached), 'from_cache': True}
+
+        result = await gemini_api.astream_text_to_file(prompt, output_file)
+        self.model_router.record_served('integration', gemini_api.model_name)
+        if key:
+            self.result_cache.put_file(key, output_file)
+        return {'chars': result['chars'], 'ttft': result['ttft'], 'from_cache': False}
+
+    @staticmethod
+    def _write_output(output_file: Path, content: str) -> Dict[str, Any]:
+        """
+        原子写入非流式生成的内容
+
+        Args:
+            output_file: 输出文件路径
+            content: 文件内容
+
+        Returns:
+            Dict: 与流式写入结果相同格式的字典
+        """
+        FileHelper.atomic_write_text(output_file, content)
+        return {'chars': len(content), 'ttft': None, 'from_cache': False}
+
+    @classmethod
+    def validate_rules(cls, content: str) -> None:
+        """
+        校验整合结果包含Cursor Rules的必需章节
+
+        Args:
+            content: 整合结果
+
+        Raises:
+            ValueError: 缺少必需章节时抛出
+        """
+        missing = [name for name in cls.REQUIRED_SECTIONS
+                   if not re.search(rf'^##\s.*{name}', content, re.MULTILINE)]
+        if missing:
+            raise ValueError(f"缺少章节: {', '.join(missing)}")
+
+    def _generate(self, prompt: str, task: str = 'integration') -> str:
+        """
+        按整合路由调用模型生成文本，启用缓存时优先读取缓存
+
+        Args:
+            prompt: 完整提示词
+            task: 任务类型，用于区分缓存
+
+        Returns:
+            str: 生成结果
+        """
+        def call(gemini_api: GenerationBackend) -> str:
+            if self.result_cache:
+                return self.result_cache.get_or_generate(
+                    task, PROMPT_TEMPLATE_VERSION, gemini_api, prompt,
+                    validator=self.model_router.get_validator('integration', gemini_api, self.validate_rules),
+                    remember_rejection=True
+                )
+            return gemini_api.generate_text(prompt)
+
+        return self.model_router.generate('integration', call, self.validate_rules)
+
+    async def _agenerate(self, prompt: str, task: str = 'integration') -> str:
+        """
+        _generate的异步版本
+
+        Args:
+            prompt: 完整提示词
+            task: 任务类型，用于区分缓存
+
+        Returns:
+            str: 生成结果
+        """
+        async def call(gemini_api: GenerationBackend) -> str:
+            if self.result_cache:
+                return await self.result_cache.aget_or_generate(
+                    task, PROMPT_TEMPLATE_VERSION, gemini_api, prompt,
+                    validator=self.model_router.get_validator('integration', gemini_api, self.validate_rules),
+                    remember_rejection=True
+                )
+            return await gemini_api.agenerate_text(prompt)
+
+        return await self.model_router.agenerate('integration', call, self.validate_rules)
+
+    def _build_practice_sections(
+        self,
+        practices: List[Dict[str, str]],
+        max_content_length: Optional[int]
+    ) -> List[str]:
+        """
+        把实践拆分为带文件名标题的章节片段，近似重复的章节聚类后只保留代表章节及重复次数；
+        带结构化记录的实践先在本地合并去重，每条记录一个片段
+
+        Args:
+            practices: 实践列表，元素可包含records（PracticeRecord列表）
+            max_content_length: 每个实践的最大内容长度，为None时不截断
+
+        Returns:
+            List[str]: 实践片段列表
+        """
+        sections = []
+        records = [record for practice in practices for record in practice.get('records') or []]
+        if records:
+            merged_records = PracticeRecordMerger.merge(records)
+            print(f"    🧮 结构化记录本地合并: {len(records)} → {len(merged_records)} 条")
+            sections.extend(PracticeRecordMerger.render_for_integration(merged_records))
+
+        items = []
+        for practice in practices:
+            if practice.get('records'):
+                continue
+            content = practice['content']
+            if max_content_length:
+                content = content[:max_content_length]
+
+            for section in self.chunker.split_sections(content):
+                if not self._has_body(section):
+                    continue
+                for chunk in self.chunker.split(section, self.integration_token_budget):
+                    items.append((practice['filename'], chunk))
+
+        clusters = self.deduplicator.cluster(items)
+        if len(clusters) < len(items):
+            print(f"    🧬 近似重复章节聚类: {len(items)} → {len(clusters)} 个")
+
+        for cluster in clusters:
+            others = [source for source in cluster['sources'] if source != cluster['source']]
+            suffix = ""
+            if cluster['count'] > 1:
+                suffix = f" (相似内容共{cluster['count']}处"
+                suffix += f"，另见: {', '.join(others)})" if others else ")"
+            sections.append(f"### {cluster['source']}{suffix}\n{cluster['text']}\n")
+
+        return sections
+
+    @staticmethod
+    def _has_body(section: str) -> bool:
+        """判断章节除标题行外是否还有内容"""
+        lines = section.split('\n')
+        if MarkdownChunker.HEADING_PATTERN.match(lines[0]):
+            lines = lines[1:]
+        return any(line.strip() for line in lines)
+
     def _build_practices_summary(
         self,
         practices: List[Dict[str, str]],
-        max_content_length: int
+        max_content_length: Optional[int]
     ) -> str:
         """
         构建实践内容摘要
 
         Args:
             practices: 实践列表
-            max_content_length: 每个实践的最大内容长度
+            max_content_length: 每个实践的最大内容长度，为None时不截断
 
         Returns:
             str: 实践摘要内容
         """
-        practices_summary = []
-        for practice in practices:
-            # 提取每个实践的关键信息，限制长度避免超出token限制
-            content_preview = practice['content'][:max_content_length]
-            practices_summary.append(f"### {practice['filename']}\n{content_preview}\n")
-
-        return "\n".join(practices_summary)
+        return "\n".join(self._build_practice_sections(practices, max_content_length))
 
     def _get_no_integration_fallback(self, module_name: str) -> str:
         """
@@ -195,28 +967,119 @@ class PracticesIntegrator:
 class ContentProcessor:
     """内容处理器主类"""
 
-    def __init__(self, gemini_api: Optional[GeminiAPI] = None):
+    EXTRACTION_MODES = ('markdown', 'structured')
+
+    def __init__(
+        self,
+        gemini_api: Optional[GenerationBackend] = None,
+        result_cache: Optional[ResultCache] = None,
+        result_cache_dir: Path = Path(".cache/llm_results"),
+        fallback_on_error: bool = False,
+        extraction_mode: str = "markdown",
+        model_routes: Optional[Dict[str, List[str]]] = None,
+        http_settings: Optional[Dict[str, Any]] = None
+    ):
         """
         初始化内容处理器
 
         Args:
-            gemini_api: Gemini API实例，如果为None则自动初始化
+            gemini_api: 生成后端实例，如果为None则按环境变量LLM_BACKEND创建
+            result_cache: AI结果缓存，如果为None则在result_cache_dir下创建
+            result_cache_dir: 默认AI结果缓存目录
+            fallback_on_error: AI调用失败时是否返回错误说明文档，默认抛出异常由调用方记为失败
+            extraction_mode: 提取模式，markdown为直接生成文档，structured为生成结构化记录后本地渲染
+            model_routes: 路由名称（extraction/integration/lint_rules）-> 按升级顺序排列的模型列表，
+                          为None时所有任务使用默认模型
+            http_settings: 自动创建后端时使用的HTTP连接配置（连接池、保活、超时、HTTP/2），为None时使用默认值
         """
+        if extraction_mode not in self.EXTRACTION_MODES:
+            raise ValueError(f"未知的提取模式: {extraction_mode}，可选: {', '.join(self.EXTRACTION_MODES)}")
+        self.extraction_mode = extraction_mode
+
         if gemini_api is None:
             try:
-                self.gemini_api = GeminiAPI()
+                self.gemini_api = create_backend(http_settings=http_settings)
                 self.api_available = True
             except Exception as e:
-                print(f"⚠️ Gemini API 初始化失败: {e}")
+                print(f"⚠️ 生成后端初始化失败: {e}")
                 self.gemini_api = None
                 self.api_available = False
         else:
             self.gemini_api = gemini_api
             self.api_available = gemini_api is not None
 
+        # 按内容哈希缓存生成结果，未变化的页面无需再次调用模型
+        self.result_cache = result_cache or ResultCache(result_cache_dir)
+
+        # 按任务类型选择模型，提取与整合共用同一个路由以便统一统计
+        self.model_router = ModelRouter(self.gemini_api, model_routes) if self.gemini_api else None
+
         # 初始化子处理器
-        self.extractor = BestPracticesExtractor(self.gemini_api)
-        self.integrator = PracticesIntegrator(self.gemini_api)
+        self.extractor = BestPracticesExtractor(
+            self.gemini_api, self.result_cache, fallback_on_error=fallback_on_error,
+            model_router=self.model_router
+        )
+        self.integrator = PracticesIntegrator(
+            self.gemini_api, self.result_cache, fallback_on_error=fallback_on_error,
+            model_router=self.model_router
+        )
+
+    def get_extraction_fingerprint(self) -> Dict[str, str]:
+        """
+        获取影响提取结果的提示词版本与模型，用于判断已有输出是否过期
+
+        Returns:
+            Dict: 包含prompt_version和model的字典
+        """
+        prompt_version = PROMPT_TEMPLATE_VERSION
+        if self.is_structured_mode():
+            prompt_version = f"{PROMPT_TEMPLATE_VERSION}-structured"
+        return {
+            'prompt_version': prompt_version,
+            'model': self.model_router.get_route_label('extraction') if self.model_router else ""
+        }
+
+    @contextmanager
+    def track_served_models(self) -> Iterator[List[str]]:
+        """
+        记录代码块内实际完成调用的模型
+
+        Yields:
+            List[str]: 按首次使用顺序排列的模型名称，API不可用时始终为空
+        """
+        if not self.model_router:
+            yield []
+            return
+        with self.model_router.track_served_models() as served_models:
+            yield served_models
+
+    def delete_context_caches(self) -> None:
+        """删除本次运行创建的上下文缓存"""
+        if self.model_router:
+            self.model_router.delete_context_caches()
+
+    def is_structured_mode(self) -> bool:
+        """
+        是否使用结构化提取模式
+
+        Returns:
+            bool: 结构化模式时返回True
+        """
+        return self.extraction_mode == 'structured'
+
+    @staticmethod
+    def is_fallback_content(content: str) -> bool:
+        """
+        判断内容是否为提取失败或API不可用时的回退内容
+
+        Args:
+            content: 最佳实践内容
+
+        Returns:
+            bool: 是回退内容时返回True
+        """
+        head = content[:500]
+        return "提取失败\n\n## 错误信息" in head or "Gemini API未初始化" in head
 
     def is_api_available(self) -> bool:
         """
@@ -232,7 +1095,8 @@ class ContentProcessor:
         html_content: str,
         module_name: str,
         title: str,
-        url: str
+        url: str,
+        timings: Optional[TimingSpans] = None
     ) -> str:
         """
         提取最佳实践
@@ -242,6 +1106,7 @@ class ContentProcessor:
             module_name: 模块名称
             title: 页面标题
             url: 源URL
+            timings: 分阶段耗时记录，为None时不记录
 
         Returns:
             str: 最佳实践内容
@@ -250,7 +1115,66 @@ class ContentProcessor:
             html_content=html_content,
             module_name=module_name,
             title=title,
-            url=url
+            url=url,
+            timings=timings
+        )
+
+    async def aextract_best_practices(
+        self,
+        html_content: str,
+        module_name: str,
+        title: str,
+        url: str,
+        timings: Optional[TimingSpans] = None
+    ) -> str:
+        """
+        异步提取最佳实践
+
+        Args:
+            html_content: HTML内容
+            module_name: 模块名称
+            title: 页面标题
+            url: 源URL
+            timings: 分阶段耗时记录，为None时不记录
+
+        Returns:
+            str: 最佳实践内容
+        """
+        return await self.extractor.aextract_from_html(
+            html_content=html_content,
+            module_name=module_name,
+            title=title,
+            url=url,
+            timings=timings
+        )
+
+    async def aextract_structured_practices(
+        self,
+        html_content: str,
+        module_name: str,
+        title: str,
+        url: str,
+        timings: Optional[TimingSpans] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        异步以结构化模式提取最佳实践
+
+        Args:
+            html_content: HTML内容
+            module_name: 模块名称
+            title: 页面标题
+            url: 源URL
+            timings: 分阶段耗时记录，为None时不记录
+
+        Returns:
+            Tuple: (最佳实践内容, 实践记录文档)，回退内容没有记录文档
+        """
+        return await self.extractor.aextract_records_from_html(
+            html_content=html_content,
+            module_name=module_name,
+            title=title,
+            url=url,
+            timings=timings
         )
 
     def integrate_practices(
@@ -273,6 +1197,49 @@ class ContentProcessor:
             practices=practices
         )
 
+    async def aintegrate_practices(
+        self,
+        module_name: str,
+        practices: List[Dict[str, str]]
+    ) -> str:
+        """
+        异步整合实践为Cursor Rules
+
+        Args:
+            module_name: 模块名称
+            practices: 实践列表
+
+        Returns:
+            str: 整合后的内容
+        """
+        return await self.integrator.aintegrate_practices(
+            module_name=module_name,
+            practices=practices
+        )
+
+    async def aintegrate_practices_to_file(
+        self,
+        module_name: str,
+        practices: List[Dict[str, str]],
+        output_file: Path
+    ) -> Dict[str, Any]:
+        """
+        异步整合实践为Cursor Rules并流式写入输出文件
+
+        Args:
+            module_name: 模块名称
+            practices: 实践列表
+            output_file: 输出文件路径
+
+        Returns:
+            Dict: 包含chars、ttft、from_cache的写入结果
+        """
+        return await self.integrator.aintegrate_practices_to_file(
+            module_name=module_name,
+            practices=practices,
+            output_file=output_file
+        )
+
     def batch_extract_from_files(
         self,
         file_contents: List[Dict[str, Any]]
@@ -313,6 +1280,17 @@ class ContentProcessor:
 
         return results
 
+    def get_usage_summary(self) -> Optional[Dict[str, Any]]:
+        """
+        获取本次运行的AI调用用量（请求数、token数、耗时）与各路由的模型使用情况
+
+        Returns:
+            Dict: 用量汇总，API不可用时返回None
+        """
+        if not self.gemini_api:
+            return None
+        return {**self.gemini_api.get_usage_summary(), 'routing': self.model_router.get_routing_stats()}
+
     def get_processing_stats(self) -> Dict[str, Any]:
         """
         获取处理统计信息
@@ -322,7 +1300,11 @@ class ContentProcessor:
         """
         return {
             'api_available': self.api_available,
+            'extraction_mode': self.extraction_mode,
             'extractor_ready': self.extractor is not None,
             'integrator_ready': self.integrator is not None,
-            'gemini_api_configured': self.gemini_api is not None
+            'gemini_api_configured': self.gemini_api is not None,
+            'circuit_breaker': self.gemini_api.circuit_breaker.get_stats() if self.gemini_api else None,
+            'usage': self.get_usage_summary(),
+            'result_cache': self.result_cache.get_cache_stats()
         }
\ No newline at end of file
@@ -0,0 +1,154 @@
+"""
+章节去重模块
+用MinHash与LSH分桶在本地聚类近似重复的章节，整合时只保留每组的代表章节
+"""
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+from typing import List, Dict, Any, Set, Tuple
+
+
+class SectionDeduplicator:
+    """基于MinHash的近似重复章节聚类器"""
+
+    # 通用哈希族 (a * x + b) mod p 使用的梅森素数
+    MERSENNE_PRIME = (1 << 61) - 1
+
+    def __init__(
+        self,
+        threshold: float = 0.6,
+        num_perm: int = 32,
+        bands: int = 8,
+        shingle_size: int = 5,
+        seed: int = 1
+    ):
+        """
+        初始化聚类器
+
+        Args:
+            threshold: 两个章节视为近似重复的最小Jaccard相似度
+            num_perm: MinHash签名长度
+            bands: LSH分段数，num_perm需能被其整除；段数越多召回越高、候选对越多
+            shingle_size: 字符shingle长度
+            seed: 哈希族随机种子，固定后签名可复现
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm({num_perm})必须能被bands({bands})整除")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, self.MERSENNE_PRIME), rng.randrange(0, self.MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    @staticmethod
+    def _hash(text: str) -> int:
+        """计算稳定的64位哈希（不受PYTHONHASHSEED影响）"""
+        return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def shingles(self, text: str) -> Set[int]:
+        """
+        把文本归一化后切分为字符shingle集合，忽略大小写、空白与标点
+
+        Args:
+            text: 章节内容
+
+        Returns:
+            Set[int]: shingle哈希集合
+        """
+        normalized = re.sub(r'[\s\W_]+', '', text.lower())
+        if len(normalized) <= self.shingle_size:
+            return {self._hash(normalized)} if normalized else set()
+        return {
+            self._hash(normalized[index:index + self.shingle_size])
+            for index in range(len(normalized) - self.shingle_size + 1)
+        }
+
+    def signature(self, shingles: Set[int]) -> Tuple[int, ...]:
+        """
+        计算MinHash签名
+
+        Args:
+            shingles: shingle哈希集合
+
+        Returns:
+            Tuple: 长度为num_perm的签名
+        """
+        prime = self.MERSENNE_PRIME
+        return tuple(
+            min((a * shingle + b) % prime for shingle in shingles)
+            for a, b in self._permutations
+        )
+
+    @staticmethod
+    def jaccard(first: Set[int], second: Set[int]) -> float:
+        """计算两个shingle集合的Jaccard相似度"""
+        if not first or not second:
+            return 0.0
+        return len(first & second) / len(first | second)
+
+    def cluster(self, items: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        聚类近似重复的章节：LSH分桶找出候选对，再用精确Jaccard相似度确认
+
+        Args:
+            items: (来源, 章节内容) 列表
+
+        Returns:
+            List[Dict]: 按首次出现顺序排列的聚类，每个聚类包含source、text（最长的章节作为代表）、
+                        count（章节数）和sources（去重后的来源列表）
+        """
+        shingle_sets = [self.shingles(text) for _, text in items]
+
+        # LSH分桶：任一分段签名相同的章节成为候选对
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        for index, shingle_set in enumerate(shingle_sets):
+            if not shingle_set:
+                continue
+            signature = self.signature(shingle_set)
+            for band in range(self.bands):
+                band_key = signature[band * self.rows:(band + 1) * self.rows]
+                buckets[(band, band_key)].append(index)
+
+        parents = list(range(len(items)))
+
+        def find(index: int) -> int:
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        checked: Set[Tuple[int, int]] = set()
+        for members in buckets.values():
+            for position, first in enumerate(members):
+                for second in members[position + 1:]:
+                    pair = (first, second)
+                    if pair in checked:
+                        continue
+                    checked.add(pair)
+                    if find(first) != find(second) and \
+                            self.jaccard(shingle_sets[first], shingle_sets[second]) >= self.threshold:
+                        parents[find(second)] = find(first)
+
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for index in range(len(items)):
+            groups[find(index)].append(index)
+
+        clusters = []
+        for members in sorted(groups.values(), key=lambda group: group[0]):
+            representative = max(members, key=lambda index: len(items[index][1]))
+            clusters.append({
+                'source': items[representative][0],
+                'text': items[representative][1],
+                'count': len(members),
+                'sources': list(dict.fromkeys(items[index][0] for index in members))
+            })
+        return clusters
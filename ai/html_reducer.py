@@ -0,0 +1,260 @@
+"""
+HTML精简模块
+去除华为文档页面中的导航、页脚等样板内容，保留标题、代码块和表格并转换为紧凑的Markdown
+"""
+
+import re
+from typing import Dict, Any, List
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from utils import TokenHelper
+
+
+class HTMLReducer:
+    """HTML到紧凑Markdown的转换器"""
+
+    # 整体移除的标签
+    REMOVED_TAGS = [
+        'script', 'style', 'noscript', 'iframe', 'svg', 'canvas',
+        'nav', 'header', 'footer', 'aside', 'form', 'button', 'input', 'select', 'textarea'
+    ]
+
+    # class或id命中这些关键字的元素视为样板内容
+    BOILERPLATE_PATTERN = re.compile(
+        r'^(?:.*[-_])?(nav|navbar|menu|breadcrumb|footer|header|sidebar|catalog|toc|'
+        r'feedback|share|cookie|banner|login|search|recommend|pagination)(?:[-_].*)?$',
+        re.IGNORECASE
+    )
+
+    # 正文容器候选选择器，按优先级排列
+    CONTENT_SELECTORS = [
+        '.markdown-body', '.doc-content', '.document-content', '#doc-content', 'article', 'main'
+    ]
+
+    BLOCK_TAGS = {
+        'p', 'div', 'section', 'article', 'main', 'blockquote', 'dl', 'dt', 'dd',
+        'figure', 'figcaption', 'li', 'body', 'html'
+    }
+    HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+    def reduce(self, html_content: str) -> str:
+        """
+        将HTML转换为紧凑的Markdown
+
+        Args:
+            html_content: HTML内容
+
+        Returns:
+            str: Markdown内容
+        """
+        soup = BeautifulSoup(html_content, 'html.parser')
+        root = self._find_content_root(soup)
+        self._strip_boilerplate(root)
+
+        markdown = self._to_markdown(root)
+        markdown = re.sub(r'[ \t]+\n', '\n', markdown)
+        markdown = re.sub(r'\n{3,}', '\n\n', markdown)
+        return markdown.strip()
+
+    def reduce_with_report(self, html_content: str) -> Dict[str, Any]:
+        """
+        转换HTML并返回转换前后的token估算
+
+        Args:
+            html_content: HTML内容
+
+        Returns:
+            Dict: 包含content、tokens_before、tokens_after、reduction_ratio字段
+        """
+        content = self.reduce(html_content)
+        if not content:
+            # 转换结果为空时退回原始内容，避免丢失信息
+            content = html_content
+
+        tokens_before = TokenHelper.estimate_tokens(html_content)
+        tokens_after = TokenHelper.estimate_tokens(content)
+
+        return {
+            'content': content,
+            'tokens_before': tokens_before,
+            'tokens_after': tokens_after,
+            'reduction_ratio': 1 - tokens_after / tokens_before if tokens_before else 0.0
+        }
+
+    def _find_content_root(self, soup: BeautifulSoup) -> Tag:
+        """
+        定位正文容器，找不到时使用整个文档
+
+        Args:
+            soup: 解析后的文档
+
+        Returns:
+            Tag: 正文根节点
+        """
+        for selector in self.CONTENT_SELECTORS:
+            element = soup.select_one(selector)
+            if element and len(element.get_text(strip=True)) > 200:
+                return element
+        return soup.body or soup
+
+    def _strip_boilerplate(self, root: Tag) -> None:
+        """
+        移除脚本、导航、页脚等样板元素
+
+        Args:
+            root: 正文根节点
+        """
+        for comment in root.find_all(string=lambda text: isinstance(text, Comment)):
+            comment.extract()
+
+        for element in root.find_all(self.REMOVED_TAGS):
+            element.decompose()
+
+        for element in root.find_all(True):
+            if element.decomposed or element.find_parent(['pre', 'table']):
+                continue
+            if self._is_boilerplate(element):
+                element.decompose()
+
+    def _is_boilerplate(self, element: Tag) -> bool:
+        """
+        判断元素是否为样板内容
+
+        Args:
+            element: 待判断元素
+
+        Returns:
+            bool: 是否为样板内容
+        """
+        if element.attrs is None:
+            return False
+
+        tokens: List[str] = list(element.get('class') or [])
+        if element.get('id'):
+            tokens.append(element['id'])
+        if element.get('role') in ('navigation', 'banner', 'contentinfo', 'search'):
+            return True
+
+        return any(self.BOILERPLATE_PATTERN.match(token) for token in tokens)
+
+    def _to_markdown(self, node, list_depth: int = 0) -> str:
+        """
+        递归将节点转换为Markdown
+
+        Args:
+            node: 当前节点
+            list_depth: 列表嵌套深度
+
+        Returns:
+            str: Markdown片段
+        """
+        if isinstance(node, NavigableString):
+            return re.sub(r'\s+', ' ', str(node))
+
+        name = node.name
+
+        if name in self.HEADING_TAGS:
+            return f"\n\n{'#' * int(name[1])} {self._inline_text(node)}\n\n"
+
+        if name == 'pre':
+            language = self._get_code_language(node)
+            code = node.get_text().strip('\n')
+            return f"\n\n```{language}\n{code}\n```\n\n"
+
+        if name == 'code':
+            return f"`{node.get_text().strip()}`"
+
+        if name == 'table':
+            return f"\n\n{self._table_to_markdown(node)}\n\n"
+
+        if name in ('ul', 'ol'):
+            return f"\n\n{self._list_to_markdown(node, list_depth)}\n\n"
+
+        if name == 'br':
+            return "\n"
+
+        if name == 'img':
+            alt = node.get('alt')
+            return f"[图片: {alt}]" if alt else ""
+
+        inner = self._children_to_markdown(node, list_depth)
+        if name in self.BLOCK_TAGS:
+            return f"\n\n{inner.strip()}\n\n"
+        return inner
+
+    def _children_to_markdown(self, node: Tag, list_depth: int) -> str:
+        """转换所有子节点并拼接"""
+        return "".join(self._to_markdown(child, list_depth) for child in node.children)
+
+    def _inline_text(self, node: Tag) -> str:
+        """获取节点的单行文本"""
+        return re.sub(r'\s+', ' ', node.get_text(' ', strip=True))
+
+    def _get_code_language(self, pre: Tag) -> str:
+        """
+        从class中推断代码块语言
+
+        Args:
+            pre: pre元素
+
+        Returns:
+            str: 语言标识，未知时为空字符串
+        """
+        candidates = list(pre.get('class') or [])
+        code = pre.find('code')
+        if code:
+            candidates.extend(code.get('class') or [])
+
+        for class_name in candidates:
+            match = re.match(r'(?:language|lang)-([\w+#-]+)', class_name)
+            if match:
+                return match.group(1).lower()
+        return ""
+
+    def _list_to_markdown(self, node: Tag, list_depth: int) -> str:
+        """
+        将列表转换为Markdown
+
+        Args:
+            node: ul或ol元素
+            list_depth: 当前嵌套深度
+
+        Returns:
+            str: Markdown列表
+        """
+        lines = []
+        for index, item in enumerate(node.find_all('li', recursive=False), 1):
+            marker = f"{index}." if node.name == 'ol' else "-"
+            text = self._children_to_markdown(item, list_depth + 1).strip()
+            text = re.sub(r'\n{2,}', '\n', text)
+            lines.append(f"{'  ' * list_depth}{marker} {text}")
+        return "\n".join(lines)
+
+    def _table_to_markdown(self, table: Tag) -> str:
+        """
+        将表格转换为Markdown表格
+
+        Args:
+            table: table元素
+
+        Returns:
+            str: Markdown表格
+        """
+        rows: List[List[str]] = []
+        for row in table.find_all('tr'):
+            cells = [
+                self._inline_text(cell).replace('|', '\\|')
+                for cell in row.find_all(['th', 'td'], recursive=False)
+            ]
+            if cells:
+                rows.append(cells)
+
+        if not rows:
+            return ""
+
+        width = max(len(row) for row in rows)
+        rows = [row + [''] * (width - len(row)) for row in rows]
+
+        lines = [f"| {' | '.join(rows[0])} |", f"|{' --- |' * width}"]
+        lines.extend(f"| {' | '.join(row)} |" for row in rows[1:])
+        return "\n".join(lines)
+
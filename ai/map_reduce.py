@@ -0,0 +1,137 @@
+"""
+Map-Reduce生成模块
+并发执行分块提示词，再逐层合并中间结果，直到得到单一文档
+"""
+
+import asyncio
+from typing import Any, List, Callable, Awaitable, Optional
+from .chunker import MarkdownChunker
+
+
+class MapReduceExecutor:
+    """分块生成与合并执行器"""
+
+    def __init__(
+        self,
+        generate: Callable[[str, str], str],
+        agenerate: Callable[[str, str], Awaitable[str]],
+        token_budget: int,
+        chunker: Optional[MarkdownChunker] = None
+    ):
+        """
+        初始化执行器
+
+        Args:
+            generate: 同步生成函数 (提示词, 任务类型) -> 结果
+            agenerate: 异步生成函数 (提示词, 任务类型) -> 结果
+            token_budget: 每次合并输入的最大估算token数
+            chunker: 分块器，为None时新建
+        """
+        self.generate = generate
+        self.agenerate = agenerate
+        self.token_budget = token_budget
+        self.chunker = chunker or MarkdownChunker()
+
+    def _group_partials(self, partials: List[str]) -> List[List[str]]:
+        """
+        把中间结果按预算分组，无法缩减分组数时整体合并以保证收敛
+
+        Args:
+            partials: 中间结果列表
+
+        Returns:
+            List[List[str]]: 分组列表
+        """
+        groups = self.chunker.pack(partials, self.token_budget)
+        if len(groups) >= len(partials):
+            return [partials]
+        return groups
+
+    def run(
+        self,
+        map_prompts: List[str],
+        build_merge_prompt: Callable[[List[str]], str],
+        map_task: str,
+        merge_task: str
+    ) -> str:
+        """
+        顺序执行map与逐层reduce
+
+        Args:
+            map_prompts: 分块提示词列表
+            build_merge_prompt: 根据一组中间结果构建合并提示词的函数
+            map_task: 分块生成的任务类型
+            merge_task: 合并生成的任务类型
+
+        Returns:
+            str: 最终结果
+        """
+        partials = [self.generate(prompt, map_task) for prompt in map_prompts]
+
+        while len(partials) > 1:
+            groups = self._group_partials(partials)
+            partials = [self.generate(build_merge_prompt(group), merge_task) for group in groups]
+
+        return partials[0]
+
+    async def arun(
+        self,
+        map_prompts: List[str],
+        build_merge_prompt: Callable[[List[str]], str],
+        map_task: str,
+        merge_task: str,
+        afinal: Optional[Callable[[str, str], Awaitable[Any]]] = None
+    ) -> Any:
+        """
+        并发执行map与逐层reduce，并发度由模型客户端的并发上限控制
+
+        Args:
+            map_prompts: 分块提示词列表
+            build_merge_prompt: 根据一组中间结果构建合并提示词的函数
+            map_task: 分块生成的任务类型
+            merge_task: 合并生成的任务类型
+            afinal: 产生最终结果的那次生成所用的函数（如流式写入文件），为None时使用agenerate
+
+        Returns:
+            最终结果，指定afinal时为其返回值
+        """
+        agenerate_final = afinal or self.agenerate
+        if len(map_prompts) == 1:
+            return await agenerate_final(map_prompts[0], map_task)
+
+        partials = list(await asyncio.gather(
+            *(self.agenerate(prompt, map_task) for prompt in map_prompts)
+        ))
+
+        while True:
+            groups = self._group_partials(partials)
+            if len(groups) == 1:
+                return await agenerate_final(build_merge_prompt(groups[0]), merge_task)
+            partials = list(await asyncio.gather(
+                *(self.agenerate(build_merge_prompt(group), merge_task) for group in groups)
+            ))
+
+    async def areduce(
+        self,
+        partials: List[str],
+        build_merge_prompt: Callable[[List[str]], str],
+        merge_task: str
+    ) -> str:
+        """
+        只执行逐层reduce，用于map结果已由其他途径（如批处理任务）得到的情况
+
+        Args:
+            partials: 中间结果列表
+            build_merge_prompt: 根据一组中间结果构建合并提示词的函数
+            merge_task: 合并生成的任务类型
+
+        Returns:
+            str: 最终结果
+        """
+        while len(partials) > 1:
+            groups = self._group_partials(partials)
+            partials = list(await asyncio.gather(
+                *(self.agenerate(build_merge_prompt(group), merge_task) for group in groups)
+            ))
+
+        return partials[0]
@@ -0,0 +1,247 @@
+"""
+模型路由模块
+按任务类型选择模型，支持先用低成本模型、输出校验失败时再升级到更大模型的级联
+"""
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Iterator
+from backends import GenerationBackend
+
+
+class ModelRouter:
+    """按任务类型路由模型的级联调用器"""
+
+    # 路由名称: 页面提取（含分块合并）、一级模块整合、ArkTS Lint规则解析
+    ROUTES = ('extraction', 'integration', 'lint_rules')
+
+    def __init__(self, gemini_api: GenerationBackend, routes: Optional[Dict[str, List[str]]] = None):
+        """
+        初始化模型路由
+
+        Args:
+            gemini_api: 默认模型的生成后端实例，其他模型的实例由它派生
+            routes: 路由名称 -> 按升级顺序排列的模型列表，未配置的路由只使用默认模型
+        """
+        self.gemini_api = gemini_api
+        self.routes = {route: list(models) for route, models in (routes or {}).items() if models}
+
+        self._apis: Dict[str, GenerationBackend] = {gemini_api.model_name: gemini_api}
+        self._lock = threading.Lock()
+
+        # 运行统计: (路由, 模型) -> 完成的调用数；路由 -> 升级次数
+        self.served: Dict[tuple, int] = defaultdict(int)
+        self.escalations: Dict[str, int] = defaultdict(int)
+
+        # 当前提取任务实际使用的模型，由track_served_models设置
+        self._served_models: ContextVar[Optional[List[str]]] = ContextVar('served_models', default=None)
+
+    def get_models(self, route: str) -> List[str]:
+        """
+        获取路由的模型列表
+
+        Args:
+            route: 路由名称
+
+        Returns:
+            List[str]: 按升级顺序排列的模型列表
+        """
+        return self.routes.get(route) or [self.gemini_api.model_name]
+
+    def get_route_label(self, route: str) -> str:
+        """
+        获取路由的模型标识，用于判断已有输出是否由相同的模型配置生成
+
+        Args:
+            route: 路由名称
+
+        Returns:
+            str: 单个模型时为模型名称，级联时用">"连接
+        """
+        return ">".join(self.get_models(route))
+
+    def get_api(self, model_name: str) -> GenerationBackend:
+        """
+        获取模型对应的API实例，首次使用时创建
+
+        Args:
+            model_name: 模型名称
+
+        Returns:
+            GenerationBackend: 后端实例
+        """
+        with self._lock:
+            if model_name not in self._apis:
+                self._apis[model_name] = self.gemini_api.for_model(model_name)
+            return self._apis[model_name]
+
+    def is_final_model(self, route: str, gemini_api: GenerationBackend) -> bool:
+        """
+        判断后端实例是否为路由中最后一级的模型
+
+        Args:
+            route: 路由名称
+            gemini_api: 后端实例
+
+        Returns:
+            bool: 是否为最后一级
+        """
+        return gemini_api.model_name == self.get_models(route)[-1]
+
+    def get_validator(
+        self,
+        route: str,
+        gemini_api: GenerationBackend,
+        validator: Callable[[str], Any]
+    ) -> Optional[Callable[[str], Any]]:
+        """
+        获取调用某一级模型时的结果校验函数，与generate/agenerate一致，最后一级模型的结果不再校验；
+        传给结果缓存后，未通过校验的结果不会写入缓存，配合remember_rejection记录校验失败
+
+        Args:
+            route: 路由名称
+            gemini_api: 本次调用的后端实例
+            validator: 结果校验函数
+
+        Returns:
+            Callable: 校验函数，最后一级模型时返回None
+        """
+        return None if self.is_final_model(route, gemini_api) else validator
+
+    def get_final_api(self, route: str) -> GenerationBackend:
+        """
+        获取路由中最后一级模型的API实例，用于无法先校验再输出的调用（如流式写入）
+
+        Args:
+            route: 路由名称
+
+        Returns:
+            GenerationBackend: 后端实例
+        """
+        return self.get_api(self.get_models(route)[-1])
+
+    def generate(
+        self,
+        route: str,
+        call: Callable[[GenerationBackend], str],
+        validator: Optional[Callable[[str], Any]] = None
+    ) -> str:
+        """
+        按路由依次调用模型，结果校验失败时升级到下一个模型；最后一级模型的结果不再校验
+
+        Args:
+            route: 路由名称
+            call: 使用给定API实例生成结果的函数
+            validator: 结果校验函数，校验失败时抛出ValueError
+
+        Returns:
+            str: 生成结果
+        """
+        models = self.get_models(route)
+        for index, model_name in enumerate(models):
+            is_last = index == len(models) - 1
+            try:
+                result = call(self.get_api(model_name))
+                if validator and not is_last:
+                    validator(result)
+            except ValueError as e:
+                if is_last:
+                    raise
+                self._record_escalation(route, model_name, models[index + 1], e)
+                continue
+            self.record_served(route, model_name)
+            return result
+
+    async def agenerate(
+        self,
+        route: str,
+        call: Callable[[GenerationBackend], Awaitable[str]],
+        validator: Optional[Callable[[str], Any]] = None
+    ) -> str:
+        """
+        generate的异步版本
+
+        Args:
+            route: 路由名称
+            call: 使用给定API实例异步生成结果的函数
+            validator: 结果校验函数，校验失败时抛出ValueError
+
+        Returns:
+            str: 生成结果
+        """
+        models = self.get_models(route)
+        for index, model_name in enumerate(models):
+            is_last = index == len(models) - 1
+            try:
+                result = await call(self.get_api(model_name))
+                if validator and not is_last:
+                    validator(result)
+            except ValueError as e:
+                if is_last:
+                    raise
+                self._record_escalation(route, model_name, models[index + 1], e)
+                continue
+            self.record_served(route, model_name)
+            return result
+
+    def _record_escalation(self, route: str, model_name: str, next_model: str, error: Exception) -> None:
+        """记录一次升级"""
+        with self._lock:
+            self.escalations[route] += 1
+        print(f"    ⤴️ {model_name} 输出未通过校验（{error}），升级到 {next_model}")
+
+    def record_served(self, route: str, model_name: str) -> None:
+        """
+        记录完成调用的模型，并写入当前任务的模型列表
+
+        Args:
+            route: 路由名称
+            model_name: 模型名称
+        """
+        with self._lock:
+            self.served[(route, model_name)] += 1
+        served_models = self._served_models.get()
+        if served_models is not None and model_name not in served_models:
+            served_models.append(model_name)
+
+    @contextmanager
+    def track_served_models(self) -> Iterator[List[str]]:
+        """
+        记录代码块内（包括其中创建的异步任务与线程）完成调用的模型
+
+        Yields:
+            List[str]: 按首次使用顺序排列的模型名称，代码块结束后可读取
+        """
+        served_models: List[str] = []
+        token = self._served_models.set(served_models)
+        try:
+            yield served_models
+        finally:
+            self._served_models.reset(token)
+
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """
+        获取路由统计
+
+        Returns:
+            Dict: 路由 -> 包含models、served（模型 -> 调用数）、escalations的字典
+        """
+        with self._lock:
+            return {
+                route: {
+                    'models': self.get_models(route),
+                    'served': {model: count for (served_route, model), count in self.served.items()
+                               if served_route == route},
+                    'escalations': self.escalations.get(route, 0)
+                }
+                for route in self.ROUTES
+            }
+
+    def delete_context_caches(self) -> None:
+        """删除各模型实例本次运行创建的上下文缓存"""
+        with self._lock:
+            apis = list(self._apis.values())
+        for api in apis:
+            api.delete_context_caches()
@@ -0,0 +1,218 @@
+"""
+结构化最佳实践记录模块
+定义结构化提取的记录模型，并提供解析、本地合并去重与Markdown渲染
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field
+
+
+class PracticeRecord(BaseModel):
+    """单条最佳实践记录"""
+
+    category: str = Field(description="实践类别，如布局、状态管理、性能优化")
+    principle: str = Field(description="一句话概括的实践原则")
+    do: List[str] = Field(default_factory=list, description="推荐的具体做法")
+    dont: List[str] = Field(default_factory=list, description="应避免的做法")
+    code_sample: str = Field(default="", description="文档中的ArkTS代码示例，没有时为空字符串")
+    source_anchor: str = Field(default="", description="该实践在原文档中所在章节的标题")
+
+
+class PracticeExtraction(BaseModel):
+    """单篇文档的结构化提取结果，同时作为模型的响应结构"""
+
+    summary: str = Field(default="", description="文档核心功能和用途的简要概述")
+    practices: List[PracticeRecord] = Field(default_factory=list, description="最佳实践记录列表")
+
+
+class PracticeRecordMerger:
+    """结构化记录的解析、合并与渲染"""
+
+    FENCE_PATTERN = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+
+    @classmethod
+    def parse(cls, text: str) -> PracticeExtraction:
+        """
+        解析模型返回的JSON
+
+        Args:
+            text: 模型返回的文本，允许带```json代码块标记
+
+        Returns:
+            PracticeExtraction: 提取结果
+
+        Raises:
+            ValueError: 内容不是合法的提取结果时抛出
+        """
+        payload = cls.FENCE_PATTERN.sub('', text.strip())
+        try:
+            return PracticeExtraction.model_validate_json(payload)
+        except ValueError as e:
+            raise ValueError(f"结构化提取结果解析失败: {e}") from e
+
+    @staticmethod
+    def normalize_key(text: str) -> str:
+        """
+        归一化实践原则，忽略大小写、空白与标点差异
+
+        Args:
+            text: 实践原则
+
+        Returns:
+            str: 用于判断重复的键
+        """
+        return re.sub(r'[\s\W_]+', '', text.lower())
+
+    @classmethod
+    def merge(cls, records: List[PracticeRecord]) -> List[PracticeRecord]:
+        """
+        合并原则相同的记录，做法列表取并集，保留首个非空的代码示例与出处
+
+        Args:
+            records: 记录列表
+
+        Returns:
+            List[PracticeRecord]: 去重后的记录列表，保持首次出现的顺序
+        """
+        merged: Dict[str, PracticeRecord] = {}
+        for record in records:
+            key = cls.normalize_key(record.principle)
+            if not key:
+                continue
+
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = record.model_copy(deep=True)
+                continue
+
+            existing.do = cls._merge_items(existing.do, record.do)
+            existing.dont = cls._merge_items(existing.dont, record.dont)
+            existing.code_sample = existing.code_sample or record.code_sample
+            existing.source_anchor = existing.source_anchor or record.source_anchor
+
+        return list(merged.values())
+
+    @classmethod
+    def _merge_items(cls, first: List[str], second: List[str]) -> List[str]:
+        """按归一化内容合并两个做法列表"""
+        seen = {cls.normalize_key(item) for item in first}
+        result = list(first)
+        for item in second:
+            key = cls.normalize_key(item)
+            if key and key not in seen:
+                seen.add(key)
+                result.append(item)
+        return result
+
+    @classmethod
+    def combine(cls, extractions: List[PracticeExtraction]) -> PracticeExtraction:
+        """
+        合并同一文档各分块的提取结果，无需再次调用模型
+
+        Args:
+            extractions: 各分块的提取结果
+
+        Returns:
+            PracticeExtraction: 合并后的提取结果
+        """
+        summary = next((extraction.summary for extraction in extractions if extraction.summary), "")
+        records = [record for extraction in extractions for record in extraction.practices]
+        return PracticeExtraction(summary=summary, practices=cls.merge(records))
+
+    @staticmethod
+    def to_document(module_name: str, url: str, extraction: PracticeExtraction) -> Dict[str, Any]:
+        """
+        转换为随Markdown一起保存的记录文档
+
+        Args:
+            module_name: 模块名称
+            url: 源URL
+            extraction: 提取结果
+
+        Returns:
+            Dict: 记录文档
+        """
+        return {'module_name': module_name, 'url': url, **extraction.model_dump()}
+
+    @staticmethod
+    def load_records(document: Dict[str, Any]) -> Optional[List[PracticeRecord]]:
+        """
+        从记录文档中读取实践记录
+
+        Args:
+            document: 记录文档
+
+        Returns:
+            List[PracticeRecord]: 实践记录，格式不合法时返回None
+        """
+        try:
+            return PracticeExtraction.model_validate(document).practices
+        except ValueError:
+            return None
+
+    @staticmethod
+    def render_markdown(module_name: str, url: str, extraction: PracticeExtraction) -> str:
+        """
+        把提取结果渲染为与Markdown提取模式相同结构的文档
+
+        Args:
+            module_name: 模块名称
+            url: 源URL
+            extraction: 提取结果
+
+        Returns:
+            str: Markdown内容
+        """
+        lines = [f"# {module_name.replace('_', ' ').title()} - 最佳实践", "", "## 📋 概述",
+                 extraction.summary or "（文档未提供概述）", "", "## 🎯 最佳实践", ""]
+
+        for index, record in enumerate(extraction.practices, 1):
+            lines.append(f"### {index}. {record.category}")
+            lines.append(f"- **实践要点**：{record.principle}")
+            if record.do:
+                lines.append(f"- **实现方式**：{'；'.join(record.do)}")
+            if record.dont:
+                lines.append(f"- **注意事项**：{'；'.join(record.dont)}")
+            if record.source_anchor:
+                lines.append(f"- **出处**：{record.source_anchor}")
+            lines.append("")
+
+        samples = [record for record in extraction.practices if record.code_sample.strip()]
+        if samples:
+            lines.extend(["## 💡 代码示例", ""])
+            for record in samples:
+                lines.extend([f"**{record.principle}**", "", "```arkts", record.code_sample.strip('\n'), "```", ""])
+
+        donts = [item for record in extraction.practices for item in record.dont]
+        dos = [item for record in extraction.practices for item in record.do]
+        if donts or dos:
+            lines.extend(["## ⚠️ 常见陷阱", ""])
+            if donts:
+                lines.extend(["### 避免的做法", *(f"- {item}" for item in donts), ""])
+            if dos:
+                lines.extend(["### 推荐的做法", *(f"- {item}" for item in dos), ""])
+
+        lines.extend(["## 🔗 相关资源", f"- 原文档：{url}", ""])
+        return "\n".join(lines)
+
+    @staticmethod
+    def render_for_integration(records: List[PracticeRecord]) -> List[str]:
+        """
+        把合并后的记录渲染为整合提示词中的紧凑片段
+
+        Args:
+            records: 实践记录
+
+        Returns:
+            List[str]: 每条记录一个片段
+        """
+        sections = []
+        for record in records:
+            parts = [f"### [{record.category}] {record.principle}"]
+            parts.extend(f"- 推荐：{item}" for item in record.do)
+            parts.extend(f"- 避免：{item}" for item in record.dont)
+            if record.code_sample.strip():
+                parts.append(f"```arkts\n{record.code_sample.strip(chr(10))}\n```")
+            sections.append("\n".join(parts) + "\n")
+        return sections
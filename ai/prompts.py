@@ -3,50 +3,30 @@ AI提示词模板管理模块
 包含各种场景下的提示词模板
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List
+from utils import TokenHelper
+
+# 提示词模板版本，修改模板内容时需要递增以使AI结果缓存失效
+PROMPT_TEMPLATE_VERSION = "5"
 
 
 class PromptTemplates:
     """提示词模板管理类"""
 
     @staticmethod
-    def get_best_practices_extraction_prompt(
-        title: str,
-        module_name: str,
-        url: str,
-        html_content: str,
-        max_content_length: int = 15000
-    ) -> str:
+    def get_best_practices_extraction_instruction() -> str:
         """
-        获取最佳实践提取的提示词
-
-        Args:
-            title: 页面标题
-            module_name: 模块名称
-            url: 源URL
-            html_content: HTML内容
-            max_content_length: HTML内容最大长度
+        获取最佳实践提取的固定指令，与页面无关，作为每个提取提示词的前缀以便复用上下文缓存
 
         Returns:
-            str: 构建好的提示词
+            str: 固定指令
         """
-        # 限制HTML内容长度以避免超出token限制
-        limited_content = html_content[:max_content_length]
+        return """
+你是一位资深的HarmonyOS界面开发专家。请分析指令后提供的华为官方文档内容（已从HTML转换为Markdown），提取并整理出界面开发领域的最佳实践。
 
-        return f"""
-你是一位资深的HarmonyOS界面开发专家。请分析以下华为官方文档的HTML内容，提取并整理出界面开发领域的最佳实践。
-
-**页面信息**：
-- 标题：{title}
-- 模块：{module_name}
-- 链接：{url}
-
-**HTML内容**：
-{limited_content}
+**请按以下格式输出最佳实践**（[模块名称]按页面信息中的模块填写，下划线替换为空格并将单词首字母大写）：
 
-**请按以下格式输出最佳实践**：
-
-# {module_name.replace('_', ' ').title()} - 最佳实践
+# [模块名称] - 最佳实践
 
 ## 📋 概述
 [简要描述该模块的核心功能和用途]
@@ -78,7 +58,7 @@ class PromptTemplates:
 - [列出推荐的做法]
 
 ## 🔗 相关资源
-- 原文档：{url}
+- 原文档：[页面信息中的链接]
 
 **要求**：
 1. 专注于界面开发的最佳实践
@@ -87,8 +67,149 @@ class PromptTemplates:
 4. 突出重要的注意事项
 5. 使用清晰的markdown格式
 6. 内容要实用且具体
+7. 页面信息标注了分块时，仅基于本部分内容提取，稍后会与其他部分合并
+
+请基于文档内容提取真实有用的最佳实践，不要编造内容。
+"""
+
+    @staticmethod
+    def get_best_practices_extraction_prompt(
+        title: str,
+        module_name: str,
+        url: str,
+        html_content: str,
+        max_content_tokens: int = 12000,
+        part_info: str = ""
+    ) -> str:
+        """
+        获取最佳实践提取的提示词，固定指令在前、页面内容在后
+
+        Args:
+            title: 页面标题
+            module_name: 模块名称
+            url: 源URL
+            html_content: 页面内容（通常是HTMLReducer精简后的Markdown）
+            max_content_tokens: 页面内容的最大估算token数
+            part_info: 分块提取时的分块序号（如"2/5"），为空表示完整文档
+
+        Returns:
+            str: 构建好的提示词
+        """
+        # 按token预算限制内容长度以避免超出模型限制
+        limited_content = TokenHelper.truncate_to_tokens(html_content, max_content_tokens)
+        part_line = f"\n- 分块：第{part_info}部分" if part_info else ""
+
+        return PromptTemplates.get_best_practices_extraction_instruction() + f"""
+**页面信息**：
+- 标题：{title}
+- 模块：{module_name}
+- 链接：{url}{part_line}
+
+**文档内容**：
+{limited_content}
+"""
+
+    @staticmethod
+    def get_best_practices_merge_prompt(
+        module_name: str,
+        url: str,
+        partial_results: List[str]
+    ) -> str:
+        """
+        获取合并分块提取结果的提示词
+
+        Args:
+            module_name: 模块名称
+            url: 源URL
+            partial_results: 各分块的最佳实践提取结果
+
+        Returns:
+            str: 构建好的提示词
+        """
+        partials_content = "\n".join(
+            f"### 分块结果 {index}\n{partial}\n"
+            for index, partial in enumerate(partial_results, 1)
+        )
+
+        return f"""
+你是一位资深的HarmonyOS界面开发专家。以下是同一篇华为官方文档按章节分块后分别提取的最佳实践，请将它们合并为一份完整的最佳实践文档。
 
-请基于HTML内容提取真实有用的最佳实践，不要编造内容。
+**模块**：{module_name}
+**链接**：{url}
+
+**分块提取结果**：
+{partials_content}
+
+**合并要求**：
+1. 保持与分块结果相同的markdown结构（概述、最佳实践、代码示例、常见陷阱、相关资源）
+2. 合并重复或相似的实践要点，保留最具体的表述
+3. 保留所有不重复的代码示例
+4. 概述需覆盖整篇文档而不是单个分块
+5. 不要编造分块结果中没有的内容
+"""
+
+    @staticmethod
+    def get_structured_extraction_instruction() -> str:
+        """
+        获取结构化提取的固定指令，作为每个结构化提取提示词的前缀
+
+        Returns:
+            str: 固定指令
+        """
+        return """
+你是一位资深的HarmonyOS界面开发专家。请分析指令后提供的华为官方文档内容（已从HTML转换为Markdown），提取界面开发领域的最佳实践，并以JSON输出。
+
+**输出字段**：
+- summary：一两句话概述该模块的核心功能和用途
+- practices：最佳实践记录列表，每条记录包含
+  - category：实践类别（如布局、状态管理、性能优化）
+  - principle：一句话概括的实践原则
+  - do：推荐的具体做法列表
+  - dont：应避免的做法列表
+  - code_sample：文档中对应的ArkTS代码示例，没有时为空字符串
+  - source_anchor：该实践在文档中所在章节的标题
+
+**要求**：
+1. 每条记录只表达一个实践原则，原则要具体可操作
+2. 代码示例直接摘自文档，不要改写或编造
+3. 页面信息标注了分块时，仅基于本部分内容提取
+4. 只输出JSON，不要输出其他内容
+"""
+
+    @staticmethod
+    def get_structured_extraction_prompt(
+        title: str,
+        module_name: str,
+        url: str,
+        html_content: str,
+        max_content_tokens: int = 12000,
+        part_info: str = ""
+    ) -> str:
+        """
+        获取结构化提取的提示词，模型按响应结构输出JSON
+
+        Args:
+            title: 页面标题
+            module_name: 模块名称
+            url: 源URL
+            html_content: 页面内容（通常是HTMLReducer精简后的Markdown）
+            max_content_tokens: 页面内容的最大估算token数
+            part_info: 分块提取时的分块序号（如"2/5"），为空表示完整文档
+
+        Returns:
+            str: 构建好的提示词
+        """
+        limited_content = TokenHelper.truncate_to_tokens(html_content, max_content_tokens)
+        part_line = f"\n- 分块：第{part_info}部分" if part_info else ""
+
+        return PromptTemplates.get_structured_extraction_instruction() + f"""
+**页面信息**：
+- 标题：{title}
+- 模块：{module_name}
+- 链接：{url}{part_line}
+
+**文档内容**：
+{limited_content}
 """
 
     @staticmethod
@@ -167,6 +288,7 @@ class PromptTemplates:
 4. 避免重复和冗余内容
 5. 重点关注实际开发中的核心要点
 6. 使用清晰的结构和格式
+7. 标注"相似内容共N处"的章节代表多个文档中重复出现的要点，N越大越应优先保留
 
 请基于提供的最佳实践内容进行整合，确保生成的Cursor Rules实用且易于理解。
 """
@@ -240,10 +362,25 @@ class PromptBuilder:
     def __init__(self):
         self.templates = PromptTemplates()
 
+    def get_shared_instructions(self) -> List[str]:
+        """获取所有提取提示词共用的固定指令前缀"""
+        return [
+            self.templates.get_best_practices_extraction_instruction(),
+            self.templates.get_structured_extraction_instruction()
+        ]
+
     def build_extraction_prompt(self, **kwargs) -> str:
         """构建提取提示词"""
         return self.templates.get_best_practices_extraction_prompt(**kwargs)
 
+    def build_extraction_merge_prompt(self, **kwargs) -> str:
+        """构建分块提取结果的合并提示词"""
+        return self.templates.get_best_practices_merge_prompt(**kwargs)
+
+    def build_structured_extraction_prompt(self, **kwargs) -> str:
+        """构建结构化提取提示词"""
+        return self.templates.get_structured_extraction_prompt(**kwargs)
+
     def build_integration_prompt(self, **kwargs) -> str:
         """构建整合提示词"""
         return self.templates.get_practices_integration_prompt(**kwargs)
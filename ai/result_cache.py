@@ -0,0 +1,385 @@
+"""
+AI结果缓存模块
+按内容哈希缓存大模型生成结果，磁盘占用超限时按最近最少使用淘汰
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, Callable
+
+
+class ResultCache:
+    """基于内容哈希的大模型结果缓存"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 100 * 1024 * 1024):
+        """
+        初始化结果缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存目录的最大占用字节数
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        # key -> (文件大小, 最近访问时间)
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._lock = threading.Lock()
+
+        # 运行统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejection_hits = 0
+
+    @staticmethod
+    def normalize_content(content: str) -> str:
+        """
+        归一化内容，忽略空白差异
+
+        Args:
+            content: 原始内容
+
+        Returns:
+            str: 归一化后的内容
+        """
+        return re.sub(r'\s+', ' ', content).strip()
+
+    @classmethod
+    def make_key(
+        cls,
+        task: str,
+        prompt_version: str,
+        model_name: str,
+        temperature: float,
+        content: str
+    ) -> str:
+        """
+        生成缓存键
+
+        Args:
+            task: 任务类型
+            prompt_version: 提示词模板版本
+            model_name: 模型名称
+            temperature: 温度参数
+            content: 提示词或输入内容
+
+        Returns:
+            str: 缓存键
+        """
+        payload = json.dumps({
+            'task': task,
+            'prompt_version': prompt_version,
+            'model': model_name,
+            'temperature': temperature,
+            'content': cls.normalize_content(content)
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _rejection_key(key: str) -> str:
+        """获取记录某个结果未通过校验的缓存键"""
+        return hashlib.sha256(f"rejected:{key}".encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """获取缓存键对应的文件路径"""
+        return self.cache_dir / f"{key}.txt"
+
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        """扫描缓存目录构建索引（仅首次访问时执行）"""
+        if self._index is None:
+            self._index = {}
+            for entry_path in self.cache_dir.glob("*.txt"):
+                stat = entry_path.stat()
+                self._index[entry_path.stem] = (stat.st_size, stat.st_mtime)
+        return self._index
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存结果
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            str: 缓存的生成结果，未命中时返回None
+        """
+        value = self._read(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _read(self, key: str) -> Optional[str]:
+        """
+        读取缓存条目并更新访问时间，不计入命中统计
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            str: 缓存内容，不存在时返回None
+        """
+        entry_path = self._entry_path(key)
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                return None
+
+            try:
+                value = entry_path.read_text(encoding='utf-8')
+                # 更新访问时间作为LRU依据
+                os.utime(entry_path)
+                index[key] = (index[key][0], entry_path.stat().st_mtime)
+            except OSError:
+                index.pop(key, None)
+                return None
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        """
+        写入缓存结果并按需淘汰旧条目
+
+        Args:
+            key: 缓存键
+            value: 生成结果
+        """
+        if not value:
+            return
+
+        entry_path = self._entry_path(key)
+        temp_path = entry_path.with_suffix('.tmp')
+        with self._lock:
+            index = self._load_index()
+            try:
+                temp_path.write_text(value, encoding='utf-8')
+                temp_path.replace(entry_path)
+                stat = entry_path.stat()
+                index[key] = (stat.st_size, stat.st_mtime)
+            except OSError as e:
+                print(f"⚠️ AI结果缓存写入失败: {e}")
+                return
+
+            self._evict(index)
+
+    def put_file(self, key: str, source_path: Path) -> None:
+        """
+        把已生成的结果文件复制为缓存条目，无需读入内存
+
+        Args:
+            key: 缓存键
+            source_path: 结果文件路径
+        """
+        entry_path = self._entry_path(key)
+        temp_path = entry_path.with_suffix('.tmp')
+        with self._lock:
+            index = self._load_index()
+            try:
+                shutil.copyfile(source_path, temp_path)
+                temp_path.replace(entry_path)
+                stat = entry_path.stat()
+                index[key] = (stat.st_size, stat.st_mtime)
+            except OSError as e:
+                print(f"⚠️ AI结果缓存写入失败: {e}")
+                return
+
+            self._evict(index)
+
+    def _evict(self, index: Dict[str, Tuple[int, float]]) -> None:
+        """
+        淘汰最近最少使用的条目直到占用不超过上限
+
+        Args:
+            index: 缓存索引
+        """
+        total_bytes = sum(size for size, _ in index.values())
+        if total_bytes <= self.max_bytes:
+            return
+
+        for key, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                self._entry_path(key).unlink()
+            except OSError:
+                pass
+            index.pop(key, None)
+            total_bytes -= size
+            self.evictions += 1
+
+    @staticmethod
+    def _is_valid(value: str, validator: Optional[Callable[[str], Any]]) -> bool:
+        """
+        校验缓存内容，校验失败的条目视为未命中
+
+        Args:
+            value: 缓存内容
+            validator: 结果校验函数，为None时不校验
+
+        Returns:
+            bool: 是否可用
+        """
+        if validator is None:
+            return True
+        try:
+            validator(value)
+            return True
+        except ValueError:
+            return False
+
+    def _lookup(
+        self,
+        key: str,
+        validator: Optional[Callable[[str], Any]],
+        remember_rejection: bool
+    ) -> Optional[str]:
+        """
+        查找可用的缓存结果
+
+        Args:
+            key: 缓存键
+            validator: 结果校验函数
+            remember_rejection: 是否读取未通过校验的记录
+
+        Returns:
+            str: 通过校验的缓存结果，未命中时返回None
+
+        Raises:
+            ValueError: 已记录该模型对同一提示词的结果未通过校验时抛出，调用方无需再次调用模型
+        """
+        cached = self.get(key)
+        if cached is not None and self._is_valid(cached, validator):
+            return cached
+
+        if validator and remember_rejection:
+            rejection = self._read(self._rejection_key(key))
+            if rejection is not None:
+                with self._lock:
+                    self.rejection_hits += 1
+                raise ValueError(f"{rejection}（缓存的校验结果）")
+        return None
+
+    def _store(
+        self,
+        key: str,
+        result: str,
+        validator: Optional[Callable[[str], Any]],
+        remember_rejection: bool
+    ) -> None:
+        """
+        校验并写入生成结果，未通过校验时按需记录校验失败
+
+        Args:
+            key: 缓存键
+            result: 生成结果
+            validator: 结果校验函数
+            remember_rejection: 是否记录未通过校验
+
+        Raises:
+            ValueError: 结果未通过校验时抛出
+        """
+        if validator:
+            try:
+                validator(result)
+            except ValueError as e:
+                if remember_rejection:
+                    self.put(self._rejection_key(key), str(e) or "结果未通过校验")
+                raise
+        self.put(key, result)
+
+    def get_or_generate(
+        self,
+        task: str,
+        prompt_version: str,
+        gemini_api,
+        prompt: str,
+        response_schema=None,
+        validator: Optional[Callable[[str], Any]] = None,
+        remember_rejection: bool = False
+    ) -> str:
+        """
+        命中缓存时直接返回结果，否则调用模型生成并写入缓存
+
+        Args:
+            task: 任务类型
+            prompt_version: 提示词模板版本
+            gemini_api: Gemini API实例
+            prompt: 完整提示词
+            response_schema: 响应结构，设置后要求模型输出JSON
+            validator: 结果校验函数，校验失败时抛出异常，不合格的结果不会写入缓存
+            remember_rejection: 是否记录未通过校验，记录后相同提示词不再调用该模型而直接抛出ValueError；
+                                用于级联中的低成本模型，使其后的模型能直接命中缓存
+
+        Returns:
+            str: 生成结果
+        """
+        key = self.make_key(task, prompt_version, gemini_api.model_name, gemini_api.temperature, prompt)
+        cached = self._lookup(key, validator, remember_rejection)
+        if cached is not None:
+            return cached
+
+        result = gemini_api.generate_text(prompt, response_schema=response_schema)
+        self._store(key, result, validator, remember_rejection)
+        return result
+
+    async def aget_or_generate(
+        self,
+        task: str,
+        prompt_version: str,
+        gemini_api,
+        prompt: str,
+        response_schema=None,
+        validator: Optional[Callable[[str], Any]] = None,
+        remember_rejection: bool = False
+    ) -> str:
+        """
+        get_or_generate的异步版本，未命中时通过异步客户端调用模型
+
+        Args:
+            task: 任务类型
+            prompt_version: 提示词模板版本
+            gemini_api: Gemini API实例
+            prompt: 完整提示词
+            response_schema: 响应结构，设置后要求模型输出JSON
+            validator: 结果校验函数，校验失败时抛出异常，不合格的结果不会写入缓存
+            remember_rejection: 是否记录未通过校验
+
+        Returns:
+            str: 生成结果
+        """
+        key = self.make_key(task, prompt_version, gemini_api.model_name, gemini_api.temperature, prompt)
+        cached = self._lookup(key, validator, remember_rejection)
+        if cached is not None:
+            return cached
+
+        result = await gemini_api.agenerate_text(prompt, response_schema=response_schema)
+        self._store(key, result, validator, remember_rejection)
+        return result
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            Dict: 统计信息
+        """
+        with self._lock:
+            index = self._load_index()
+            return {
+                'cache_dir': str(self.cache_dir),
+                'entries': len(index),
+                'total_bytes': sum(size for size, _ in index.values()),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'rejection_hits': self.rejection_hits
+            }
@@ -7,26 +7,42 @@ import re
 import json
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from bs4 import BeautifulSoup
 from crawler import WebCrawler
 from config import ConfigManager
-from gemini_api import GeminiAPI
+from backends import GenerationBackend
+from ai import ResultCache, HTMLReducer, ModelRouter
+
+# ArkTS规则提取提示词版本，修改提示词时需要递增以使AI结果缓存失效
+ARKTS_PROMPT_VERSION = "3"
 
 
 class ArkTSRulesExtractor:
     """ArkTS规则提取器"""
 
-    def __init__(self, web_crawler: WebCrawler, gemini_api: GeminiAPI, output_dir: Path = None):
+    def __init__(
+        self,
+        web_crawler: WebCrawler,
+        gemini_api: GenerationBackend,
+        output_dir: Path = None,
+        result_cache: Optional[ResultCache] = None,
+        model_router: Optional[ModelRouter] = None
+    ):
         """
         初始化规则提取器
 
         Args:
             web_crawler: 网页爬虫实例
-            gemini_api: Gemini API实例
+            gemini_api: 生成后端实例
             output_dir: 输出目录路径，默认为None时使用默认路径
+            result_cache: AI结果缓存，为None时不缓存
+            model_router: 模型路由，为None时使用gemini_api的模型
         """
         self.web_crawler = web_crawler
         self.gemini_api = gemini_api
+        self.result_cache = result_cache
+        self.model_router = model_router or (ModelRouter(gemini_api) if gemini_api else None)
+        if self.gemini_api:
+            self.gemini_api.register_shared_prefix(self._get_arkts_extraction_instruction())
 
         # 设置输出目录
         if output_dir is None:
@@ -84,7 +100,7 @@ class ArkTSRulesExtractor:
             }
 
         # 提取规则 - 使用AI智能提取
-        rules_result = self._extract_arkts_rules_with_ai(html_content)
+        rules_result = await self._extract_arkts_rules_with_ai(html_content)
 
         if not rules_result.get("success", False):
             error_msg = rules_result.get("error", "AI提取失败")
@@ -150,7 +166,7 @@ class ArkTSRulesExtractor:
 
         return None
 
-    def _extract_arkts_rules_with_ai(self, html_content: str) -> Dict[str, Any]:
+    async def _extract_arkts_rules_with_ai(self, html_content: str) -> Dict[str, Any]:
         """
         使用AI从HTML内容中提取arkts-no-*规则
 
@@ -161,23 +177,27 @@ class ArkTSRulesExtractor:
             Dict: 提取结果，包含success和rules字段
         """
         try:
-            # 使用BeautifulSoup清理HTML，提取纯文本
-            soup = BeautifulSoup(html_content, 'html.parser')
-
-            # 移除script和style标签
-            for script in soup(["script", "style"]):
-                script.decompose()
+            # 精简HTML为Markdown，去除导航等样板内容但保留表格和代码块
+            report = HTMLReducer().reduce_with_report(html_content)
+            text_content = report['content']
 
-            # 获取纯文本内容
-            text_content = soup.get_text()
-
-            print(f"📝 准备AI提取，文本长度: {len(text_content)} 字符")
+            print(f"📝 准备AI提取，内容精简: 约{report['tokens_before']} → {report['tokens_after']} tokens "
+                  f"(-{report['reduction_ratio'] * 100:.0f}%)")
 
             # 构建AI提示词
             extraction_prompt = self._build_arkts_extraction_prompt(text_content)
 
-            # 直接使用Gemini API提取规则
-            ai_response = self.gemini_api.generate_text(extraction_prompt)
+            # 按规则解析路由调用模型，页面文本未变化时直接复用缓存结果；解析不出规则时升级模型
+            async def call(gemini_api: GenerationBackend) -> str:
+                if self.result_cache:
+                    return await self.result_cache.aget_or_generate(
+                        'arkts_rules', ARKTS_PROMPT_VERSION, gemini_api, extraction_prompt,
+                        validator=self.model_router.get_validator('lint_rules', gemini_api, self._validate_ai_response),
+                        remember_rejection=True
+                    )
+                return await gemini_api.agenerate_text(extraction_prompt)
+
+            ai_response = await self.model_router.agenerate('lint_rules', call, self._validate_ai_response)
 
             if not ai_response:
                 return {
@@ -209,18 +229,16 @@ class ArkTSRulesExtractor:
                 "error": f"AI提取过程错误: {str(e)}"
             }
 
-    def _build_arkts_extraction_prompt(self, content: str) -> str:
+    @staticmethod
+    def _get_arkts_extraction_instruction() -> str:
         """
-        构建ArkTS规则提取的AI提示词
-
-        Args:
-            content: 页面文本内容
+        获取ArkTS规则提取的固定指令，作为提示词前缀以便复用上下文缓存
 
         Returns:
-            str: AI提示词
+            str: 固定指令
         """
-        prompt = f"""
-请从以下华为HarmonyOS ArkTS迁移指南内容中，提取所有的ArkTS Lint规则（以"arkts-no-"开头的规则）。
+        return """
+请从指令后提供的华为HarmonyOS ArkTS迁移指南内容中，提取所有的ArkTS Lint规则（以"arkts-no-"开头的规则）。
 
 任务要求：
 1. 找出所有以"arkts-no-"开头的规则名称
@@ -228,25 +246,21 @@ class ArkTSRulesExtractor:
 3. 规则名称统一转换为小写
 4. 按照指定的JSON格式返回
 
-请仔细阅读以下内容并提取规则：
-
-{content}
-
 请以以下JSON格式返回提取的规则：
 ```json
 [
-  {{
+  {
     "name": "arkts-no-xxx",
     "severity": "error",
     "description": "规则的详细描述",
     "suggestion": "建议的替代实践方式"
-  }},
-  {{
+  },
+  {
     "name": "arkts-no-yyy",
     "severity": "error",
     "description": "规则的详细描述",
     "suggestion": "建议的替代实践方式"
-  }}
+  }
 ]
 ```
 
@@ -259,7 +273,35 @@ class ArkTSRulesExtractor:
 - 如果同一个规则出现多次，只保留一次
 - 严重程度统一设置为"error"
 """
-        return prompt
+
+    def _build_arkts_extraction_prompt(self, content: str) -> str:
+        """
+        构建ArkTS规则提取的AI提示词，固定指令在前、页面内容在后
+
+        Args:
+            content: 页面文本内容
+
+        Returns:
+            str: AI提示词
+        """
+        return self._get_arkts_extraction_instruction() + f"""
+请仔细阅读以下内容并提取规则：
+
+{content}
+"""
+
+    def _validate_ai_response(self, ai_response: str) -> None:
+        """
+        校验AI返回的文本能解析出规则
+
+        Args:
+            ai_response: AI返回的原始文本
+
+        Raises:
+            ValueError: 没有解析出任何arkts-no-*规则时抛出
+        """
+        if not self._parse_ai_response_text(ai_response or ""):
+            raise ValueError("未解析出arkts-no-*规则")
 
     def _parse_ai_response_text(self, ai_response: str) -> List[Dict[str, str]]:
         """
@@ -492,5 +534,5 @@ ArkTS（TypeScript的子集）的Lint规则，用于确保代码符合HarmonyOS
             'ai_processor_ready': self.gemini_api is not None,
             'output_directory': str(self.output_dir),
             'output_directory_exists': self.output_dir.exists(),
-            'extraction_method': 'AI-powered (Gemini)'
+            'extraction_method': f"AI-powered ({self.gemini_api.backend_name if self.gemini_api else 'Gemini'})"
         }
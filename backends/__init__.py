@@ -0,0 +1,47 @@
+"""
+生成后端包
+提供统一的文本生成后端接口及Gemini、OpenAI兼容接口、本地模拟实现
+"""
+
+import os
+from typing import Dict, Any, Optional
+from dotenv import load_dotenv
+from .base import (
+    GenerationBackend, GenerationError, GenerationRateLimitError, GenerationTimeoutError,
+    GenerationServerError, GenerationContentBlockedError, GenerationCircuitOpenError
+)
+from .http_client import HTTPClientOptions
+from .openai_compatible import OpenAICompatibleBackend
+from .fake import FakeBackend, FakeBackendError
+
+BACKEND_NAMES = ('gemini', 'openai', 'fake')
+
+
+def create_backend(name: Optional[str] = None, http_settings: Optional[Dict[str, Any]] = None) -> GenerationBackend:
+    """
+    按名称创建生成后端
+
+    Args:
+        name: 后端名称（gemini/openai/fake），为None时从环境变量LLM_BACKEND读取，默认gemini
+        http_settings: HTTP连接配置（连接池、保活、超时、HTTP/2），为None时使用默认值
+
+    Returns:
+        GenerationBackend: 后端实例
+    """
+    load_dotenv()
+    name = (name or os.getenv('LLM_BACKEND') or 'gemini').lower()
+    if name == 'gemini':
+        # gemini_api依赖本包的base模块，在函数内导入以避免循环导入
+        from gemini_api import GeminiAPI
+        return GeminiAPI(http_client_options=HTTPClientOptions(http_settings))
+    if name == 'openai':
+        return OpenAICompatibleBackend(http_client_options=HTTPClientOptions(http_settings))
+    if name == 'fake':
+        return FakeBackend()
+    raise ValueError(f"未知的生成后端: {name}，可选: {', '.join(BACKEND_NAMES)}")
+
+
+__all__ = ['GenerationBackend', 'GenerationError', 'GenerationRateLimitError', 'GenerationTimeoutError',
+           'GenerationServerError', 'GenerationContentBlockedError', 'GenerationCircuitOpenError',
+           'HTTPClientOptions', 'OpenAICompatibleBackend', 'FakeBackend', 'FakeBackendError', 'BACKEND_NAMES',
+           'create_backend']
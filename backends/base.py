@@ -0,0 +1,550 @@
+"""
+生成后端接口模块
+定义大模型生成后端的抽象接口、通用异常，以及各后端共用的重试、熔断与流式写入逻辑
+"""
+
+import asyncio
+import random
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Tuple
+from utils import CircuitBreaker, UsageTracker
+
+
+class GenerationError(RuntimeError):
+    """生成调用失败的基础异常"""
+
+    # 是否值得重试
+    retryable = False
+
+    def __init__(self, message, retry_after=None, status_code=None):
+        """
+        初始化异常
+
+        Args:
+            message (str): 错误信息
+            retry_after (float, optional): 服务端建议的重试等待秒数
+            status_code (int, optional): HTTP状态码
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class GenerationRateLimitError(GenerationError):
+    """请求频率或配额超限（429）"""
+    retryable = True
+
+
+class GenerationTimeoutError(GenerationError):
+    """请求超时"""
+    retryable = True
+
+
+class GenerationServerError(GenerationError):
+    """服务端错误（5xx），通常是暂时性的"""
+    retryable = True
+
+
+class GenerationContentBlockedError(GenerationError):
+    """提示词或生成内容被安全策略拦截，重试无意义"""
+
+
+class GenerationCircuitOpenError(GenerationError):
+    """连续失败过多，熔断器处于打开状态"""
+
+
+class GenerationBackend(ABC):
+    """大模型生成后端的抽象接口，提供同步、异步与流式生成"""
+
+    # 日志中显示的后端名称
+    backend_name = "生成后端"
+
+    # 是否支持批处理任务（submit_batch/get_batch_results）
+    supports_batch = False
+
+    # 错误分类使用的异常类型，后端可替换为自己的子类
+    error_types = {
+        'error': GenerationError,
+        'rate_limit': GenerationRateLimitError,
+        'timeout': GenerationTimeoutError,
+        'server': GenerationServerError
+    }
+
+    # 没有状态码时表示配额超限的错误信息标记（如gRPC状态名）
+    rate_limit_markers = ()
+
+    # 没有状态码时按服务端错误重试的网络异常类型名，类型名包含connection的异常也按此处理
+    network_error_names = ()
+
+    def __init__(self, model_name: str, max_in_flight: int = 4, max_retries: int = 4, temperature: float = 0.7):
+        """
+        初始化后端的通用配置
+
+        Args:
+            model_name: 模型名称
+            max_in_flight: 异步调用的最大并发请求数
+            max_retries: 可重试错误的最大重试次数
+            temperature: 温度参数
+        """
+        self.model_name = model_name
+        self.temperature = temperature
+
+        # 异步调用并发上限，信号量在首次异步调用时创建
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._semaphore = None
+
+        # 重试与熔断配置
+        self.max_retries = int(max_retries)
+        self.backoff_base = 2.0  # 指数退避的初始等待秒数
+        self.backoff_max = 60.0  # 单次退避的最大等待秒数
+        self.circuit_breaker = CircuitBreaker(failure_threshold=5, reset_timeout=60.0)
+        self.max_circuit_wait = 300.0  # 熔断时最多暂停的秒数，超过则直接失败
+
+        # 流式调用超过该秒数没有新内容时视为卡住，按超时重试
+        self.stream_idle_timeout = 60.0
+
+        self.usage = UsageTracker()
+
+        # HTTP连接配置与连接复用统计，由发起HTTP请求的后端设置
+        self.http_client_options = None
+
+    @abstractmethod
+    def generate_text(self, prompt: str, response_schema=None) -> str:
+        """
+        生成文本，可重试错误按指数退避重试
+
+        Args:
+            prompt: 提示词
+            response_schema: 响应结构（pydantic模型），设置后返回符合该结构的JSON文本
+
+        Returns:
+            str: 生成的文本
+
+        Raises:
+            GenerationError: 重试耗尽或遇到不可重试错误时抛出
+        """
+
+    @abstractmethod
+    async def agenerate_text(self, prompt: str, response_schema=None) -> str:
+        """
+        generate_text的异步版本，不阻塞事件循环
+
+        Args:
+            prompt: 提示词
+            response_schema: 响应结构（pydantic模型），设置后返回符合该结构的JSON文本
+
+        Returns:
+            str: 生成的文本
+        """
+
+    @abstractmethod
+    def for_model(self, model_name: str) -> 'GenerationBackend':
+        """
+        创建使用另一个模型、其余配置相同的实例，共享用量统计
+
+        Args:
+            model_name: 模型名称
+
+        Returns:
+            GenerationBackend: 新实例
+        """
+
+    def get_rate_limits(self) -> Dict[str, float]:
+        """
+        获取客户端限流配额，默认不限流
+
+        Returns:
+            Dict: 包含rpm和tpm的字典
+        """
+        return {'rpm': float('inf'), 'tpm': float('inf')}
+
+    def get_usage_summary(self) -> Dict[str, Any]:
+        """
+        获取本次运行的调用用量汇总
+
+        Returns:
+            Dict: 后端、模型、配额、用量统计与连接复用统计
+        """
+        return {
+            'backend': self.backend_name,
+            'model': self.model_name,
+            'limits': self.get_rate_limits(),
+            **self.usage.get_summary(),
+            'connections': self.http_client_options.get_summary() if self.http_client_options else None
+        }
+
+    def register_shared_prefix(self, prefix: str) -> None:
+        """
+        注册多个请求共用的固定提示词前缀，不支持上下文缓存的后端忽略
+
+        Args:
+            prefix: 固定前缀
+        """
+
+    def delete_context_caches(self) -> None:
+        """删除本次运行创建的上下文缓存，不支持上下文缓存的后端无需处理"""
+
+    def submit_batch(self, prompts, display_name):
+        """提交批处理任务，仅supports_batch为True的后端实现"""
+        raise NotImplementedError(f"{self.backend_name}不支持批处理任务")
+
+    def get_batch_results(self, job_name):
+        """查询批处理任务，仅supports_batch为True的后端实现"""
+        raise NotImplementedError(f"{self.backend_name}不支持批处理任务")
+
+    async def astream_text_to_file(self, prompt: str, output_path: Path) -> Dict[str, Any]:
+        """
+        流式生成文本并逐块写入临时文件，完成后原子替换为目标文件；
+        重试时从头重新生成，失败时不会留下半写的目标文件
+
+        Args:
+            prompt: 提示词
+            output_path: 目标文件路径
+
+        Returns:
+            Dict: 包含chars（写入字符数）、ttft（首token耗时秒数）、latency（总耗时秒数）
+
+        Raises:
+            GenerationError: 重试耗尽或遇到不可重试错误时抛出
+        """
+        output_path = Path(output_path)
+        temp_path = output_path.with_name(f".{output_path.name}.tmp")
+
+        async def stream_once(call_state: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                result = await self._stream_to_file(prompt, temp_path, call_state)
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
+            if result['ttft'] is not None:
+                self.usage.record_ttft(result['ttft'])
+            temp_path.replace(output_path)
+            return result
+
+        return await self._arun_with_retry(stream_once, prompt)
+
+    async def _stream_to_file(self, prompt: str, temp_path: Path, call_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        执行一次流式调用并把内容块写入临时文件
+
+        Args:
+            prompt: 提示词
+            temp_path: 临时文件路径
+            call_state: 本次尝试的状态
+
+        Returns:
+            Dict: 包含chars、ttft、latency
+
+        Raises:
+            GenerationTimeoutError: 超过stream_idle_timeout没有新内容时抛出
+        """
+        started_at = time.monotonic()
+        iterator = self._astream_text(prompt, call_state).__aiter__()
+        chars = 0
+        ttft = None
+
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                while True:
+                    try:
+                        text = await asyncio.wait_for(iterator.__anext__(), timeout=self.stream_idle_timeout)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        raise GenerationTimeoutError(
+                            f"流式响应超过{self.stream_idle_timeout:.0f}秒没有新内容，已写入{chars}个字符"
+                        )
+                    if not text:
+                        continue
+                    if ttft is None:
+                        ttft = time.monotonic() - started_at
+                    f.write(text)
+                    chars += len(text)
+        finally:
+            # 超时或出错时关闭流，释放底层的HTTP响应与连接
+            await iterator.aclose()
+
+        if chars == 0:
+            raise GenerationError("流式响应为空")
+        return {'chars': chars, 'ttft': ttft, 'latency': time.monotonic() - started_at}
+
+    async def _astream_text(self, prompt: str, call_state: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        逐块产生生成的文本，默认一次性返回非流式结果；支持流式接口的后端覆盖此方法
+
+        Args:
+            prompt: 提示词
+            call_state: 本次尝试的状态
+
+        Yields:
+            str: 文本块
+        """
+        yield await self._agenerate_once(prompt, None, call_state)
+
+    async def _agenerate_once(self, prompt: str, response_schema, call_state: Dict[str, Any]) -> str:
+        """执行一次不重试的异步生成，由使用_arun_with_retry的后端实现"""
+        raise NotImplementedError
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取限制并发请求数的信号量"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphore
+
+    @staticmethod
+    def _parse_retry_after(error: Exception) -> Optional[float]:
+        """
+        从异常附带的响应头中解析服务端建议的重试等待时间
+
+        Args:
+            error: 原始异常
+
+        Returns:
+            float: 等待秒数，没有时返回None
+        """
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        value = headers.get('retry-after') if hasattr(headers, 'get') else None
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+    def _classify_error(self, error: Exception) -> GenerationError:
+        """
+        将客户端异常转换为类型化异常
+
+        Args:
+            error: 原始异常
+
+        Returns:
+            GenerationError: 类型化异常
+        """
+        if isinstance(error, GenerationError):
+            return error
+
+        message = f"{self.backend_name}调用失败: {str(error)}"
+        status_code = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+        if not isinstance(status_code, int):
+            status_code = None
+        error_name = type(error).__name__
+
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError)) or 'timeout' in error_name.lower():
+            return self.error_types['timeout'](message)
+        if status_code == 429 or any(marker in str(error) for marker in self.rate_limit_markers):
+            return self.error_types['rate_limit'](message, self._parse_retry_after(error), status_code)
+        if status_code in (408, 504):
+            return self.error_types['timeout'](message, self._parse_retry_after(error), status_code)
+        if status_code is not None and status_code >= 500:
+            return self.error_types['server'](message, self._parse_retry_after(error), status_code)
+        if status_code is None and (error_name in self.network_error_names or 'connection' in error_name.lower()):
+            # 连接被重置等网络错误按服务端错误重试
+            return self.error_types['server'](message)
+        return self.error_types['error'](message, status_code=status_code)
+
+    def _get_backoff_delay(self, attempt: int, error: GenerationError) -> float:
+        """
+        计算重试等待时间：带完全抖动的指数退避，服务端给出retry-after时不短于该值
+
+        Args:
+            attempt: 已重试次数（从0开始）
+            error: 本次失败的异常
+
+        Returns:
+            float: 等待秒数
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if error.retry_after:
+            delay = max(delay, error.retry_after)
+        return delay
+
+    def _check_circuit(self) -> float:
+        """
+        检查熔断状态
+
+        Returns:
+            float: 需要暂停的秒数，0表示可以调用
+        """
+        remaining = self.circuit_breaker.remaining_open_time()
+        if remaining > self.max_circuit_wait:
+            raise GenerationCircuitOpenError(f"{self.backend_name}连续失败已熔断，{remaining:.0f}秒后恢复")
+        if remaining > 0:
+            print(f"⏸️ {self.backend_name}连续失败已熔断，暂停 {remaining:.0f} 秒后重试")
+        return remaining
+
+    def _record_failure(self, error: GenerationError) -> None:
+        """
+        记录可重试失败，连续失败达到阈值时打开熔断器
+
+        Args:
+            error: 失败异常
+        """
+        if error.retryable and self.circuit_breaker.record_failure():
+            print(f"🔌 {self.backend_name}连续失败 {self.circuit_breaker.consecutive_failures} 次，"
+                  f"熔断 {self.circuit_breaker.reset_timeout:.0f} 秒")
+
+    def _reserve_quota(self, prompt: str) -> Tuple[float, Any]:
+        """
+        每次尝试调用前预占客户端配额，默认不限流
+
+        Args:
+            prompt: 提示词
+
+        Returns:
+            Tuple: (需要等待的秒数, 预占的配额)，预占的配额保存在本次尝试状态的reservation中
+        """
+        return 0.0, None
+
+    def _record_failed_call(self, call_state: Dict[str, Any], latency: float) -> None:
+        """
+        记录未产生用量的失败尝试，限流的后端在此退还预占的配额
+
+        Args:
+            call_state: 本次尝试的状态
+            latency: 调用耗时（秒）
+        """
+        self.usage.record_failure(latency)
+
+    def _recover_from_error(self, error: GenerationError, call_state: Dict[str, Any]) -> bool:
+        """
+        不可重试的错误由请求本身引起时调整请求（如作废失效的上下文缓存），默认不处理
+
+        Args:
+            error: 分类后的异常
+            call_state: 本次尝试的状态
+
+        Returns:
+            bool: 是否已调整，为True时立即重试一次
+        """
+        return False
+
+    def _classify_call_error(self, e: Exception, call_state: Dict[str, Any], latency: float) -> GenerationError:
+        """
+        分类一次失败尝试的异常，尝试未记录用量时记为失败调用
+
+        Args:
+            e: 原始异常
+            call_state: 本次尝试的状态
+            latency: 调用耗时（秒）
+
+        Returns:
+            GenerationError: 分类后的异常
+        """
+        if not call_state['usage_recorded']:
+            self._record_failed_call(call_state, latency)
+        return self._classify_error(e)
+
+    def _get_retry_delay(self, error: GenerationError, attempt: int) -> Optional[float]:
+        """
+        记录失败并计算重试前的等待时间
+
+        Args:
+            error: 分类后的异常
+            attempt: 已重试次数（从0开始）
+
+        Returns:
+            float: 等待秒数，不可重试或重试耗尽时返回None
+        """
+        self._record_failure(error)
+        if not error.retryable or attempt >= self.max_retries:
+            return None
+
+        delay = self._get_backoff_delay(attempt, error)
+        print(f"⚠️ {type(error).__name__}，{delay:.1f}秒后重试 ({attempt + 1}/{self.max_retries})")
+        return delay
+
+    def _run_with_retry(self, call: Callable[[Dict[str, Any]], Any], prompt: str = "") -> Any:
+        """
+        执行同步调用，可重试错误按指数退避重试，连续失败时熔断
+
+        Args:
+            call: 执行一次调用的函数，接收本次尝试的状态（reservation为预占的配额）；
+                  记录用量后应把状态中的usage_recorded设为True
+            prompt: 提示词，用于预占客户端配额
+
+        Returns:
+            Any: 调用结果
+
+        Raises:
+            GenerationError: 重试耗尽或遇到不可重试错误时抛出
+        """
+        attempt = 0
+        recovered = False
+        while True:
+            pause = self._check_circuit()
+            if pause > 0:
+                time.sleep(pause)
+
+            # 客户端限流，避免触发服务端限制
+            wait_time, reservation = self._reserve_quota(prompt)
+            if wait_time > 0:
+                time.sleep(wait_time)
+
+            call_state = {'reservation': reservation, 'usage_recorded': False}
+            started_at = time.monotonic()
+            try:
+                result = call(call_state)
+                self.circuit_breaker.record_success()
+                return result
+            except Exception as e:
+                error = self._classify_call_error(e, call_state, time.monotonic() - started_at)
+                # 调整请求后的立即重试每次调用最多一次，并计入重试次数
+                if not recovered and attempt < self.max_retries and self._recover_from_error(error, call_state):
+                    recovered = True
+                    attempt += 1
+                    continue
+
+                delay = self._get_retry_delay(error, attempt)
+                if delay is None:
+                    raise error from e
+                time.sleep(delay)
+                attempt += 1
+
+    async def _arun_with_retry(self, call: Callable[[Dict[str, Any]], Awaitable[Any]], prompt: str = "") -> Any:
+        """
+        _run_with_retry的异步版本，调用期间占用并发名额，限流、退避与熔断等待期间不占用
+
+        Args:
+            call: 执行一次调用的协程函数，接收本次尝试的状态；记录用量后应把状态中的usage_recorded设为True
+            prompt: 提示词，用于预占客户端配额
+
+        Returns:
+            Any: 调用结果
+
+        Raises:
+            GenerationError: 重试耗尽或遇到不可重试错误时抛出
+        """
+        attempt = 0
+        recovered = False
+        while True:
+            pause = self._check_circuit()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            wait_time, reservation = self._reserve_quota(prompt)
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+
+            call_state = {'reservation': reservation, 'usage_recorded': False}
+            started_at = time.monotonic()
+            try:
+                async with self._get_semaphore():
+                    started_at = time.monotonic()
+                    result = await call(call_state)
+                self.circuit_breaker.record_success()
+                return result
+            except Exception as e:
+                error = self._classify_call_error(e, call_state, time.monotonic() - started_at)
+                # 调整请求后的立即重试每次调用最多一次，并计入重试次数
+                if not recovered and attempt < self.max_retries and self._recover_from_error(error, call_state):
+                    recovered = True
+                    attempt += 1
+                    continue
+
+                delay = self._get_retry_delay(error, attempt)
+                if delay is None:
+                    raise error from e
+                await asyncio.sleep(delay)
+                attempt += 1
@@ -0,0 +1,264 @@
+"""
+本地模拟后端模块
+不发起网络请求，按配置模拟延迟、限流与失败，输出由提示词确定，用于离线压测流水线
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, AsyncIterator, Optional
+from utils import TokenHelper
+from .base import GenerationBackend
+
+
+class FakeBackendError(Exception):
+    """模拟的HTTP错误，按状态码分类后参与重试与熔断"""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class FakeBackend(GenerationBackend):
+    """确定性的本地模拟后端"""
+
+    backend_name = "模拟后端"
+
+    def __init__(
+        self,
+        model_name: str = "fake-model",
+        base_latency_ms: Optional[float] = None,
+        per_token_latency_ms: Optional[float] = None,
+        output_tokens: Optional[int] = None,
+        rpm_limit: Optional[float] = None,
+        failure_rate: Optional[float] = None,
+        seed: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        max_retries: Optional[int] = None
+    ):
+        """
+        初始化模拟后端，未指定的参数从FAKE_LLM_*环境变量读取
+
+        Args:
+            model_name: 模型名称
+            base_latency_ms: 每次调用的固定延迟（毫秒），默认200
+            per_token_latency_ms: 每个输出token增加的延迟（毫秒），默认1
+            output_tokens: 每次返回的输出token数（估算），默认600
+            rpm_limit: 每分钟最多接受的请求数，超出时返回429，0表示不限流
+            failure_rate: 随机返回503的概率（0~1）
+            seed: 失败注入的随机种子，相同种子与调用顺序下结果可复现
+            max_in_flight: 异步调用的最大并发请求数，默认8
+            max_retries: 可重试错误的最大重试次数，默认4
+        """
+        super().__init__(
+            model_name=model_name,
+            max_in_flight=max_in_flight or os.getenv('FAKE_LLM_MAX_IN_FLIGHT') or 8,
+            max_retries=max_retries if max_retries is not None else os.getenv('FAKE_LLM_MAX_RETRIES') or 4
+        )
+        self.base_latency_ms = float(base_latency_ms if base_latency_ms is not None
+                                     else os.getenv('FAKE_LLM_LATENCY_MS') or 200)
+        self.per_token_latency_ms = float(per_token_latency_ms if per_token_latency_ms is not None
+                                          else os.getenv('FAKE_LLM_TOKEN_LATENCY_MS') or 1)
+        self.output_tokens = int(output_tokens or os.getenv('FAKE_LLM_OUTPUT_TOKENS') or 600)
+        self.rpm_limit = float(rpm_limit if rpm_limit is not None else os.getenv('FAKE_LLM_RPM') or 0)
+        self.failure_rate = float(failure_rate if failure_rate is not None else os.getenv('FAKE_LLM_FAILURE_RATE') or 0)
+        self.seed = int(seed if seed is not None else os.getenv('FAKE_LLM_SEED') or 0)
+
+        # 退避时间缩短到毫秒级，避免模拟的失败主导压测耗时
+        self.backoff_base = 0.05
+        self.backoff_max = 1.0
+
+        self._random = random.Random(self.seed)
+        self._request_times: deque = deque()
+        self._lock = threading.Lock()
+
+    def for_model(self, model_name: str) -> 'FakeBackend':
+        """
+        创建使用另一个模型名称、其余配置相同的实例，共享用量统计
+
+        Args:
+            model_name: 模型名称
+
+        Returns:
+            FakeBackend: 新实例
+        """
+        backend = FakeBackend(
+            model_name=model_name,
+            base_latency_ms=self.base_latency_ms,
+            per_token_latency_ms=self.per_token_latency_ms,
+            output_tokens=self.output_tokens,
+            rpm_limit=self.rpm_limit,
+            failure_rate=self.failure_rate,
+            seed=self.seed,
+            max_in_flight=self.max_in_flight,
+            max_retries=self.max_retries
+        )
+        backend.temperature = self.temperature
+        backend.usage = self.usage
+        return backend
+
+    def _admit(self) -> None:
+        """
+        模拟服务端的限流与失败
+
+        Raises:
+            FakeBackendError: 超过每分钟请求数（429）或命中失败注入（503）时抛出
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.rpm_limit > 0:
+                while self._request_times and now - self._request_times[0] >= 60:
+                    self._request_times.popleft()
+                if len(self._request_times) >= self.rpm_limit:
+                    retry_after = 60 - (now - self._request_times[0])
+                    raise FakeBackendError("模拟限流: 超过每分钟请求数", 429, retry_after)
+                self._request_times.append(now)
+
+            if self.failure_rate > 0 and self._random.random() < self.failure_rate:
+                raise FakeBackendError("模拟服务端错误", 503)
+
+    @staticmethod
+    def _parse_retry_after(error: Exception) -> Optional[float]:
+        """读取模拟错误携带的重试等待时间"""
+        return getattr(error, 'retry_after', None)
+
+    def _build_output(self, prompt: str, response_schema=None) -> str:
+        """
+        按提示词类型构建符合格式、长度约为output_tokens的输出，相同提示词输出相同
+
+        Args:
+            prompt: 提示词
+            response_schema: 响应结构，设置时返回JSON
+
+        Returns:
+            str: 生成内容
+        """
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]
+        if response_schema is not None:
+            practices = [
+                {'category': f"模拟类别{index}", 'principle': f"模拟实践原则{digest}-{index}",
+                 'do': ["使用LazyForEach渲染长列表"], 'dont': ["在build中执行耗时操作"],
+                 'code_sample': "", 'source_anchor': f"章节{index}"}
+                for index in range(1, max(2, self.output_tokens // 100))
+            ]
+            return json.dumps({'summary': f"模拟的提取结果 {digest}", 'practices': practices}, ensure_ascii=False)
+
+        if "arkts-no-" in prompt:
+            rules = [{'name': f"arkts-no-fake-{index}", 'severity': "error",
+                      'description': "模拟规则描述", 'suggestion': "模拟替代方案"} for index in range(1, 4)]
+            return f"```json\n{json.dumps(rules, ensure_ascii=False, indent=2)}\n```"
+
+        if "Cursor Rules" in prompt:
+            header = (f"# HarmonyOS 模拟模块 - Cursor Rules\n\n你正在为HarmonyOS应用开发相关功能。\n\n"
+                      f"## 核心原则\n\n- 模拟原则 {digest}\n\n## 推荐做法\n\n## 禁止做法\n\n")
+        else:
+            header = f"# 模拟模块 - 最佳实践\n\n## 📋 概述\n模拟的提取结果 {digest}。\n\n## 🎯 最佳实践\n\n"
+
+        lines = [header]
+        tokens = TokenHelper.estimate_tokens(header)
+        index = 1
+        while tokens < self.output_tokens:
+            line = f"### {index}. 实践要点{index}\n- **实践要点**：使用LazyForEach渲染长列表并设置cachedCount\n\n"
+            lines.append(line)
+            tokens += TokenHelper.estimate_tokens(line)
+            index += 1
+        return "".join(lines)
+
+    def _get_latency(self, text: str) -> float:
+        """按输出长度计算模拟延迟（秒）"""
+        return (self.base_latency_ms + self.per_token_latency_ms * TokenHelper.estimate_tokens(text)) / 1000
+
+    def generate_text(self, prompt: str, response_schema=None) -> str:
+        """
+        模拟生成文本
+
+        Args:
+            prompt: 提示词
+            response_schema: 响应结构（pydantic模型），设置后返回JSON文本
+
+        Returns:
+            str: 生成的文本
+        """
+        def call(call_state: Dict[str, Any]) -> str:
+            self._admit()
+            text = self._build_output(prompt, response_schema)
+            latency = self._get_latency(text)
+            time.sleep(latency)
+            self.usage.record(TokenHelper.estimate_tokens(prompt), TokenHelper.estimate_tokens(text), latency)
+            call_state['usage_recorded'] = True
+            return text
+
+        return self._run_with_retry(call, prompt)
+
+    async def agenerate_text(self, prompt: str, response_schema=None) -> str:
+        """
+        generate_text的异步版本
+
+        Args:
+            prompt: 提示词
+            response_schema: 响应结构（pydantic模型），设置后返回JSON文本
+
+        Returns:
+            str: 生成的文本
+        """
+        return await self._arun_with_retry(
+            lambda call_state: self._agenerate_once(prompt, response_schema, call_state), prompt
+        )
+
+    async def _agenerate_once(self, prompt: str, response_schema, call_state: Dict[str, Any]) -> str:
+        """执行一次不重试的异步模拟生成"""
+        self._admit()
+        text = self._build_output(prompt, response_schema)
+        latency = self._get_latency(text)
+        await asyncio.sleep(latency)
+        self.usage.record(TokenHelper.estimate_tokens(prompt), TokenHelper.estimate_tokens(text), latency)
+        call_state['usage_recorded'] = True
+        return text
+
+    async def _astream_text(self, prompt: str, call_state: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        固定延迟后返回首块，之后按每块的token数延迟
+
+        Args:
+            prompt: 提示词
+            call_state: 本次尝试的状态
+
+        Yields:
+            str: 文本块
+        """
+        self._admit()
+        started_at = time.monotonic()
+        text = self._build_output(prompt)
+        lines = text.splitlines(keepends=True)
+        chunk_size = max(1, len(lines) // 8)
+
+        await asyncio.sleep(self.base_latency_ms / 1000)
+        for index in range(0, len(lines), chunk_size):
+            chunk = "".join(lines[index:index + chunk_size])
+            await asyncio.sleep(self.per_token_latency_ms * TokenHelper.estimate_tokens(chunk) / 1000)
+            yield chunk
+        self.usage.record(TokenHelper.estimate_tokens(prompt), TokenHelper.estimate_tokens(text),
+                          time.monotonic() - started_at)
+        call_state['usage_recorded'] = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取模拟参数
+
+        Returns:
+            Dict: 延迟、限流与失败注入配置
+        """
+        return {
+            'base_latency_ms': self.base_latency_ms,
+            'per_token_latency_ms': self.per_token_latency_ms,
+            'output_tokens': self.output_tokens,
+            'rpm_limit': self.rpm_limit,
+            'failure_rate': self.failure_rate,
+            'seed': self.seed
+        }
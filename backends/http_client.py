@@ -0,0 +1,166 @@
+"""
+HTTP连接配置模块
+为各后端的httpx客户端统一设置连接池、空闲连接保活、超时与HTTP/2，并统计连接复用情况
+"""
+
+import importlib.util
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Any, Optional, Callable
+import httpx
+
+
+class HTTPClientOptions:
+    """模型接口的HTTP连接配置与连接复用统计，同一后端的各模型实例共享"""
+
+    DEFAULT_SETTINGS = {
+        'pool_size': 16,  # 最大连接数
+        'keepalive_connections': 16,  # 保持的空闲连接数，0表示请求结束即关闭连接
+        'keepalive_expiry': 60.0,  # 空闲连接保持时间（秒）
+        'connect_timeout': 10.0,  # 建立连接（含TLS握手）超时（秒）
+        'request_timeout': 600.0,  # 单次请求超时（秒），流式请求为两次读取之间的最长间隔
+        'http2': False  # 是否启用HTTP/2，需要安装h2
+    }
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        """
+        初始化连接配置
+
+        Args:
+            settings: 连接配置，键同DEFAULT_SETTINGS，未提供的键使用默认值
+        """
+        self.settings = {**self.DEFAULT_SETTINGS, **(settings or {})}
+        self.http2 = bool(self.settings['http2']) and self._has_h2()
+
+        # 同步与异步连接池各一个，在首次创建客户端时建立，各模型实例的客户端共用
+        self._transport: Optional[httpx.HTTPTransport] = None
+        self._async_transport: Optional[httpx.AsyncHTTPTransport] = None
+
+        # 连接复用统计
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.connect_time = 0.0
+        self.http_versions: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def _has_h2() -> bool:
+        """检查HTTP/2依赖是否可用"""
+        if importlib.util.find_spec('h2') is not None:
+            return True
+        print("⚠️ 未安装h2，HTTP/2未启用，继续使用HTTP/1.1（pip install httpx[http2]）")
+        return False
+
+    @property
+    def request_timeout(self) -> float:
+        """单次请求超时（秒）"""
+        return float(self.settings['request_timeout'])
+
+    def get_limits(self) -> httpx.Limits:
+        """
+        获取连接池限制
+
+        Returns:
+            httpx.Limits: 最大连接数、空闲连接数与保活时间
+        """
+        pool_size = max(1, int(self.settings['pool_size']))
+        return httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=min(pool_size, max(0, int(self.settings['keepalive_connections']))),
+            keepalive_expiry=float(self.settings['keepalive_expiry'])
+        )
+
+    def get_client_args(self, asynchronous: bool = False) -> Dict[str, Any]:
+        """
+        获取创建httpx客户端的参数，同一配置创建的客户端共用连接池
+
+        Args:
+            asynchronous: 是否用于httpx.AsyncClient
+
+        Returns:
+            Dict: 包含transport、limits、http2与event_hooks的参数
+        """
+        limits = self.get_limits()
+        if asynchronous:
+            if self._async_transport is None:
+                self._async_transport = httpx.AsyncHTTPTransport(limits=limits, http2=self.http2)
+            transport = self._async_transport
+
+            async def on_request(request: httpx.Request) -> None:
+                self._on_request(request)
+
+            async def on_response(response: httpx.Response) -> None:
+                self._on_response(response)
+        else:
+            if self._transport is None:
+                self._transport = httpx.HTTPTransport(limits=limits, http2=self.http2)
+            transport = self._transport
+            on_request = self._on_request
+            on_response = self._on_response
+
+        # limits与http2同时作用于从环境变量读取的代理连接
+        return {
+            'transport': transport,
+            'limits': limits,
+            'http2': self.http2,
+            'event_hooks': {'request': [on_request], 'response': [on_response]}
+        }
+
+    def _on_request(self, request: httpx.Request) -> None:
+        """设置建连超时并挂载连接事件追踪"""
+        timeout = dict(request.extensions.get('timeout') or {})
+        timeout['connect'] = float(self.settings['connect_timeout'])
+        request.extensions['timeout'] = timeout
+        request.extensions['trace'] = self._create_tracer()
+        with self._lock:
+            self.requests += 1
+
+    def _on_response(self, response: httpx.Response) -> None:
+        """记录响应使用的HTTP版本"""
+        with self._lock:
+            self.http_versions[response.http_version] += 1
+
+    def _create_tracer(self) -> Callable[[str, Dict[str, Any]], None]:
+        """
+        创建单个请求的连接事件回调，只有新建连接时才会触发TCP连接与TLS握手事件
+
+        Returns:
+            Callable: httpcore的trace回调
+        """
+        started_at: Dict[str, float] = {}
+
+        def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name in ('connection.connect_tcp.started', 'connection.start_tls.started'):
+                started_at[event_name.rsplit('.', 1)[0]] = time.monotonic()
+            elif event_name in ('connection.connect_tcp.complete', 'connection.start_tls.complete'):
+                step = event_name.rsplit('.', 1)[0]
+                elapsed = time.monotonic() - started_at.pop(step, time.monotonic())
+                with self._lock:
+                    if step == 'connection.connect_tcp':
+                        self.new_connections += 1
+                    self.connect_time += elapsed
+
+        return trace
+
+    def get_summary(self) -> Dict[str, Any]:
+        """
+        获取连接复用统计
+
+        Returns:
+            Dict: 请求数、新建连接数、复用率、建连耗时、各HTTP版本的响应数与连接池配置
+        """
+        with self._lock:
+            requests = self.requests
+            new_connections = self.new_connections
+            return {
+                'requests': requests,
+                'new_connections': new_connections,
+                'reuse_rate': round(max(0.0, 1 - new_connections / requests), 3) if requests else 0.0,
+                'connect_time_total': round(self.connect_time, 3),
+                'connect_time_avg': round(self.connect_time / new_connections, 3) if new_connections else 0.0,
+                'http_versions': dict(self.http_versions),
+                'pool_size': int(self.settings['pool_size']),
+                'keepalive_connections': int(self.settings['keepalive_connections']),
+                'http2': self.http2
+            }
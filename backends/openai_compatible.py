@@ -0,0 +1,232 @@
+"""
+OpenAI兼容接口后端模块
+通过Chat Completions接口调用OpenAI或vLLM、Ollama等自托管的兼容服务
+"""
+
+import os
+import time
+from typing import Dict, Any, AsyncIterator, Optional
+import httpx
+from dotenv import load_dotenv
+from openai import OpenAI, AsyncOpenAI
+from .base import GenerationBackend, GenerationError, GenerationContentBlockedError
+from .http_client import HTTPClientOptions
+
+
+class OpenAICompatibleBackend(GenerationBackend):
+    """OpenAI兼容的Chat Completions接口后端"""
+
+    backend_name = "OpenAI兼容接口"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model_name: Optional[str] = None,
+        max_in_flight: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        timeout: Optional[float] = None,
+        http_client_options: Optional[HTTPClientOptions] = None
+    ):
+        """
+        初始化后端
+
+        Args:
+            api_key: API密钥，为None时从环境变量OPENAI_API_KEY读取；自托管服务不校验密钥时可留空
+            base_url: 接口根地址（如http://localhost:8000/v1），为None时从环境变量OPENAI_BASE_URL读取
+            model_name: 模型名称，为None时从环境变量OPENAI_MODEL读取
+            max_in_flight: 异步调用的最大并发请求数，为None时从环境变量OPENAI_MAX_IN_FLIGHT读取，默认8
+            max_retries: 可重试错误的最大重试次数，为None时从环境变量OPENAI_MAX_RETRIES读取，默认4
+            timeout: 单次请求超时秒数，为None时从环境变量OPENAI_TIMEOUT读取，未设置时使用连接配置的请求超时
+            http_client_options: HTTP连接池、保活、超时与HTTP/2配置，默认使用默认配置
+        """
+        load_dotenv()
+
+        model_name = model_name or os.getenv('OPENAI_MODEL')
+        if not model_name:
+            raise ValueError("未指定模型，也未在环境变量中找到OPENAI_MODEL")
+
+        super().__init__(
+            model_name=model_name,
+            max_in_flight=max_in_flight or os.getenv('OPENAI_MAX_IN_FLIGHT') or 8,
+            max_retries=max_retries if max_retries is not None else os.getenv('OPENAI_MAX_RETRIES') or 4
+        )
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY') or "EMPTY"
+        self.base_url = base_url or os.getenv('OPENAI_BASE_URL') or None
+        self.http_client_options = http_client_options or HTTPClientOptions()
+        self.timeout = float(timeout or os.getenv('OPENAI_TIMEOUT') or self.http_client_options.request_timeout)
+        self.stream_idle_timeout = float(os.getenv('OPENAI_STREAM_IDLE_TIMEOUT') or 60)
+
+        # 重试由本类统一处理，关闭SDK自带的重试；连接池按连接配置创建
+        self.client = OpenAI(
+            api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=0,
+            http_client=httpx.Client(**self.http_client_options.get_client_args())
+        )
+        self.async_client = AsyncOpenAI(
+            api_key=self.api_key, base_url=self.base_url, timeout=self.timeout, max_retries=0,
+            http_client=httpx.AsyncClient(**self.http_client_options.get_client_args(asynchronous=True))
+        )
+
+        print(f"已初始化OpenAI兼容客户端，使用模型: {self.model_name}"
+              + (f"（{self.base_url}）" if self.base_url else ""))
+
+    def for_model(self, model_name: str) -> 'OpenAICompatibleBackend':
+        """
+        创建使用另一个模型、其余配置相同的实例，共享用量统计
+
+        Args:
+            model_name: 模型名称
+
+        Returns:
+            OpenAICompatibleBackend: 新实例
+        """
+        backend = OpenAICompatibleBackend(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            model_name=model_name,
+            max_in_flight=self.max_in_flight,
+            max_retries=self.max_retries,
+            timeout=self.timeout,
+            http_client_options=self.http_client_options
+        )
+        backend.temperature = self.temperature
+        backend.usage = self.usage
+        return backend
+
+    def _build_request(self, prompt: str, response_schema=None) -> Dict[str, Any]:
+        """
+        构建Chat Completions请求参数
+
+        Args:
+            prompt: 提示词
+            response_schema: 响应结构（pydantic模型），设置后要求按JSON Schema输出
+
+        Returns:
+            Dict: 请求参数
+        """
+        request = {
+            'model': self.model_name,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'temperature': self.temperature
+        }
+        if response_schema is not None:
+            request['response_format'] = {
+                'type': 'json_schema',
+                'json_schema': {'name': response_schema.__name__, 'schema': response_schema.model_json_schema()}
+            }
+        return request
+
+    def _record_usage(self, usage, latency: float, call_state: Dict[str, Any]) -> None:
+        """
+        记录响应中的用量
+
+        Args:
+            usage: 响应的usage字段，可能为None
+            latency: 调用耗时（秒）
+            call_state: 本次尝试的状态
+        """
+        details = getattr(usage, 'prompt_tokens_details', None)
+        self.usage.record(
+            getattr(usage, 'prompt_tokens', None) or 0,
+            getattr(usage, 'completion_tokens', None) or 0,
+            latency,
+            getattr(details, 'cached_tokens', None) or 0
+        )
+        call_state['usage_recorded'] = True
+
+    @staticmethod
+    def _extract_text(response) -> str:
+        """
+        从响应中提取生成的文本
+
+        Args:
+            response: Chat Completions响应
+
+        Returns:
+            str: 生成的文本
+
+        Raises:
+            GenerationContentBlockedError: 内容被过滤时抛出
+            GenerationError: 响应为空时抛出
+        """
+        choices = getattr(response, 'choices', None) or []
+        if not choices:
+            raise GenerationError("API响应格式异常，没有返回候选结果")
+        if choices[0].finish_reason == 'content_filter':
+            raise GenerationContentBlockedError("生成内容被拦截: content_filter")
+        text = choices[0].message.content
+        if not text:
+            raise GenerationError("API响应格式异常，生成内容为空")
+        return text
+
+    def generate_text(self, prompt: str, response_schema=None) -> str:
+        """
+        生成文本，可重试错误按指数退避重试
+
+        Args:
+            prompt: 提示词
+            response_schema: 响应结构（pydantic模型），设置后返回符合该结构的JSON文本
+
+        Returns:
+            str: 生成的文本
+        """
+        def call(call_state: Dict[str, Any]) -> str:
+            started_at = time.monotonic()
+            response = self.client.chat.completions.create(**self._build_request(prompt, response_schema))
+            self._record_usage(response.usage, time.monotonic() - started_at, call_state)
+            return self._extract_text(response)
+
+        return self._run_with_retry(call, prompt)
+
+    async def agenerate_text(self, prompt: str, response_schema=None) -> str:
+        """
+        generate_text的异步版本，不阻塞事件循环
+
+        Args:
+            prompt: 提示词
+            response_schema: 响应结构（pydantic模型），设置后返回符合该结构的JSON文本
+
+        Returns:
+            str: 生成的文本
+        """
+        return await self._arun_with_retry(
+            lambda call_state: self._agenerate_once(prompt, response_schema, call_state), prompt
+        )
+
+    async def _agenerate_once(self, prompt: str, response_schema, call_state: Dict[str, Any]) -> str:
+        """执行一次不重试的异步生成"""
+        started_at = time.monotonic()
+        response = await self.async_client.chat.completions.create(**self._build_request(prompt, response_schema))
+        self._record_usage(response.usage, time.monotonic() - started_at, call_state)
+        return self._extract_text(response)
+
+    async def _astream_text(self, prompt: str, call_state: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        以流式接口逐块产生文本，结束时记录用量
+
+        Args:
+            prompt: 提示词
+            call_state: 本次尝试的状态
+
+        Yields:
+            str: 文本块
+        """
+        started_at = time.monotonic()
+        stream = await self.async_client.chat.completions.create(
+            **self._build_request(prompt), stream=True, stream_options={'include_usage': True}
+        )
+        usage = None
+        try:
+            async for chunk in stream:
+                usage = getattr(chunk, 'usage', None) or usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.finish_reason == 'content_filter':
+                    raise GenerationContentBlockedError("生成内容被拦截: content_filter")
+                if choice.delta and choice.delta.content:
+                    yield choice.delta.content
+        finally:
+            # 提前结束（空闲超时、取消）时关闭响应流，释放连接
+            await stream.close()
+        self._record_usage(usage, time.monotonic() - started_at, call_state)
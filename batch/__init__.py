@@ -4,5 +4,11 @@
 """
 
 from .processor import BatchProcessor
+from .scheduler import CrawlScheduler
+from .pipeline import CrawlPipeline
+from .build_manifest import BuildManifest
+from .run_journal import RunJournal
+from .deferred_extraction import DeferredExtractionRunner, DeferredExtractionStore
 
-__all__ = ['BatchProcessor']
\ No newline at end of file
+__all__ = ['BatchProcessor', 'CrawlScheduler', 'CrawlPipeline', 'BuildManifest', 'RunJournal',
+           'DeferredExtractionRunner', 'DeferredExtractionStore']
\ No newline at end of file
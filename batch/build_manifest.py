@@ -0,0 +1,133 @@
+"""
+构建清单模块
+记录每个一级模块整合时的输入文件哈希与输出文件，只对输入发生变化的模块重新整合
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from utils import FileHelper
+
+
+class BuildManifest:
+    """Cursor Rules整合的构建清单"""
+
+    MANIFEST_VERSION = 1
+
+    def __init__(self, manifest_path: Path, legacy_path: Optional[Path] = None):
+        """
+        初始化构建清单
+
+        Args:
+            manifest_path: 清单文件路径
+            legacy_path: 旧版本的清单文件路径，新路径不存在时从这里读取，保存后删除
+        """
+        self.manifest_path = Path(manifest_path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.categories: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self) -> None:
+        """从磁盘读取清单，文件缺失或损坏时视为空清单"""
+        manifest_path = self.manifest_path
+        if not manifest_path.exists():
+            if not (self.legacy_path and self.legacy_path.exists()):
+                return
+            manifest_path = self.legacy_path
+
+        try:
+            data = json.loads(manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 构建清单读取失败，将全部重新整合: {e}")
+            return
+
+        if data.get('version') == self.MANIFEST_VERSION:
+            self.categories = data.get('categories', {})
+
+    def save(self) -> None:
+        """原子地写入清单"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        FileHelper.atomic_write_text(self.manifest_path, json.dumps({
+            'version': self.MANIFEST_VERSION,
+            'categories': self.categories
+        }, ensure_ascii=False, indent=2))
+        if self.legacy_path and self.legacy_path != self.manifest_path:
+            self.legacy_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def compute_input_hashes(md_files: List[Path]) -> Dict[str, str]:
+        """
+        计算一级模块下所有输入文件的哈希
+
+        Args:
+            md_files: 最佳实践文件列表
+
+        Returns:
+            Dict: 文件名 -> 内容哈希
+        """
+        return {md_file.name: FileHelper.hash_file(md_file) for md_file in sorted(md_files)}
+
+    def is_dirty(
+        self,
+        directory_name: str,
+        input_hashes: Dict[str, str],
+        output_file: Path,
+        fingerprint: str
+    ) -> bool:
+        """
+        判断一级模块是否需要重新整合
+
+        Args:
+            directory_name: 一级模块目录名
+            input_hashes: 当前输入文件哈希
+            output_file: 整合输出文件
+            fingerprint: 影响整合结果的其他因素（提示词版本、模型等）
+
+        Returns:
+            bool: 输入、配置或输出文件发生变化时返回True
+        """
+        entry = self.categories.get(directory_name)
+        if not entry or not output_file.exists():
+            return True
+
+        return (
+            entry.get('inputs') != input_hashes
+            or entry.get('fingerprint') != fingerprint
+            or entry.get('output_file') != str(output_file)
+        )
+
+    def record(
+        self,
+        directory_name: str,
+        input_hashes: Dict[str, str],
+        output_file: Path,
+        fingerprint: str
+    ) -> None:
+        """
+        记录一次成功的整合
+
+        Args:
+            directory_name: 一级模块目录名
+            input_hashes: 本次整合的输入文件哈希
+            output_file: 整合输出文件
+            fingerprint: 影响整合结果的其他因素
+        """
+        self.categories[directory_name] = {
+            'inputs': input_hashes,
+            'output_file': str(output_file),
+            'fingerprint': fingerprint,
+            'built_at': time.time()
+        }
+
+    def get_entry(self, directory_name: str) -> Optional[Dict[str, Any]]:
+        """
+        获取一级模块的清单记录
+
+        Args:
+            directory_name: 一级模块目录名
+
+        Returns:
+            Dict: 清单记录，不存在时返回None
+        """
+        return self.categories.get(directory_name)
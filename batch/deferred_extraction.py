@@ -0,0 +1,510 @@
+"""
+延迟提取模块
+先渲染所有页面并收集提取提示词，作为一个Gemini批处理任务提交，轮询完成后逐模块保存结果；
+任务状态持久化到磁盘，进程在任务等待期间重启时继续轮询同一个任务
+"""
+
+import asyncio
+import hashlib
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Optional, Tuple
+from crawler import WebCrawler
+from gemini_api import GeminiAPIError
+from utils import FileHelper, TimingSpans
+from .scheduler import CrawlScheduler
+from .pipeline import StageStats
+from .run_journal import RunJournal
+
+
+class DeferredExtractionStore:
+    """批处理任务的持久化状态：任务信息与每个模块的页面、提示词和已得到的结果"""
+
+    def __init__(self, state_dir: Path):
+        """
+        初始化状态存储
+
+        Args:
+            state_dir: 状态目录
+        """
+        self.state_dir = Path(state_dir)
+        self.state_path = self.state_dir / "pending_job.json"
+        self.pages_dir = self.state_dir / "pages"
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        读取未完成的任务状态
+
+        Returns:
+            Dict: 任务状态，没有未完成任务或文件损坏时返回None
+        """
+        try:
+            return json.loads(self.state_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 批处理任务状态读取失败，将重新提交: {e}")
+            return None
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """
+        原子写入任务状态
+
+        Args:
+            state: 任务状态
+        """
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        FileHelper.atomic_write_text(self.state_path, json.dumps(state, ensure_ascii=False, indent=2))
+
+    def _page_path(self, key: str) -> Path:
+        """获取模块暂存文件路径"""
+        return self.pages_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+    def save_page(
+        self,
+        key: str,
+        page: Dict[str, Any],
+        prompts: List[str],
+        partials: List[Optional[str]]
+    ) -> None:
+        """
+        暂存模块的页面信息、提示词与已命中缓存的结果
+
+        Args:
+            key: 模块键
+            page: fetch_page返回的页面信息
+            prompts: 提取提示词列表
+            partials: 与提示词对应的结果，尚未得到的为None
+        """
+        self.pages_dir.mkdir(parents=True, exist_ok=True)
+        stored_page = {k: v for k, v in page.items() if k != 'timings'}
+        FileHelper.atomic_write_text(self._page_path(key), json.dumps({
+            'page': stored_page,
+            'timings': page['timings'].to_dict() if page.get('timings') else {},
+            'prompts': prompts,
+            'partials': partials
+        }, ensure_ascii=False))
+
+    def load_page(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取模块暂存内容
+
+        Args:
+            key: 模块键
+
+        Returns:
+            Dict: 包含page、prompts、partials，文件缺失或损坏时返回None
+        """
+        try:
+            stored = json.loads(self._page_path(key).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+        # 恢复后的耗时记录只包含渲染阶段，后续阶段继续累加
+        timings = TimingSpans()
+        for stage, seconds in stored.get('timings', {}).items():
+            timings.add(stage, seconds)
+        stored['page']['timings'] = timings
+        return stored
+
+    def clear(self) -> None:
+        """删除任务状态与所有暂存文件"""
+        self.state_path.unlink(missing_ok=True)
+        shutil.rmtree(self.pages_dir, ignore_errors=True)
+
+
+class DeferredExtractionRunner:
+    """渲染 → 批处理提交 → 轮询 → 写入 的延迟提取执行器，接口与CrawlPipeline一致"""
+
+    def __init__(
+        self,
+        web_crawler: WebCrawler,
+        scheduler: CrawlScheduler,
+        store: DeferredExtractionStore,
+        poll_interval: float = 30.0,
+        journal: Optional[RunJournal] = None
+    ):
+        """
+        初始化执行器
+
+        Args:
+            web_crawler: 网页爬虫实例
+            scheduler: 爬取调度器，决定渲染阶段的并发与主机限流
+            store: 批处理任务状态存储
+            poll_interval: 轮询任务状态的间隔秒数
+            journal: 运行日志，为None时不记录
+        """
+        self.web_crawler = web_crawler
+        self.scheduler = scheduler
+        self.store = store
+        self.poll_interval = poll_interval
+        self.journal = journal
+        self.extractor = web_crawler.content_processor.extractor
+
+        self.render_stats = StageStats("render")
+        self.extract_stats = StageStats("batch")
+        self.write_stats = StageStats("write")
+
+    async def run(
+        self,
+        jobs: List[Dict[str, Any]],
+        on_start: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        on_result: Optional[Callable[[int, Dict[str, Any], Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        运行延迟提取：先完成上次遗留的批处理任务，再渲染剩余模块并提交新任务
+
+        Args:
+            jobs: 任务列表，每个任务包含url、module_name、sub_module_name、category_dir、journal_key
+            on_start: 任务开始渲染时的回调 (序号, 任务)
+            on_result: 任务产生最终结果时的回调 (序号, 任务, 结果)
+
+        Returns:
+            List: 与jobs顺序一致的结果列表
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        index_by_key = {job["journal_key"]: index for index, job in enumerate(jobs)}
+
+        def finish(index: int, result: Dict[str, Any]) -> None:
+            results[index] = result
+            if self.journal:
+                self.journal.record_result(jobs[index]["journal_key"], result)
+            if on_result:
+                on_result(index, jobs[index], result)
+
+        state = self.store.load()
+        if state:
+            print(f"♻️ 发现未完成的批处理任务 {state.get('job_name') or '(未提交)'}，"
+                  f"包含 {len(state['items'])} 个模块，继续处理")
+            await self._complete(state, jobs, index_by_key, finish)
+
+        pending_jobs = [{**job, "index": index} for index, job in enumerate(jobs) if results[index] is None]
+        items: List[Dict[str, Any]] = []
+
+        async def render_job(job: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._render(job, finish, items)
+
+        await self.scheduler.run(
+            pending_jobs, render_job,
+            on_start=(lambda _, job: on_start(job["index"], job)) if on_start else None
+        )
+
+        if items:
+            state = {
+                'job_name': None,
+                'created_at': time.time(),
+                'items': [self._prepare_item(item) for item in items]
+            }
+            self.store.save(state)
+            await self._complete(state, jobs, index_by_key, finish)
+
+        return results
+
+    async def _render(self, job: Dict[str, Any], finish: Callable, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        渲染阶段：按跳过策略检查已有文件并获取页面，需要提取的页面构建提示词后加入待提交列表；
+        任何异常都转换为该任务的失败结果，保证每个任务都有最终结果
+
+        Args:
+            job: 任务信息
+            finish: 产生最终结果时调用的函数
+            items: 待提交的模块列表
+
+        Returns:
+            Dict: 阶段结果（仅用于调度器统计）
+        """
+        try:
+            return await self._render_job(job, finish, items)
+        except Exception as e:
+            result = self._failure(job, f"渲染阶段发生异常: {str(e)}")
+            finish(job["index"], result)
+            return result
+
+    async def _render_job(self, job: Dict[str, Any], finish: Callable, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        执行渲染阶段的检查、渲染与提示词构建
+
+        Args:
+            job: 任务信息
+            finish: 产生最终结果时调用的函数
+            items: 待提交的模块列表
+
+        Returns:
+            Dict: 阶段结果
+        """
+        existing_result = self.web_crawler.check_skip_before_fetch(
+            job["category_dir"], job["url"], job["module_name"], job["sub_module_name"]
+        )
+        if existing_result:
+            finish(job["index"], existing_result)
+            return existing_result
+
+        started_at = time.monotonic()
+        try:
+            page = await self.web_crawler.fetch_page(job["url"], use_spa_mode=True)
+        except Exception as e:
+            page = {"success": False, "error": f"爬取过程发生异常: {str(e)}"}
+        self.render_stats.record(time.monotonic() - started_at, page["success"])
+
+        if not page["success"]:
+            result = self._failure(job, page["error"])
+            finish(job["index"], result)
+            return result
+
+        if self.journal:
+            self.journal.record(job["journal_key"], RunJournal.RENDERED,
+                                render_time=page["render_time"], from_cache=page["from_cache"])
+
+        unchanged_result = self.web_crawler.check_skip_after_fetch(
+            job["category_dir"], job["url"], job["module_name"], job["sub_module_name"], page
+        )
+        if unchanged_result:
+            finish(job["index"], unchanged_result)
+            return unchanged_result
+
+        if not self.web_crawler.content_processor.is_api_available():
+            result = self.web_crawler.save_page(
+                job["category_dir"], job["module_name"], job["sub_module_name"], page, ""
+            )
+            finish(job["index"], result)
+            return result
+
+        prompts = self.extractor.build_prompts(
+            page["page_content"], job["sub_module_name"], page["metadata"]['title'], job["url"], page["timings"]
+        )
+        items.append({
+            'job': job,
+            'page': page,
+            'prompts': prompts,
+            'partials': [self.extractor.get_cached_result(prompt) for prompt in prompts]
+        })
+        return {"success": True, "deferred": True}
+
+    def _prepare_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        暂存模块内容并生成任务状态中的条目
+
+        Args:
+            item: 渲染阶段收集的模块信息
+
+        Returns:
+            Dict: 任务状态条目
+        """
+        job = item['job']
+        self.store.save_page(job["journal_key"], item['page'], item['prompts'], item['partials'])
+        return {
+            'key': job["journal_key"],
+            'category_dir': str(job["category_dir"]),
+            'module_name': job["module_name"],
+            'sub_module_name': job["sub_module_name"],
+            'url': job["url"],
+            'request_indices': []
+        }
+
+    async def _submit(self, state: Dict[str, Any]) -> int:
+        """
+        把所有未命中缓存的提示词作为一个批处理任务提交，并记录每个模块对应的请求序号
+
+        Args:
+            state: 任务状态
+
+        Returns:
+            int: 提交的请求数，为0时没有提交任务
+        """
+        requests: List[str] = []
+        for item in state['items']:
+            stored = self.store.load_page(item['key'])
+            if stored is None:
+                item['request_indices'] = []
+                continue
+
+            item['request_indices'] = []
+            for prompt, partial in zip(stored['prompts'], stored['partials']):
+                if partial is None:
+                    item['request_indices'].append(len(requests))
+                    requests.append(prompt)
+                else:
+                    item['request_indices'].append(None)
+
+        if requests:
+            gemini_api = self.extractor.get_batch_api()
+            state['job_name'] = await asyncio.to_thread(
+                gemini_api.submit_batch, requests, f"harmony-extraction-{int(state['created_at'])}"
+            )
+            state['submitted_at'] = time.time()
+            state['request_count'] = len(requests)
+        self.store.save(state)
+        return len(requests)
+
+    async def _poll(self, job_name: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        轮询批处理任务直到结束，查询时的可重试错误只记录不中断
+
+        Args:
+            job_name: 批处理任务名称
+
+        Returns:
+            Tuple: (终止状态, 与请求顺序一致的结果列表)
+        """
+        gemini_api = self.extractor.get_batch_api()
+        started_at = time.monotonic()
+        while True:
+            try:
+                status = await asyncio.to_thread(gemini_api.get_batch_results, job_name)
+            except GeminiAPIError as e:
+                if not e.retryable:
+                    raise
+                print(f"⚠️ 批处理任务状态查询失败，稍后重试: {e}")
+            else:
+                if status['done']:
+                    return status['state'], status['results']
+                print(f"    ⏳ 批处理任务 {job_name}: {status['state']}，"
+                      f"已等待 {time.monotonic() - started_at:.0f} 秒")
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def _complete(
+        self,
+        state: Dict[str, Any],
+        jobs: List[Dict[str, Any]],
+        index_by_key: Dict[str, int],
+        finish: Callable
+    ) -> None:
+        """
+        提交（如尚未提交）并等待批处理任务，把结果写入缓存并逐模块合并、保存
+
+        Args:
+            state: 任务状态
+            jobs: 本次运行的任务列表
+            index_by_key: 模块键到任务序号的映射
+            finish: 产生最终结果时调用的函数
+        """
+        started_at = time.monotonic()
+        if not state.get('job_name'):
+            await self._submit(state)
+
+        job_state, batch_results = 'JOB_STATE_SUCCEEDED', []
+        if state.get('job_name'):
+            job_state, batch_results = await self._poll(state['job_name'])
+            print(f"📦 批处理任务 {state['job_name']} 结束: {job_state}，"
+                  f"耗时 {time.monotonic() - started_at:.0f} 秒")
+
+        # 整个任务的等待时间只计入一次
+        batch_elapsed = time.monotonic() - started_at
+
+        for item in state['items']:
+            stored = self.store.load_page(item['key'])
+            if stored is None:
+                continue
+
+            # 批处理结果先写入缓存，即使该模块本次已不需要处理，下次提取也能直接复用
+            partials = stored['partials']
+            errors = []
+            for position, request_index in enumerate(item['request_indices']):
+                if request_index is None:
+                    continue
+                outcome = batch_results[request_index] if request_index < len(batch_results) else {
+                    'error': f"批处理任务未成功: {job_state}"
+                }
+                if 'text' in outcome:
+                    # 截断或格式异常的结果按失败处理，不写入缓存，避免之后每次运行都读到
+                    try:
+                        self.extractor.validate_markdown(outcome['text'])
+                    except ValueError as e:
+                        errors.append(f"结果未通过校验: {e}")
+                        continue
+                    partials[position] = outcome['text']
+                    self.extractor.cache_result(stored['prompts'][position], outcome['text'])
+                else:
+                    errors.append(outcome['error'])
+
+            index = index_by_key.get(item['key'])
+            if index is None:
+                continue
+
+            job = jobs[index]
+            self.extract_stats.record(batch_elapsed, not errors)
+            batch_elapsed = 0.0
+            if errors:
+                finish(index, self._failure(job, f"批处理请求失败: {errors[0]}"))
+                continue
+
+            await self._save(item, stored['page'], partials, job, index, finish)
+
+        self.store.clear()
+
+    async def _save(
+        self,
+        item: Dict[str, Any],
+        page: Dict[str, Any],
+        partials: List[str],
+        job: Dict[str, Any],
+        index: int,
+        finish: Callable
+    ) -> None:
+        """
+        合并分块结果并保存模块
+
+        Args:
+            item: 任务状态条目
+            page: 页面信息
+            partials: 各分块的提取结果
+            job: 任务信息
+            index: 任务序号
+            finish: 产生最终结果时调用的函数
+        """
+        # 批处理结果由提取路由最后一级的模型生成，分块合并仍按提取路由在线调用
+        content_processor = self.web_crawler.content_processor
+        try:
+            with content_processor.track_served_models() as served_models:
+                served_models.append(self.extractor.get_batch_api().model_name)
+                if len(partials) == 1:
+                    markdown_content = partials[0]
+                else:
+                    with page['timings'].span('llm_call'):
+                        markdown_content = await self.extractor.amerge_partials(
+                            item['sub_module_name'], item['url'], partials
+                        )
+            page['served_models'] = served_models
+        except Exception as e:
+            finish(index, self._failure(job, f"AI提取过程发生异常: {str(e)}"))
+            return
+
+        if self.journal:
+            self.journal.record(job["journal_key"], RunJournal.EXTRACTED)
+
+        started_at = time.monotonic()
+        try:
+            result = self.web_crawler.save_page(
+                Path(item['category_dir']), item['module_name'], item['sub_module_name'], page, markdown_content
+            )
+        except Exception as e:
+            result = self._failure(job, f"文件保存过程发生异常: {str(e)}")
+        self.write_stats.record(time.monotonic() - started_at, result.get("success", False))
+        finish(index, result)
+
+    @staticmethod
+    def _failure(job: Dict[str, Any], error: str) -> Dict[str, Any]:
+        """构建失败结果"""
+        return {
+            "success": False,
+            "error": error,
+            "url": job["url"],
+            "module_name": job["module_name"],
+            "sub_module_name": job["sub_module_name"]
+        }
+
+    def get_pipeline_stats(self) -> List[Dict[str, Any]]:
+        """
+        获取各阶段统计信息
+
+        Returns:
+            List: 每个阶段的统计字典
+        """
+        return [
+            self.render_stats.to_dict(),
+            self.extract_stats.to_dict(),
+            self.write_stats.to_dict()
+        ]
@@ -0,0 +1,371 @@
+"""
+爬取流水线模块
+将渲染、AI提取、文件写入拆分为独立阶段，通过有界队列连接并提供背压
+"""
+
+import asyncio
+import time
+from typing import Dict, Any, List, Callable, Optional
+from crawler import WebCrawler
+from .scheduler import CrawlScheduler
+from .run_journal import RunJournal
+
+
+class StageStats:
+    """单个流水线阶段的运行统计"""
+
+    def __init__(self, name: str):
+        """
+        初始化阶段统计
+
+        Args:
+            name: 阶段名称
+        """
+        self.name = name
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self.max_queue_depth = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def record(self, elapsed: float, success: bool = True) -> None:
+        """
+        记录一次处理
+
+        Args:
+            elapsed: 处理耗时（秒）
+            success: 是否成功
+        """
+        if self.started_at is None:
+            self.started_at = time.monotonic() - elapsed
+        self.finished_at = time.monotonic()
+        self.busy_time += elapsed
+        self.processed += 1
+        if not success:
+            self.failed += 1
+
+    def observe_queue(self, depth: int) -> None:
+        """
+        记录阶段输入队列深度
+
+        Args:
+            depth: 当前队列深度
+        """
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        导出统计信息
+
+        Returns:
+            Dict: 统计信息
+        """
+        wall_time = 0.0
+        if self.started_at is not None and self.finished_at is not None:
+            wall_time = self.finished_at - self.started_at
+
+        return {
+            'stage': self.name,
+            'processed': self.processed,
+            'failed': self.failed,
+            'busy_time': round(self.busy_time, 2),
+            'wall_time': round(wall_time, 2),
+            'throughput_per_minute': round(self.processed / wall_time * 60, 2) if wall_time > 0 else 0.0,
+            'max_queue_depth': self.max_queue_depth
+        }
+
+
+class CrawlPipeline:
+    """渲染 → AI提取 → 写入 三阶段流水线"""
+
+    def __init__(
+        self,
+        web_crawler: WebCrawler,
+        scheduler: CrawlScheduler,
+        llm_concurrency: int = 4,
+        queue_size: int = 4,
+        monitor_interval: float = 30.0,
+        journal: Optional[RunJournal] = None
+    ):
+        """
+        初始化流水线
+
+        Args:
+            web_crawler: 网页爬虫实例
+            scheduler: 爬取调度器，决定渲染阶段的并发与主机限流
+            llm_concurrency: AI提取阶段的并发worker数
+            queue_size: 阶段间队列容量，队列满时上游阶段等待
+            monitor_interval: 打印队列深度的间隔秒数，0表示不打印
+            journal: 运行日志，记录每个任务的状态变化，为None时不记录
+        """
+        self.web_crawler = web_crawler
+        self.scheduler = scheduler
+        self.llm_concurrency = max(1, llm_concurrency)
+        self.queue_size = max(1, queue_size)
+        self.monitor_interval = monitor_interval
+        self.journal = journal
+
+        self.render_stats = StageStats("render")
+        self.extract_stats = StageStats("extract")
+        self.write_stats = StageStats("write")
+
+        self._extract_queue: Optional[asyncio.Queue] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+
+    async def run(
+        self,
+        jobs: List[Dict[str, Any]],
+        on_start: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        on_result: Optional[Callable[[int, Dict[str, Any], Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        运行流水线
+
+        Args:
+            jobs: 任务列表，每个任务包含url、module_name、sub_module_name、category_dir，
+                  启用运行日志时还需包含journal_key
+            on_start: 任务开始渲染时的回调 (序号, 任务)
+            on_result: 任务产生最终结果时的回调 (序号, 任务, 结果)
+
+        Returns:
+            List: 与jobs顺序一致的结果列表
+        """
+        self._extract_queue = asyncio.Queue(maxsize=self.queue_size)
+        self._write_queue = asyncio.Queue(maxsize=self.queue_size)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+
+        def finish(index: int, result: Dict[str, Any]) -> None:
+            results[index] = result
+            if self.journal:
+                self.journal.record_result(jobs[index]["journal_key"], result)
+            if on_result:
+                on_result(index, jobs[index], result)
+
+        indexed_jobs = [{**job, "index": index} for index, job in enumerate(jobs)]
+
+        async def render_job(job: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._render_stage(job, finish)
+
+        extract_workers = [
+            asyncio.create_task(self._extract_stage(finish))
+            for _ in range(self.llm_concurrency)
+        ]
+        writer = asyncio.create_task(self._write_stage(finish))
+        monitor = asyncio.create_task(self._monitor()) if self.monitor_interval > 0 else None
+
+        # 渲染阶段复用调度器的全局并发与主机限流
+        renderer = asyncio.create_task(self.scheduler.run(indexed_jobs, render_job, on_start=on_start))
+        extract_done = None
+        closers: List[asyncio.Task] = []
+        try:
+            await self._wait_stage(renderer, [*extract_workers, writer])
+
+            # 结束标记在单独的任务中放入队列，worker异常退出时不会阻塞在已满的队列上
+            extract_done = asyncio.gather(*extract_workers)
+            closers.append(asyncio.create_task(self._close_queue(self._extract_queue, len(extract_workers))))
+            await self._wait_stage(extract_done, [writer])
+
+            closers.append(asyncio.create_task(self._close_queue(self._write_queue, 1)))
+            await writer
+        finally:
+            # 异常或取消时停止所有阶段并等待其退出，避免遗留仍在运行的任务
+            tasks = [task for task in (renderer, *extract_workers, writer, monitor, *closers) if task]
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, *([extract_done] if extract_done else []), return_exceptions=True)
+
+        return results
+
+    @staticmethod
+    async def _close_queue(queue: asyncio.Queue, worker_count: int) -> None:
+        """
+        为每个worker放入一个结束标记
+
+        Args:
+            queue: 阶段输入队列
+            worker_count: 读取该队列的worker数
+        """
+        for _ in range(worker_count):
+            await queue.put(None)
+
+    @staticmethod
+    async def _wait_stage(stage: asyncio.Future, downstream: List[asyncio.Task]) -> None:
+        """
+        等待一个阶段完成；下游worker提前退出时立即抛出，避免该阶段阻塞在已满的队列上
+
+        Args:
+            stage: 等待完成的阶段
+            downstream: 该阶段下游的worker任务
+
+        Raises:
+            Exception: 阶段或下游worker的异常；下游worker无异常提前退出时抛出RuntimeError
+        """
+        await asyncio.wait([stage, *downstream], return_when=asyncio.FIRST_COMPLETED)
+        for task in downstream:
+            if task.done():
+                task.result()
+                raise RuntimeError("流水线下游阶段提前退出")
+        stage.result()
+
+    async def _render_stage(self, job: Dict[str, Any], finish: Callable) -> Dict[str, Any]:
+        """
+        渲染阶段：按跳过策略检查已有文件并获取页面，完成后立即释放浏览器标签页；
+        任何异常都转换为该任务的失败结果，保证每个任务都有最终结果
+
+        Args:
+            job: 任务信息
+            finish: 产生最终结果时调用的函数
+
+        Returns:
+            Dict: 阶段结果（仅用于调度器统计）
+        """
+        try:
+            return await self._render_job(job, finish)
+        except Exception as e:
+            result = {
+                "success": False,
+                "error": f"渲染阶段发生异常: {str(e)}",
+                "url": job["url"],
+                "module_name": job["module_name"],
+                "sub_module_name": job["sub_module_name"]
+            }
+            finish(job["index"], result)
+            return result
+
+    async def _render_job(self, job: Dict[str, Any], finish: Callable) -> Dict[str, Any]:
+        """
+        执行渲染阶段的检查、渲染与入队
+
+        Args:
+            job: 任务信息
+            finish: 产生最终结果时调用的函数
+
+        Returns:
+            Dict: 阶段结果
+        """
+        existing_result = self.web_crawler.check_skip_before_fetch(
+            job["category_dir"], job["url"], job["module_name"], job["sub_module_name"]
+        )
+        if existing_result:
+            finish(job["index"], existing_result)
+            return existing_result
+
+        started_at = time.monotonic()
+        try:
+            page = await self.web_crawler.fetch_page(job["url"], use_spa_mode=True)
+        except Exception as e:
+            page = {"success": False, "error": f"爬取过程发生异常: {str(e)}"}
+        self.render_stats.record(time.monotonic() - started_at, page["success"])
+
+        if not page["success"]:
+            result = {
+                "success": False,
+                "error": page["error"],
+                "url": job["url"],
+                "module_name": job["module_name"],
+                "sub_module_name": job["sub_module_name"]
+            }
+            finish(job["index"], result)
+            return result
+
+        if self.journal:
+            self.journal.record(job["journal_key"], RunJournal.RENDERED,
+                                render_time=page["render_time"], from_cache=page["from_cache"])
+
+        # 页面内容未变化时直接复用已有输出，不进入AI提取阶段
+        unchanged_result = self.web_crawler.check_skip_after_fetch(
+            job["category_dir"], job["url"], job["module_name"], job["sub_module_name"], page
+        )
+        if unchanged_result:
+            finish(job["index"], unchanged_result)
+            return unchanged_result
+
+        # 队列满时在此等待，形成对渲染阶段的背压
+        await self._extract_queue.put((job, page))
+        self.extract_stats.observe_queue(self._extract_queue.qsize())
+        return {"success": True, "queued": True}
+
+    async def _extract_stage(self, finish: Callable) -> None:
+        """
+        AI提取阶段worker：从队列取出页面并提取最佳实践
+
+        Args:
+            finish: 产生最终结果时调用的函数
+        """
+        while True:
+            item = await self._extract_queue.get()
+            if item is None:
+                return
+
+            job, page = item
+            started_at = time.monotonic()
+            try:
+                markdown_content = await self.web_crawler.extract_page(page, job["sub_module_name"], job["url"])
+            except Exception as e:
+                self.extract_stats.record(time.monotonic() - started_at, False)
+                finish(job["index"], {
+                    "success": False,
+                    "error": f"AI提取过程发生异常: {str(e)}",
+                    "url": job["url"],
+                    "module_name": job["module_name"],
+                    "sub_module_name": job["sub_module_name"]
+                })
+                continue
+
+            self.extract_stats.record(time.monotonic() - started_at)
+            if self.journal:
+                self.journal.record(job["journal_key"], RunJournal.EXTRACTED)
+            await self._write_queue.put((job, page, markdown_content))
+            self.write_stats.observe_queue(self._write_queue.qsize())
+
+    async def _write_stage(self, finish: Callable) -> None:
+        """
+        写入阶段：串行保存提取结果
+
+        Args:
+            finish: 产生最终结果时调用的函数
+        """
+        while True:
+            item = await self._write_queue.get()
+            if item is None:
+                return
+
+            job, page, markdown_content = item
+            started_at = time.monotonic()
+            try:
+                result = self.web_crawler.save_page(
+                    job["category_dir"], job["module_name"], job["sub_module_name"], page, markdown_content
+                )
+            except Exception as e:
+                result = {
+                    "success": False,
+                    "error": f"文件保存过程发生异常: {str(e)}",
+                    "url": job["url"],
+                    "module_name": job["module_name"],
+                    "sub_module_name": job["sub_module_name"]
+                }
+            self.write_stats.record(time.monotonic() - started_at, result.get("success", False))
+            finish(job["index"], result)
+
+    async def _monitor(self) -> None:
+        """定期打印各阶段处理量与队列深度"""
+        while True:
+            await asyncio.sleep(self.monitor_interval)
+            print(f"    📈 流水线 | 渲染:{self.render_stats.processed} "
+                  f"| 待提取:{self._extract_queue.qsize()} | 提取:{self.extract_stats.processed} "
+                  f"| 待写入:{self._write_queue.qsize()} | 写入:{self.write_stats.processed}")
+
+    def get_pipeline_stats(self) -> List[Dict[str, Any]]:
+        """
+        获取各阶段统计信息
+
+        Returns:
+            List: 每个阶段的统计字典
+        """
+        return [
+            self.render_stats.to_dict(),
+            self.extract_stats.to_dict(),
+            self.write_stats.to_dict()
+        ]
@@ -4,30 +4,74 @@
 """
 
 import asyncio
+import json
 import time
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from crawler import WebCrawler
 from module_manager import HarmonyModuleManager
-from utils import DisplayHelper, StatisticsHelper
-from ai import ContentProcessor
+from utils import DisplayHelper, StatisticsHelper, TimingAggregator, FileHelper
+from ai import ContentProcessor, PracticeRecord, PracticeRecordMerger
+from ai.prompts import PROMPT_TEMPLATE_VERSION
+from .scheduler import CrawlScheduler
+from .pipeline import CrawlPipeline
+from .build_manifest import BuildManifest
+from .run_journal import RunJournal
+from .deferred_extraction import DeferredExtractionRunner, DeferredExtractionStore
 
 
 class BatchProcessor:
     """批量处理器类"""
 
-    def __init__(self, web_crawler: WebCrawler, output_dir: Path):
+    def __init__(
+        self,
+        web_crawler: WebCrawler,
+        output_dir: Path,
+        scheduler: Optional[CrawlScheduler] = None
+    ):
         """
         初始化批量处理器
 
         Args:
             web_crawler: 网页爬虫实例
             output_dir: 输出目录
+            scheduler: 爬取调度器，为None时按配置管理器创建
         """
         self.web_crawler = web_crawler
         self.output_dir = output_dir
         self.content_processor = web_crawler.content_processor
 
+        if scheduler is None:
+            config_manager = web_crawler.config_manager
+            host_limit = config_manager.get_host_rate_limit()
+            scheduler = CrawlScheduler(
+                max_concurrency=config_manager.get_crawl_concurrency(),
+                per_host_requests_per_minute=host_limit['requests_per_minute'],
+                per_host_burst=host_limit['burst']
+            )
+        self.scheduler = scheduler
+
+        # 主机级限流只作用于真正发起的页面请求
+        self.web_crawler.host_throttle = self.scheduler.wait_for_host
+
+        # 渲染、AI提取、写入分阶段流水线
+        self.pipeline_settings = web_crawler.config_manager.get_pipeline_settings()
+        self.last_pipeline_stats: List[Dict[str, Any]] = []
+        self.last_timing_report: Dict[str, Any] = {}
+
+        # 一级模块整合并发数
+        self.integration_concurrency = web_crawler.config_manager.get_integration_concurrency()
+        self.stream_integration = web_crawler.config_manager.is_stream_integration()
+
+        # 运行日志、批处理任务状态与构建清单写入状态目录，不放进输出目录
+        self.state_dir = web_crawler.config_manager.get_state_directory()
+
+        # 最终Cursor Rules输出目录及其构建清单
+        self.final_output_dir = Path(output_dir) / "final_cursor_rules"
+        self.build_manifest = BuildManifest(
+            self.state_dir / "build_manifest.json", legacy_path=self.final_output_dir / "build_manifest.json"
+        )
+
     async def process_harmony_modules(
         self,
         config_file: str = "harmony_modules_config.json"
@@ -65,51 +109,158 @@ class BatchProcessor:
         print(f"📊 总共需要爬取 {total_modules} 个模块")
         print("=" * 80)
 
-        all_results = []
-        current_index = 0
-
-        # 遍历所有一级模块
+        # 展开为扁平任务列表，保留分类信息用于结果分组
+        jobs = []
         for category_name, modules_in_category in grouped_modules.items():
-            print(f"\n📂 开始处理一级模块: {category_name}")
-            print(f"📁 目录: {modules_in_category[0]['category_directory']}")
-            print("-" * 60)
+            for module_info in modules_in_category:
+                jobs.append({
+                    **module_info,
+                    "category_name": category_name,
+                    "category_dir": self.output_dir / module_info['category_directory']
+                })
 
-            category_dir = self.output_dir / modules_in_category[0]['category_directory']
-            category_results = []
+        # 上次运行中断时从运行日志恢复，已完成的模块直接复用记录的结果
+        journal = RunJournal(self.state_dir / "run_journal.jsonl")
+        completed_results = journal.begin_run(total_modules)
+        all_results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        pending_jobs = []
+        for index, job in enumerate(jobs):
+            job["journal_key"] = RunJournal.make_key(job["category_directory"], job["module_name"])
+            previous_result = completed_results.get(job["journal_key"])
+            markdown_file = previous_result.get("markdown_file") if previous_result else None
+            if previous_result and (not markdown_file or Path(markdown_file).exists()):
+                all_results[index] = {**previous_result, "resumed": True}
+            else:
+                pending_jobs.append((index, job))
+                journal.record(job["journal_key"], RunJournal.QUEUED)
 
-            # 遍历该一级模块下的所有二级模块
-            for module_info in modules_in_category:
-                current_index += 1
-                print(f"\n  🔄 [{current_index}/{total_modules}] {module_info['sub_module_name']}")
-
-                result = await self.web_crawler.crawl_with_directory_structure(
-                    target_dir=category_dir,
-                    url=module_info["url"],
-                    module_name=module_info["module_name"],
-                    sub_module_name=module_info["sub_module_name"]
-                )
+        if journal.resumed:
+            print(f"♻️ 从中断的运行 {journal.run_id} 恢复: 已完成 {len(jobs) - len(pending_jobs)} 个，"
+                  f"待处理 {len(pending_jobs)} 个")
 
-                result["category_name"] = category_name
-                result["category_dir"] = module_info["category_directory"]
-                category_results.append(result)
-                all_results.append(result)
+        pipeline = self._create_runner(journal)
 
-                # 简化结果显示
-                display_text = DisplayHelper.format_result_display(result)
-                print(f"    {display_text}")
+        completed_count = len(jobs) - len(pending_jobs)
 
-                # 添加延迟避免频繁请求
-                if current_index < total_modules:
-                    await asyncio.sleep(3)
+        def on_start(index: int, job: Dict[str, Any]) -> None:
+            print(f"\n  🔄 [{pending_jobs[index][0] + 1}/{total_modules}] {job['category_name']} / {job['sub_module_name']}")
 
-            # 输出当前一级模块汇总
-            self._display_category_summary(category_name, category_results)
+        def on_result(index: int, job: Dict[str, Any], result: Dict[str, Any]) -> None:
+            nonlocal completed_count
+            completed_count += 1
+            display_text = DisplayHelper.format_result_display(result)
+            print(f"    ({completed_count}/{total_modules}) {job['sub_module_name']}: {display_text}")
+
+        run_started_at = time.monotonic()
+        try:
+            pending_results = await pipeline.run(
+                [job for _, job in pending_jobs], on_start=on_start, on_result=on_result
+            )
+        except BaseException:
+            # 中断时保留日志，下次运行从这里继续
+            journal.close()
+            raise
+        self.last_pipeline_stats = pipeline.get_pipeline_stats()
+        self.last_timing_report = self._build_timing_report(pending_results, time.monotonic() - run_started_at)
+
+        for (index, _), result in zip(pending_jobs, pending_results):
+            all_results[index] = result
+
+        for job, result in zip(jobs, all_results):
+            result.setdefault("module_name", job["module_name"])
+            result.setdefault("sub_module_name", job["sub_module_name"])
+            result["category_name"] = job["category_name"]
+            result["category_dir"] = job["category_directory"]
+
+        # 所有模块都有了最终结果，下次运行重新开始
+        journal.complete_run()
+
+        # 按配置顺序输出各一级模块汇总
+        grouped_results = StatisticsHelper.group_results_by_category(all_results)
+        for category_name in grouped_modules.keys():
+            self._display_category_summary(category_name, grouped_results.get(category_name, []))
 
         # 输出最终汇总
         self._display_final_summary(all_results, grouped_modules)
 
         return all_results
 
+    def _create_runner(self, journal: RunJournal):
+        """
+        按配置创建流水线或延迟提取执行器
+
+        Args:
+            journal: 运行日志
+
+        Returns:
+            CrawlPipeline或DeferredExtractionRunner
+        """
+        deferred_settings = self.web_crawler.config_manager.get_deferred_extraction_settings()
+        if deferred_settings['enabled']:
+            if self.content_processor.is_structured_mode():
+                print("⚠️ 批处理模式暂不支持结构化提取，改用流水线实时提取")
+            elif not getattr(self.content_processor.gemini_api, 'supports_batch', False):
+                print("⚠️ 当前生成后端不支持批处理任务，改用流水线实时提取")
+            else:
+                print(f"⚙️ 渲染并发: {self.scheduler.max_concurrency} | AI提取: 批处理任务 "
+                      f"(模型 {self.content_processor.extractor.get_batch_api().model_name}, "
+                      f"轮询间隔 {deferred_settings['poll_interval']:g} 秒)")
+                return DeferredExtractionRunner(
+                    web_crawler=self.web_crawler,
+                    scheduler=self.scheduler,
+                    store=DeferredExtractionStore(self.state_dir / "deferred_extraction"),
+                    poll_interval=deferred_settings['poll_interval'],
+                    journal=journal
+                )
+
+        pipeline = CrawlPipeline(
+            web_crawler=self.web_crawler,
+            scheduler=self.scheduler,
+            llm_concurrency=self.pipeline_settings['llm_concurrency'],
+            queue_size=self.pipeline_settings['queue_size'],
+            monitor_interval=self.pipeline_settings['monitor_interval'],
+            journal=journal
+        )
+        print(f"⚙️ 渲染并发: {self.scheduler.max_concurrency} | AI提取并发: {pipeline.llm_concurrency} | "
+              f"单主机限流: {self.scheduler.per_host_requests_per_minute:g} 次/分钟")
+        return pipeline
+
+    def _build_timing_report(self, results: List[Dict[str, Any]], wall_time: float) -> Dict[str, Any]:
+        """
+        汇总本次运行的分阶段耗时，按配置导出到文件
+
+        Args:
+            results: 本次实际处理的模块结果
+            wall_time: 本次运行的总耗时（秒）
+
+        Returns:
+            Dict: 包含summary、pages_per_minute、wall_time、export_file的报告
+        """
+        aggregator = TimingAggregator()
+        for result in results:
+            if result and result.get("timings"):
+                aggregator.add(result.get("module_name", ""), result["timings"])
+
+        new_pages = len([r for r in results if r and r.get("success") and not r.get("skipped")])
+        report = {
+            'wall_time': round(wall_time, 2),
+            'pages_processed': len(results),
+            'new_pages': new_pages,
+            'pages_per_minute': round(new_pages / wall_time * 60, 2) if wall_time > 0 else 0.0,
+            'summary': aggregator.summarize(),
+            'export_file': None
+        }
+
+        export_path = self.web_crawler.config_manager.get_timings_export_path()
+        if export_path:
+            try:
+                extra = {key: report[key] for key in ('wall_time', 'pages_processed', 'new_pages', 'pages_per_minute')}
+                report['export_file'] = str(aggregator.export(export_path, extra))
+            except OSError as e:
+                print(f"⚠️ 耗时数据导出失败: {e}")
+
+        return report
+
     def _display_category_summary(self, category_name: str, category_results: List[Dict[str, Any]]):
         """
         显示一级模块汇总信息
@@ -151,6 +302,9 @@ class BatchProcessor:
         print(f"✅ 总成功: {final_stats['successful']} 个")
         print(f"  🆕 新爬取: {final_stats['new']} 个")
         print(f"  ⏭️ 已跳过: {final_stats['skipped']} 个")
+        resumed_count = len([r for r in all_results if r.get('resumed')])
+        if resumed_count:
+            print(f"  ♻️ 从运行日志恢复: {resumed_count} 个")
         print(f"❌ 总失败: {final_stats['failed']} 个")
         print(f"📈 成功率: {final_stats['success_rate']:.1f}%")
 
@@ -163,6 +317,25 @@ class BatchProcessor:
                 successful, failed, skipped, new = StatisticsHelper.categorize_results(category_results)
                 print(f"  - {category_name}: {len(successful)}/{len(category_results)} 成功 (新:{len(new)}, 跳过:{len(skipped)})")
 
+        if self.last_pipeline_stats:
+            print(f"\n⏱️ 流水线阶段统计:")
+            for stage in self.last_pipeline_stats:
+                print(f"  - {stage['stage']}: 处理 {stage['processed']} 个 (失败 {stage['failed']}) | "
+                      f"忙碌 {stage['busy_time']:.1f}秒 | 吞吐 {stage['throughput_per_minute']:.1f} 个/分钟 | "
+                      f"最大队列深度 {stage['max_queue_depth']}")
+
+        if self.last_timing_report.get('summary'):
+            report = self.last_timing_report
+            print(f"\n⏱️ 分阶段耗时 (总耗时 {report['wall_time']:.1f}秒, "
+                  f"新处理 {report['new_pages']} 页, {report['pages_per_minute']:.1f} 页/分钟):")
+            for stage, stats in report['summary'].items():
+                print(f"  - {stage}: p50 {stats['p50']:.2f}秒 | p95 {stats['p95']:.2f}秒 | "
+                      f"最长 {stats['max']:.2f}秒 | 合计 {stats['total']:.1f}秒 ({stats['count']} 页)")
+            if report['export_file']:
+                print(f"  📄 耗时明细已导出: {report['export_file']}")
+
+        self._display_llm_usage()
+
         print(f"\n📁 文件保存位置: {self.output_dir}")
         if self.web_crawler.debug_mode:
             print(f"🔧 调试模式: HTML文件已保存")
@@ -197,116 +370,294 @@ class BatchProcessor:
             return []
 
         # 创建最终输出目录
-        final_output_dir = Path("harmony_cursor_rules/final_cursor_rules")
+        final_output_dir = self.final_output_dir
         final_output_dir.mkdir(parents=True, exist_ok=True)
         print(f"📁 最终输出目录: {final_output_dir}")
 
         # 获取所有一级模块信息
         grouped_modules = module_manager.get_modules_by_category()
-        integration_results = []
+        fingerprint = self._get_integration_fingerprint()
 
-        # 遍历每个一级模块
-        for category_name, modules_in_category in grouped_modules.items():
-            print(f"\n📂 整合一级模块: {category_name}")
+        # 各一级模块并发整合，并发数受配置限制；结果顺序与配置顺序一致
+        semaphore = asyncio.Semaphore(self.integration_concurrency)
 
-            # 获取该一级模块的目录和directory名称
-            category_dir = self.output_dir / modules_in_category[0]['category_directory']
-            directory_name = modules_in_category[0]['category_directory']  # 使用directory名称
+        async def integrate(category_name: str, modules_in_category: List[Dict[str, Any]]):
+            async with semaphore:
+                return await self._integrate_category(category_name, modules_in_category, fingerprint)
 
-            if not category_dir.exists():
-                print(f"⚠️ 目录不存在: {category_dir}")
-                continue
+        started_at = time.monotonic()
+        category_results = await asyncio.gather(
+            *(integrate(category_name, modules) for category_name, modules in grouped_modules.items())
+        )
+        integration_results = [result for result in category_results if result is not None]
+        print(f"\n⏱️ 整合耗时: {time.monotonic() - started_at:.1f}秒 (并发数 {self.integration_concurrency})")
 
-            # 查找所有.md文件
-            md_files = list(category_dir.glob("*.md"))
+        # 输出整合汇总
+        self._display_integration_summary(integration_results, final_output_dir)
 
-            if not md_files:
-                print(f"⚠️ 未找到任何.md文件")
-                integration_results.append({
-                    "category_name": category_name,
-                    "directory_name": directory_name,
-                    "success": False,
-                    "error": "未找到任何.md文件"
-                })
-                continue
+        return integration_results
 
-            print(f"📄 找到 {len(md_files)} 个最佳实践文件")
-
-            # 读取所有最佳实践内容
-            all_practices = []
-            for md_file in md_files:
-                try:
-                    with open(md_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        if content.strip():
-                            all_practices.append({
-                                "filename": md_file.name,
-                                "content": content
-                            })
-                except Exception as e:
-                    print(f"⚠️ 读取文件失败 {md_file.name}: {e}")
-
-            if not all_practices:
-                print(f"⚠️ 没有有效的最佳实践内容")
-                integration_results.append({
-                    "category_name": category_name,
-                    "directory_name": directory_name,
-                    "success": False,
-                    "error": "没有有效的最佳实践内容"
-                })
-                continue
+    def _display_llm_usage(self):
+        """显示本次运行累计的AI调用用量"""
+        usage = self.content_processor.get_usage_summary()
+        if not usage or not (usage['requests'] or usage['failed_requests'] or usage['batch_requests']):
+            return
+
+        limits = usage['limits']
+        limit_parts = []
+        if limits['rpm'] != float('inf'):
+            limit_parts.append(f"{limits['rpm']:g} 次/分钟")
+        if limits['tpm'] != float('inf'):
+            limit_parts.append(f"{limits['tpm']:g} tokens/分钟")
+        limit_text = f"限额 {', '.join(limit_parts)}" if limit_parts else "客户端不限流"
+        print(f"\n🤖 AI调用用量 ({usage['backend']} {usage['model']}, {limit_text}):")
+        print(f"  - 请求: {usage['requests']} 次成功, {usage['failed_requests']} 次失败")
+        if usage['batch_requests']:
+            print(f"  - 批处理: {usage['batch_requests']} 个请求")
+        print(f"  - Token: 输入 {usage['prompt_tokens']} | 输出 {usage['output_tokens']} | 合计 {usage['total_tokens']}")
+        if usage['cached_tokens']:
+            print(f"  - 上下文缓存: 输入中 {usage['cached_tokens']} tokens 命中缓存")
+        print(f"  - 耗时: 平均 {usage['latency_avg']:.1f}秒 | p95 {usage['latency_p95']:.1f}秒 | "
+              f"最长 {usage['latency_max']:.1f}秒 | 限流等待 {usage['rate_limit_wait']:.1f}秒")
+        if usage['streamed_requests']:
+            print(f"  - 流式: {usage['streamed_requests']} 次 | 首token p50 {usage['ttft_p50']:.1f}秒 | "
+                  f"p95 {usage['ttft_p95']:.1f}秒")
+        connections = usage.get('connections')
+        if connections and connections['requests']:
+            versions = ", ".join(f"{version} {count}次" for version, count in connections['http_versions'].items())
+            print(f"  - 连接: {connections['requests']} 次HTTP请求新建 {connections['new_connections']} 个连接 | "
+                  f"复用率 {connections['reuse_rate']:.0%} | 建连平均 {connections['connect_time_avg']:.2f}秒"
+                  + (f" | {versions}" if versions else ""))
+        for route, stats in usage['routing'].items():
+            if len(stats['models']) > 1 and stats['served']:
+                served = ", ".join(f"{model} {count}次" for model, count in stats['served'].items())
+                print(f"  - 模型路由 {route}: {served} | 升级 {stats['escalations']} 次")
+
+    async def _integrate_category(
+        self,
+        category_name: str,
+        modules_in_category: List[Dict[str, Any]],
+        fingerprint: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        整合单个一级模块，文件读写在线程中执行，不阻塞其他模块的整合
 
-            # 使用AI内容处理器整合最佳实践
-            if self.content_processor.is_api_available():
-                integrated_content = self.content_processor.integrate_practices(
+        Args:
+            category_name: 一级模块名称
+            modules_in_category: 该一级模块下的子模块列表
+            fingerprint: 整合配置指纹
+
+        Returns:
+            Dict: 整合结果，模块目录不存在时返回None
+        """
+        # 获取该一级模块的目录和directory名称
+        directory_name = modules_in_category[0]['category_directory']  # 使用directory名称
+        category_dir = self.output_dir / directory_name
+        output_file = self.final_output_dir / f"{directory_name}.cursorrules.md"
+        print(f"\n📂 整合一级模块: {category_name}")
+
+        if not category_dir.exists():
+            print(f"⚠️ [{directory_name}] 目录不存在: {category_dir}")
+            return None
+
+        # 查找所有.md文件
+        md_files = sorted(category_dir.glob("*.md"))
+        if not md_files:
+            print(f"⚠️ [{directory_name}] 未找到任何.md文件")
+            return {
+                "category_name": category_name,
+                "directory_name": directory_name,
+                "success": False,
+                "error": "未找到任何.md文件"
+            }
+
+        print(f"📄 [{directory_name}] 找到 {len(md_files)} 个最佳实践文件")
+
+        # 输入文件与上次整合时一致则跳过，避免重复调用AI
+        input_hashes = await asyncio.to_thread(
+            self.build_manifest.compute_input_hashes, self._get_integration_inputs(md_files)
+        )
+        if not self.build_manifest.is_dirty(directory_name, input_hashes, output_file, fingerprint):
+            print(f"⏭️ [{directory_name}] 输入未变化，跳过整合: {output_file.name}")
+            return {
+                "category_name": category_name,
+                "directory_name": directory_name,
+                "success": True,
+                "skipped": True,
+                "output_file": str(output_file),
+                "practices_count": len(md_files)
+            }
+
+        # 读取所有最佳实践内容
+        all_practices = await asyncio.to_thread(self._read_practices, md_files)
+        if not all_practices:
+            print(f"⚠️ [{directory_name}] 没有有效的最佳实践内容")
+            return {
+                "category_name": category_name,
+                "directory_name": directory_name,
+                "success": False,
+                "error": "没有有效的最佳实践内容"
+            }
+
+        if not self.content_processor.is_api_available():
+            print(f"⚠️ [{directory_name}] AI功能不可用，跳过整合")
+            return {
+                "category_name": category_name,
+                "directory_name": directory_name,
+                "success": False,
+                "error": "AI功能不可用"
+            }
+
+        # 使用AI内容处理器整合最佳实践
+        try:
+            if self.stream_integration:
+                # 流式写入临时文件，完成后原子替换
+                stream_result = await self.content_processor.aintegrate_practices_to_file(
+                    module_name=category_name,
+                    practices=all_practices,
+                    output_file=output_file
+                )
+                if stream_result['ttft'] is not None:
+                    print(f"📡 [{directory_name}] 首token {stream_result['ttft']:.1f}秒，"
+                          f"共写入 {stream_result['chars']} 字符")
+            else:
+                integrated_content = await self.content_processor.aintegrate_practices(
                     module_name=category_name,
                     practices=all_practices
                 )
-
-                if integrated_content:
-                    # 使用directory名称作为文件名，保存到final_cursor_rules目录
-                    output_file = final_output_dir / f"{directory_name}.cursorrules.md"
-                    try:
-                        with open(output_file, 'w', encoding='utf-8') as f:
-                            f.write(integrated_content)
-
-                        print(f"✅ 整合成功: {output_file.name} -> {final_output_dir}")
-                        integration_results.append({
-                            "category_name": category_name,
-                            "directory_name": directory_name,
-                            "success": True,
-                            "output_file": str(output_file),
-                            "practices_count": len(all_practices)
-                        })
-                    except Exception as e:
-                        print(f"❌ 文件保存失败: {e}")
-                        integration_results.append({
-                            "category_name": category_name,
-                            "directory_name": directory_name,
-                            "success": False,
-                            "error": f"文件保存失败: {e}"
-                        })
-                else:
-                    print(f"❌ AI整合失败")
-                    integration_results.append({
+                if not integrated_content:
+                    print(f"❌ [{directory_name}] AI整合失败")
+                    return {
                         "category_name": category_name,
                         "directory_name": directory_name,
                         "success": False,
                         "error": "AI整合失败"
-                    })
-            else:
-                print(f"⚠️ AI功能不可用，跳过整合")
-                integration_results.append({
-                    "category_name": category_name,
-                    "directory_name": directory_name,
-                    "success": False,
-                    "error": "AI功能不可用"
+                    }
+                # 原子写入final_cursor_rules目录，中断时不会留下半个文件
+                await asyncio.to_thread(FileHelper.atomic_write_text, output_file, integrated_content)
+        except Exception as e:
+            # 整合失败不写入输出文件，下次运行会重新整合
+            print(f"❌ [{directory_name}] AI整合失败: {e}")
+            return {
+                "category_name": category_name,
+                "directory_name": directory_name,
+                "success": False,
+                "error": f"AI整合失败: {e}"
+            }
+
+        self.build_manifest.record(directory_name, input_hashes, output_file, fingerprint)
+        self.build_manifest.save()
+
+        print(f"✅ 整合成功: {output_file.name} -> {self.final_output_dir}")
+        return {
+            "category_name": category_name,
+            "directory_name": directory_name,
+            "success": True,
+            "output_file": str(output_file),
+            "practices_count": len(all_practices)
+        }
+
+    def _read_practices(self, md_files: List[Path]) -> List[Dict[str, Any]]:
+        """
+        读取一级模块下所有非空的最佳实践及其结构化记录
+
+        Args:
+            md_files: 最佳实践文件列表
+
+        Returns:
+            List: 实践列表，每个元素包含filename、content和records
+        """
+        practices = []
+        for md_file in md_files:
+            try:
+                content = md_file.read_text(encoding='utf-8')
+            except Exception as e:
+                print(f"⚠️ 读取文件失败 {md_file.name}: {e}")
+                continue
+
+            if content.strip():
+                practices.append({
+                    "filename": md_file.name,
+                    "content": content,
+                    "records": self._load_practice_records(md_file)
                 })
+        return practices
 
-        # 输出整合汇总
-        self._display_integration_summary(integration_results, final_output_dir)
+    @staticmethod
+    def _get_integration_inputs(md_files: List[Path]) -> List[Path]:
+        """
+        获取整合的输入文件：最佳实践文件及存在的结构化实践记录
 
-        return integration_results
+        Args:
+            md_files: 最佳实践文件列表
+
+        Returns:
+            List: 输入文件列表
+        """
+        practices_files = [md_file.with_suffix('.practices.json') for md_file in md_files]
+        return md_files + [practices_file for practices_file in practices_files if practices_file.exists()]
+
+    @staticmethod
+    def _load_practice_records(md_file: Path) -> Optional[List[PracticeRecord]]:
+        """
+        读取最佳实践文件对应的结构化实践记录
+
+        Args:
+            md_file: 最佳实践文件
+
+        Returns:
+            List: 实践记录，没有记录文件或格式不合法时返回None
+        """
+        practices_file = md_file.with_suffix('.practices.json')
+        try:
+            document = json.loads(practices_file.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 实践记录读取失败 {practices_file.name}: {e}")
+            return None
+        return PracticeRecordMerger.load_records(document)
+
+    def _get_integration_fingerprint(self) -> str:
+        """
+        获取影响整合结果的配置指纹，提示词或模型变化时所有模块都需要重新整合
+
+        Returns:
+            str: 配置指纹
+        """
+        gemini_api = self.content_processor.gemini_api
+        if gemini_api is None:
+            return f"prompt-v{PROMPT_TEMPLATE_VERSION}"
+        model_label = self.content_processor.model_router.get_route_label('integration')
+        return f"prompt-v{PROMPT_TEMPLATE_VERSION}|{model_label}|{gemini_api.temperature}"
+
+    def find_dirty_categories(self, config_file: str = "harmony_modules_config.json") -> List[str]:
+        """
+        查找输入发生变化、需要重新整合的一级模块
+
+        Args:
+            config_file: 配置文件路径
+
+        Returns:
+            List: 需要重新整合的一级模块目录名列表
+        """
+        module_manager = HarmonyModuleManager(config_file)
+        fingerprint = self._get_integration_fingerprint()
+        dirty_categories = []
+
+        for modules_in_category in module_manager.get_modules_by_category().values():
+            directory_name = modules_in_category[0]['category_directory']
+            category_dir = self.output_dir / directory_name
+            md_files = list(category_dir.glob("*.md")) if category_dir.exists() else []
+            if not md_files:
+                continue
+
+            output_file = self.final_output_dir / f"{directory_name}.cursorrules.md"
+            input_hashes = self.build_manifest.compute_input_hashes(self._get_integration_inputs(md_files))
+            if self.build_manifest.is_dirty(directory_name, input_hashes, output_file, fingerprint):
+                dirty_categories.append(directory_name)
+
+        return dirty_categories
 
     def _display_integration_summary(self, integration_results: List[Dict[str, Any]], final_output_dir: Path):
         """
@@ -322,9 +673,11 @@ class BatchProcessor:
 
         successful = [r for r in integration_results if r.get('success', False)]
         failed = [r for r in integration_results if not r.get('success', False)]
+        skipped = [r for r in successful if r.get('skipped', False)]
 
         print(f"📊 整合统计:")
         print(f"✅ 成功: {len(successful)} 个")
+        print(f"  ⏭️ 未变化跳过: {len(skipped)} 个")
         print(f"❌ 失败: {len(failed)} 个")
         print(f"📈 成功率: {len(successful)/len(integration_results)*100:.1f}%")
 
@@ -333,7 +686,8 @@ class BatchProcessor:
             for result in successful:
                 practices_count = result.get('practices_count', 0)
                 directory_name = result.get('directory_name', result['category_name'])
-                print(f"  - {directory_name}.cursorrules.md: {practices_count} 个最佳实践")
+                skipped_text = " (未变化)" if result.get('skipped', False) else ""
+                print(f"  - {directory_name}.cursorrules.md: {practices_count} 个最佳实践{skipped_text}")
 
         if failed:
             print(f"\n❌ 失败的模块:")
@@ -342,6 +696,8 @@ class BatchProcessor:
                 directory_name = result.get('directory_name', result['category_name'])
                 print(f"  - {directory_name}: {error}")
 
+        self._display_llm_usage()
+
         print(f"\n📁 最终文件保存位置: {final_output_dir}")
         print("=" * 50)
 
@@ -0,0 +1,206 @@
+"""
+运行日志模块
+以追加写入的JSONL记录每个模块的状态变化，进程中断后可从日志恢复进度
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class RunJournal:
+    """批量爬取的进度日志"""
+
+    # 模块状态
+    QUEUED = "queued"
+    RENDERED = "rendered"
+    EXTRACTED = "extracted"
+    SAVED = "saved"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+    # 已完成、恢复时无需重新处理的状态
+    DONE_STATES = (SAVED, SKIPPED)
+
+    def __init__(self, journal_path: Path):
+        """
+        初始化运行日志
+
+        Args:
+            journal_path: 日志文件路径
+        """
+        self.journal_path = Path(journal_path)
+        self.run_id: Optional[str] = None
+        self.resumed = False
+
+        # 模块键 -> 最新状态记录
+        self.module_states: Dict[str, Dict[str, Any]] = {}
+        self._file = None
+
+    @staticmethod
+    def make_key(category_directory: str, module_name: str) -> str:
+        """
+        生成模块键
+
+        Args:
+            category_directory: 一级模块目录名
+            module_name: 模块名称
+
+        Returns:
+            str: 模块键
+        """
+        return f"{category_directory}/{module_name}"
+
+    def _replay(self) -> Optional[Dict[str, Any]]:
+        """
+        回放日志文件，重建每个模块的最新状态
+
+        Returns:
+            Dict: 最后一次运行的开始事件，日志不存在、为空或上次运行已完成时返回None
+        """
+        if not self.journal_path.exists():
+            return None
+
+        run_event = None
+        module_states: Dict[str, Dict[str, Any]] = {}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # 崩溃时可能留下半行，忽略即可
+                    continue
+
+                if event.get('event') == 'run_started':
+                    run_event = event
+                    module_states = {}
+                elif event.get('event') == 'run_completed':
+                    run_event = None
+                    module_states = {}
+                elif 'key' in event:
+                    module_states[event['key']] = event
+
+        self.module_states = module_states
+        return run_event
+
+    def begin_run(self, total_modules: int) -> Dict[str, Dict[str, Any]]:
+        """
+        开始一次运行：上次运行未完成时继续使用原日志，否则新建日志
+
+        Args:
+            total_modules: 本次需要处理的模块总数
+
+        Returns:
+            Dict: 上次运行中已完成模块的结果（模块键 -> 结果），新运行时为空
+        """
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        previous_run = self._replay()
+
+        if previous_run:
+            self.run_id = previous_run['run_id']
+            self.resumed = True
+            self._file = open(self.journal_path, 'a', encoding='utf-8')
+            if not self._ends_with_newline():
+                # 补齐崩溃时留下的半行，避免与新事件写在同一行
+                self._file.write("\n")
+            self._append({'event': 'run_resumed', 'run_id': self.run_id, 'total': total_modules})
+        else:
+            self.run_id = time.strftime('%Y%m%d-%H%M%S')
+            self.resumed = False
+            self.module_states = {}
+            self._file = open(self.journal_path, 'w', encoding='utf-8')
+            self._append({'event': 'run_started', 'run_id': self.run_id, 'total': total_modules})
+
+        return self.get_completed_results()
+
+    def _ends_with_newline(self) -> bool:
+        """检查日志文件是否以换行结尾（空文件视为是）"""
+        with open(self.journal_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def get_completed_results(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取已完成模块的结果
+
+        Returns:
+            Dict: 模块键 -> 结果
+        """
+        return {
+            key: event['result']
+            for key, event in self.module_states.items()
+            if event['state'] in self.DONE_STATES and event.get('result')
+        }
+
+    def get_state_counts(self) -> Dict[str, int]:
+        """
+        统计各状态的模块数量
+
+        Returns:
+            Dict: 状态 -> 数量
+        """
+        counts: Dict[str, int] = {}
+        for event in self.module_states.values():
+            counts[event['state']] = counts.get(event['state'], 0) + 1
+        return counts
+
+    def record(self, key: str, state: str, **fields) -> None:
+        """
+        记录模块状态变化
+
+        Args:
+            key: 模块键
+            state: 新状态
+            **fields: 附加字段（如error、result）
+        """
+        event = {'key': key, 'state': state, 'time': round(time.time(), 3), **fields}
+        self.module_states[key] = event
+        self._append(event)
+
+    def record_result(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        根据最终结果记录模块的终止状态
+
+        Args:
+            key: 模块键
+            result: 模块处理结果
+        """
+        # 原始HTML不写入日志
+        stored_result = {k: v for k, v in result.items() if k != 'html_content'}
+
+        if not result.get('success'):
+            self.record(key, self.FAILED, error=result.get('error', '未知错误'), result=stored_result)
+        elif result.get('skipped'):
+            self.record(key, self.SKIPPED, result=stored_result)
+        else:
+            self.record(key, self.SAVED, result=stored_result)
+
+    def complete_run(self) -> None:
+        """标记本次运行完成，下次运行将重新开始"""
+        self._append({'event': 'run_completed', 'run_id': self.run_id, 'counts': self.get_state_counts()})
+        self.close()
+
+    def close(self) -> None:
+        """关闭日志文件"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        """
+        追加一行事件并立即落盘
+
+        Args:
+            event: 事件内容
+        """
+        if not self._file:
+            return
+
+        self._file.write(json.dumps(event, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
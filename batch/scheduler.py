@@ -0,0 +1,121 @@
+"""
+爬取调度器模块
+在全局并发上限和按主机的令牌桶限流下并发执行爬取任务
+"""
+
+import asyncio
+from typing import Dict, Any, List, Callable, Awaitable, Optional
+from urllib.parse import urlparse
+from utils import TokenBucket
+
+
+class CrawlScheduler:
+    """有界并发爬取调度器"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        per_host_requests_per_minute: float = 20.0,
+        per_host_burst: float = 2.0
+    ):
+        """
+        初始化调度器
+
+        Args:
+            max_concurrency: 全局最大并发任务数
+            per_host_requests_per_minute: 每个主机每分钟允许发起的请求数
+            per_host_burst: 每个主机允许的突发请求数
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host_requests_per_minute = per_host_requests_per_minute
+        self.per_host_burst = per_host_burst
+        self._host_buckets: Dict[str, TokenBucket] = {}
+
+    def _get_host_bucket(self, url: str) -> TokenBucket:
+        """
+        获取URL所属主机的令牌桶
+
+        Args:
+            url: 目标URL
+
+        Returns:
+            TokenBucket: 该主机的令牌桶
+        """
+        host = urlparse(url).netloc or "default"
+        if host not in self._host_buckets:
+            self._host_buckets[host] = TokenBucket.per_minute(
+                self.per_host_requests_per_minute, burst=self.per_host_burst
+            )
+        return self._host_buckets[host]
+
+    async def wait_for_host(self, url: str) -> float:
+        """
+        等待目标主机的请求许可（在真正发起网络请求前调用，跳过的任务不消耗配额）
+
+        Args:
+            url: 目标URL
+
+        Returns:
+            float: 等待的秒数
+        """
+        return await self._get_host_bucket(url).acquire()
+
+    async def run(
+        self,
+        jobs: List[Dict[str, Any]],
+        worker: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        on_start: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        on_complete: Optional[Callable[[int, Dict[str, Any], Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        并发执行任务列表
+
+        Args:
+            jobs: 任务列表，每个任务必须包含url字段
+            worker: 执行单个任务的协程函数
+            on_start: 任务开始时的回调 (序号, 任务)
+            on_complete: 任务完成时的回调 (序号, 任务, 结果)
+
+        Returns:
+            List: 与jobs顺序一致的结果列表
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+
+        async def run_job(index: int, job: Dict[str, Any]) -> None:
+            async with semaphore:
+                if on_start:
+                    on_start(index, job)
+
+                try:
+                    result = await worker(job)
+                except Exception as e:
+                    result = {
+                        "success": False,
+                        "error": f"任务执行异常: {str(e)}",
+                        "url": job.get("url", "")
+                    }
+
+                results[index] = result
+                if on_complete:
+                    on_complete(index, job, result)
+
+        await asyncio.gather(*(run_job(i, job) for i, job in enumerate(jobs)))
+        return results
+
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """
+        获取调度器统计信息
+
+        Returns:
+            Dict: 统计信息
+        """
+        return {
+            'max_concurrency': self.max_concurrency,
+            'per_host_requests_per_minute': self.per_host_requests_per_minute,
+            'per_host_burst': self.per_host_burst,
+            'hosts': {
+                host: {'total_wait_time': round(bucket.total_wait_time, 2)}
+                for host, bucket in self._host_buckets.items()
+            }
+        }
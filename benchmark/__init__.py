@@ -0,0 +1,9 @@
+"""
+离线基准测试包
+在本地模拟华为文档站点与Gemini接口，端到端测量爬取与提取流水线的性能
+"""
+
+from .fake_doc_server import FakeDocServer
+from .fake_gemini_server import FakeGeminiServer
+
+__all__ = ['FakeDocServer', 'FakeGeminiServer']
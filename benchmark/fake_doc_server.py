@@ -0,0 +1,167 @@
+"""
+模拟文档站点模块
+提供录制的文档页面或合成的SPA页面，正文在可配置的延迟后由脚本渲染
+"""
+
+import hashlib
+import html
+from pathlib import Path
+from typing import Dict, Optional
+from aiohttp import web
+
+
+class FakeDocServer:
+    """本地文档站点，模拟华为开发者文档的SPA渲染行为"""
+
+    def __init__(
+        self,
+        pages_dir: Optional[Path] = None,
+        render_delay_ms: int = 800,
+        sections_per_page: int = 12,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        初始化模拟站点
+
+        Args:
+            pages_dir: 录制页面目录，存在{module_name}.html时直接返回该页面
+            render_delay_ms: 合成页面中正文由脚本渲染前的延迟（毫秒）
+            sections_per_page: 合成页面的章节数量
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+        """
+        self.pages_dir = Path(pages_dir) if pages_dir else None
+        self.render_delay_ms = render_delay_ms
+        self.sections_per_page = sections_per_page
+        self.host = host
+        self.port = port
+
+        self._runner: Optional[web.AppRunner] = None
+        self._page_cache: Dict[str, str] = {}
+
+        # 运行统计
+        self.requests = 0
+        self.not_modified = 0
+
+    @property
+    def base_url(self) -> str:
+        """站点根地址"""
+        return f"http://{self.host}:{self.port}"
+
+    def get_page_url(self, module_name: str) -> str:
+        """
+        获取模块对应的页面地址
+
+        Args:
+            module_name: 模块名称
+
+        Returns:
+            str: 页面URL
+        """
+        return f"{self.base_url}/doc/{module_name}"
+
+    async def start(self) -> None:
+        """启动站点"""
+        app = web.Application()
+        app.router.add_get('/doc/{module_name}', self._handle_page)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """关闭站点"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _load_page(self, module_name: str) -> str:
+        """
+        获取模块页面内容，优先使用录制页面
+
+        Args:
+            module_name: 模块名称
+
+        Returns:
+            str: 页面HTML
+        """
+        if module_name not in self._page_cache:
+            recorded = self.pages_dir / f"{module_name}.html" if self.pages_dir else None
+            if recorded and recorded.exists():
+                self._page_cache[module_name] = recorded.read_text(encoding='utf-8')
+            else:
+                self._page_cache[module_name] = self._build_synthetic_page(module_name)
+        return self._page_cache[module_name]
+
+    def _build_synthetic_page(self, module_name: str) -> str:
+        """
+        构建合成的SPA页面：导航和页脚为静态内容，正文在延迟后由脚本插入
+
+        Args:
+            module_name: 模块名称
+
+        Returns:
+            str: 页面HTML
+        """
+        title = module_name.replace('_', ' ').replace('-', ' ').title()
+        sections = []
+        for index in range(1, self.sections_per_page + 1):
+            sections.append(f"""
+<h2>{index}. {title} 场景{index}</h2>
+<p>在{title}场景中，应优先使用声明式UI描述界面结构，避免在build函数中执行耗时操作。
+合理拆分自定义组件，减少状态变量的影响范围，以降低不必要的组件刷新。</p>
+<ul>
+<li>使用@State管理组件内部状态，使用@Prop和@Link在父子组件间传递数据</li>
+<li>长列表使用LazyForEach配合cachedCount，减少首屏渲染时间</li>
+<li>避免在循环中创建大量临时对象</li>
+</ul>
+<pre class="language-arkts"><code>@Component
+struct Section{index} {{
+  @State count: number = {index}
+  build() {{
+    Column() {{
+      Text(`count: ${{this.count}}`)
+      Button('add').onClick(() => {{ this.count++ }})
+    }}
+  }}
+}}</code></pre>
+<table><tr><th>方案</th><th>首帧耗时</th><th>内存</th></tr>
+<tr><td>优化前</td><td>{300 + index * 10}ms</td><td>{80 + index}MB</td></tr>
+<tr><td>优化后</td><td>{120 + index * 5}ms</td><td>{60 + index}MB</td></tr></table>
+""")
+        content = html.escape("".join(sections)).replace('`', '\\`')
+
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} - 最佳实践</title></head>
+<body>
+<header class="site-header"><nav class="top-nav"><a href="/">首页</a><a href="/doc">文档</a></nav></header>
+<aside class="sidebar-catalog"><ul><li>目录项一</li><li>目录项二</li></ul></aside>
+<div id="app"><div class="loading">加载中...</div></div>
+<footer class="site-footer">Copyright Huawei Technologies</footer>
+<script>
+setTimeout(function () {{
+  var container = document.createElement('div');
+  container.className = 'markdown-body';
+  var template = document.createElement('textarea');
+  template.innerHTML = `<h1>{title}</h1>{content}`;
+  container.innerHTML = template.value;
+  var app = document.getElementById('app');
+  app.innerHTML = '';
+  app.appendChild(container);
+}}, {self.render_delay_ms});
+</script>
+</body></html>"""
+
+    async def _handle_page(self, request: web.Request) -> web.Response:
+        """返回页面，支持ETag条件请求"""
+        self.requests += 1
+        page = self._load_page(request.match_info['module_name'])
+        etag = '"' + hashlib.sha256(page.encode('utf-8')).hexdigest()[:16] + '"'
+
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={'ETag': etag})
+
+        return web.Response(text=page, content_type='text/html', headers={'ETag': etag})
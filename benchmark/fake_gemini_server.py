@@ -0,0 +1,377 @@
+"""
+模拟Gemini接口模块
+实现generateContent、streamGenerateContent与批处理接口的最小子集，按配置的延迟与输出长度返回内容，通过GEMINI_BASE_URL接入；
+同时提供OpenAI兼容的/v1/chat/completions接口，通过OPENAI_BASE_URL接入。可按配置注入限流（429）与服务端错误（503）
+"""
+
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import deque
+from typing import Dict, Any, List, Optional
+from aiohttp import web
+from utils import TokenHelper
+
+
+class FakeGeminiServer:
+    """本地Gemini与OpenAI兼容接口模拟服务"""
+
+    def __init__(
+        self,
+        base_latency_ms: int = 500,
+        per_token_latency_ms: float = 2.0,
+        output_tokens: int = 800,
+        batch_latency_ms: int = 3000,
+        rpm_limit: float = 0,
+        failure_rate: float = 0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        初始化模拟服务
+
+        Args:
+            base_latency_ms: 每次请求的固定延迟（毫秒）
+            per_token_latency_ms: 每个输出token增加的延迟（毫秒）
+            output_tokens: 每次返回的输出token数（估算）
+            batch_latency_ms: 批处理任务从提交到完成的延迟（毫秒）
+            rpm_limit: 每分钟最多接受的生成请求数，超出时返回429，0表示不限流
+            failure_rate: 随机返回503的概率（0~1）
+            seed: 失败注入的随机种子，相同种子与请求顺序下结果可复现
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+        """
+        self.base_latency_ms = base_latency_ms
+        self.per_token_latency_ms = per_token_latency_ms
+        self.output_tokens = output_tokens
+        self.batch_latency_ms = batch_latency_ms
+        self.rpm_limit = rpm_limit
+        self.failure_rate = failure_rate
+        self.host = host
+        self.port = port
+
+        self._runner: Optional[web.AppRunner] = None
+        self._random = random.Random(seed)
+        self._request_times: deque = deque()
+
+        # 运行统计
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.max_concurrent = 0
+        self._in_flight = 0
+        self.rate_limited = 0
+        self.injected_failures = 0
+
+        # 批处理任务: 任务ID -> 提交时间、模型、各请求的提示词
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self.batch_requests = 0
+
+    @property
+    def base_url(self) -> str:
+        """服务根地址，设置为GEMINI_BASE_URL"""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """启动服务"""
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post('/{api_version}/models/{model_action}', self._handle_generate)
+        app.router.add_get('/{api_version}/batches/{batch_id}', self._handle_get_batch)
+        app.router.add_post('/v1/chat/completions', self._handle_chat_completions)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        """关闭服务"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _build_output(self, prompt: str) -> str:
+        """
+        按提示词类型构建大致符合格式、长度约为output_tokens的输出
+
+        Args:
+            prompt: 提示词
+
+        Returns:
+            str: 生成内容
+        """
+        if "Cursor Rules" in prompt:
+            header = ("# HarmonyOS 模拟模块 - Cursor Rules\n\n你正在为HarmonyOS应用开发相关功能。\n\n"
+                      "## 核心原则\n\n- 模拟原则\n\n## 推荐做法\n\n## 禁止做法\n\n")
+        else:
+            header = "# 模拟模块 - 最佳实践\n\n## 📋 概述\n模拟的提取结果。\n\n## 🎯 最佳实践\n\n"
+
+        lines = [header]
+        tokens = TokenHelper.estimate_tokens(header)
+        index = 1
+        while tokens < self.output_tokens:
+            line = f"### {index}. 实践要点{index}\n- **实践要点**：使用LazyForEach渲染长列表并设置cachedCount\n\n"
+            lines.append(line)
+            tokens += TokenHelper.estimate_tokens(line)
+            index += 1
+        return "".join(lines)
+
+    def _build_response(self, text: str, prompt_tokens: int) -> Dict[str, Any]:
+        """构建与Gemini REST接口一致的响应体"""
+        output_tokens = TokenHelper.estimate_tokens(text)
+        return {
+            'candidates': [{
+                'content': {'parts': [{'text': text}], 'role': 'model'},
+                'finishReason': 'STOP',
+                'index': 0
+            }],
+            'usageMetadata': {
+                'promptTokenCount': prompt_tokens,
+                'candidatesTokenCount': output_tokens,
+                'totalTokenCount': prompt_tokens + output_tokens
+            },
+            'modelVersion': 'fake-gemini'
+        }
+
+    def _admit(self) -> Optional[web.Response]:
+        """
+        模拟服务端的限流与失败
+
+        Returns:
+            web.Response: 需要拒绝请求时返回429或503响应，否则返回None
+        """
+        now = time.monotonic()
+        if self.rpm_limit > 0:
+            while self._request_times and now - self._request_times[0] >= 60:
+                self._request_times.popleft()
+            if len(self._request_times) >= self.rpm_limit:
+                self.rate_limited += 1
+                retry_after = max(1, int(60 - (now - self._request_times[0])))
+                return web.json_response(
+                    {'error': {'code': 429, 'message': '模拟限流: 超过每分钟请求数', 'status': 'RESOURCE_EXHAUSTED'}},
+                    status=429, headers={'Retry-After': str(retry_after)}
+                )
+            self._request_times.append(now)
+
+        if self.failure_rate > 0 and self._random.random() < self.failure_rate:
+            self.injected_failures += 1
+            return web.json_response(
+                {'error': {'code': 503, 'message': '模拟服务端错误', 'status': 'UNAVAILABLE'}}, status=503
+            )
+        return None
+
+    async def _handle_generate(self, request: web.Request) -> web.StreamResponse:
+        """处理generateContent、streamGenerateContent与batchGenerateContent请求"""
+        model_action = request.match_info['model_action']
+        if model_action.endswith(':batchGenerateContent'):
+            return await self._handle_create_batch(request, model_action.rsplit(':', 1)[0])
+
+        streaming = model_action.endswith(':streamGenerateContent')
+        if not streaming and not model_action.endswith(':generateContent'):
+            return web.json_response({'error': {'code': 404, 'message': f'不支持的接口: {model_action}'}}, status=404)
+
+        body = await request.json()
+        prompt = self._extract_prompt(body)
+        prompt_tokens = TokenHelper.estimate_tokens(prompt)
+
+        rejection = self._admit()
+        if rejection is not None:
+            return rejection
+
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self._in_flight += 1
+        self.max_concurrent = max(self.max_concurrent, self._in_flight)
+        try:
+            text = self._build_output(prompt)
+            if streaming:
+                return await self._stream_response(request, text, prompt_tokens)
+
+            latency = self.base_latency_ms + self.per_token_latency_ms * TokenHelper.estimate_tokens(text)
+            await asyncio.sleep(latency / 1000)
+            return web.Response(
+                text=json.dumps(self._build_response(text, prompt_tokens), ensure_ascii=False),
+                content_type='application/json'
+            )
+        finally:
+            self._in_flight -= 1
+
+    async def _stream_response(self, request: web.Request, text: str, prompt_tokens: int) -> web.StreamResponse:
+        """
+        以SSE格式分块返回内容：固定延迟后返回首块，之后按每块的token数延迟
+
+        Args:
+            request: 请求对象
+            text: 完整生成内容
+            prompt_tokens: 输入token数
+
+        Returns:
+            web.StreamResponse: 流式响应
+        """
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+
+        lines = text.splitlines(keepends=True)
+        chunk_size = max(1, len(lines) // 8)
+        chunks = ["".join(lines[index:index + chunk_size]) for index in range(0, len(lines), chunk_size)]
+
+        await asyncio.sleep(self.base_latency_ms / 1000)
+        for chunk in chunks:
+            await asyncio.sleep(self.per_token_latency_ms * TokenHelper.estimate_tokens(chunk) / 1000)
+            payload = json.dumps(self._build_response(chunk, prompt_tokens), ensure_ascii=False)
+            await response.write(f"data: {payload}\r\n\r\n".encode('utf-8'))
+
+        await response.write_eof()
+        return response
+
+    async def _handle_chat_completions(self, request: web.Request) -> web.StreamResponse:
+        """处理OpenAI兼容的chat/completions请求，支持普通与SSE流式响应"""
+        body = await request.json()
+        prompt = "".join(
+            message.get('content') or '' for message in body.get('messages', []) if message.get('role') == 'user'
+        )
+        prompt_tokens = TokenHelper.estimate_tokens(prompt)
+
+        rejection = self._admit()
+        if rejection is not None:
+            return rejection
+
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self._in_flight += 1
+        self.max_concurrent = max(self.max_concurrent, self._in_flight)
+        try:
+            text = self._build_output(prompt)
+            if body.get('response_format', {}).get('type') == 'json_schema':
+                text = json.dumps({'summary': text[:200], 'practices': []}, ensure_ascii=False)
+            output_tokens = TokenHelper.estimate_tokens(text)
+            usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': output_tokens,
+                     'total_tokens': prompt_tokens + output_tokens}
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            model = body.get('model', 'fake-model')
+
+            if not body.get('stream'):
+                await asyncio.sleep((self.base_latency_ms + self.per_token_latency_ms * output_tokens) / 1000)
+                return web.json_response({
+                    'id': completion_id,
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                                 'finish_reason': 'stop'}],
+                    'usage': usage
+                })
+
+            response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+            await response.prepare(request)
+
+            def event(choices: List[Dict[str, Any]], chunk_usage=None) -> bytes:
+                payload = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                           'model': model, 'choices': choices, 'usage': chunk_usage}
+                return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode('utf-8')
+
+            lines = text.splitlines(keepends=True)
+            chunk_size = max(1, len(lines) // 8)
+            await asyncio.sleep(self.base_latency_ms / 1000)
+            for index in range(0, len(lines), chunk_size):
+                chunk = "".join(lines[index:index + chunk_size])
+                await asyncio.sleep(self.per_token_latency_ms * TokenHelper.estimate_tokens(chunk) / 1000)
+                await response.write(event([{'index': 0, 'delta': {'content': chunk}, 'finish_reason': None}]))
+            await response.write(event([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))
+            if body.get('stream_options', {}).get('include_usage'):
+                await response.write(event([], usage))
+            await response.write(b"data: [DONE]\n\n")
+            await response.write_eof()
+            return response
+        finally:
+            self._in_flight -= 1
+
+    @staticmethod
+    def _extract_prompt(request_body: Dict[str, Any]) -> str:
+        """拼接请求中所有文本片段"""
+        return "".join(
+            part.get('text', '')
+            for content in request_body.get('contents', [])
+            for part in content.get('parts', [])
+        )
+
+    async def _handle_create_batch(self, request: web.Request, model: str) -> web.Response:
+        """
+        创建批处理任务，只支持内联请求
+
+        Args:
+            request: 请求对象
+            model: 模型名称
+
+        Returns:
+            web.Response: 批处理任务描述
+        """
+        body = await request.json()
+        batch = body.get('batch', {})
+        inlined = batch.get('inputConfig', {}).get('requests', {}).get('requests', [])
+        prompts = [self._extract_prompt(item.get('request', item)) for item in inlined]
+
+        batch_id = uuid.uuid4().hex[:12]
+        self._batches[batch_id] = {
+            'created_at': time.monotonic(),
+            'create_time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'model': model,
+            'display_name': batch.get('displayName', ''),
+            'prompts': prompts
+        }
+        self.batch_requests += len(prompts)
+        return web.json_response(self._build_batch(batch_id))
+
+    async def _handle_get_batch(self, request: web.Request) -> web.Response:
+        """查询批处理任务，提交后经过batch_latency_ms即完成"""
+        batch_id = request.match_info['batch_id']
+        if batch_id not in self._batches:
+            return web.json_response({'error': {'code': 404, 'message': f'批处理任务不存在: {batch_id}'}}, status=404)
+        return web.json_response(self._build_batch(batch_id))
+
+    def _build_batch(self, batch_id: str) -> Dict[str, Any]:
+        """
+        构建与Gemini REST接口一致的批处理任务描述
+
+        Args:
+            batch_id: 任务ID
+
+        Returns:
+            Dict: 任务描述，完成时包含所有内联响应
+        """
+        batch = self._batches[batch_id]
+        done = (time.monotonic() - batch['created_at']) * 1000 >= self.batch_latency_ms
+        metadata: Dict[str, Any] = {
+            '@type': 'type.googleapis.com/google.ai.generativelanguage.v1main.GenerateContentBatch',
+            'model': batch['model'],
+            'displayName': batch['display_name'],
+            'createTime': batch['create_time'],
+            'state': 'BATCH_STATE_SUCCEEDED' if done else 'BATCH_STATE_RUNNING'
+        }
+        response: Dict[str, Any] = {'name': f"batches/{batch_id}", 'metadata': metadata}
+        if done:
+            responses: List[Dict[str, Any]] = [
+                {'response': self._build_response(self._build_output(prompt), TokenHelper.estimate_tokens(prompt))}
+                for prompt in batch['prompts']
+            ]
+            metadata['output'] = {'inlinedResponses': {'inlinedResponses': responses}}
+            response['done'] = True
+        return response
+
+    def get_server_stats(self) -> Dict[str, Any]:
+        """
+        获取服务统计信息
+
+        Returns:
+            Dict: 请求数、输入token数、最大并发数、批处理请求数、注入的限流与失败次数
+        """
+        return {
+            'requests': self.requests,
+            'prompt_tokens': self.prompt_tokens,
+            'max_concurrent': self.max_concurrent,
+            'batch_requests': self.batch_requests,
+            'rate_limited': self.rate_limited,
+            'injected_failures': self.injected_failures
+        }
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+离线基准测试入口
+启动模拟文档站点与模拟Gemini接口，端到端运行批量爬取与整合，输出耗时、吞吐量、内存峰值与分阶段耗时
+
+用法（在项目根目录执行）:
+    python -m benchmark.run_benchmark --modules 12 --runs 2
+    python -m benchmark.run_benchmark --backend openai --llm-rpm-limit 60 --llm-failure-rate 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from benchmark.fake_doc_server import FakeDocServer
+from benchmark.fake_gemini_server import FakeGeminiServer
+
+try:
+    import resource
+except ImportError:  # Windows没有resource模块
+    resource = None
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_args() -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="HarmonyOS爬取与提取流水线离线基准测试")
+    parser.add_argument("--modules", type=int, default=0, help="参与测试的模块数量，0表示配置文件中的全部模块")
+    parser.add_argument("--runs", type=int, default=1, help="在同一工作目录中连续运行的次数，第二次起可观察缓存效果")
+    parser.add_argument("--workspace", type=str, default="", help="工作目录，默认创建临时目录")
+    parser.add_argument("--pages-dir", type=str, default=str(PROJECT_ROOT / "benchmark" / "pages"),
+                        help="录制页面目录，存在{module_name}.html时优先使用")
+    parser.add_argument("--render-delay-ms", type=int, default=800, help="合成页面正文渲染延迟（毫秒）")
+    parser.add_argument("--llm-latency-ms", type=int, default=500, help="模拟Gemini每次请求的固定延迟（毫秒）")
+    parser.add_argument("--llm-token-latency-ms", type=float, default=2.0, help="模拟Gemini每个输出token的延迟（毫秒）")
+    parser.add_argument("--llm-output-tokens", type=int, default=800, help="模拟Gemini每次返回的输出token数")
+    parser.add_argument("--llm-rpm-limit", type=float, default=0, help="模拟服务每分钟接受的请求数，超出返回429，0表示不限流")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0, help="模拟服务随机返回503的概率")
+    parser.add_argument("--llm-seed", type=int, default=0, help="失败注入的随机种子")
+    parser.add_argument("--llm-pool-size", type=int, default=None, help="覆盖模型接口最大连接数")
+    parser.add_argument("--no-keepalive", action="store_true", help="模型接口不保持空闲连接，用于对比连接复用的效果")
+    parser.add_argument("--backend", type=str, default="gemini", choices=["gemini", "openai", "fake"],
+                        help="生成后端: gemini/openai经由本地模拟服务，fake为进程内模拟后端")
+    parser.add_argument("--crawl-concurrency", type=int, default=None, help="覆盖渲染并发数")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="覆盖AI提取并发数")
+    parser.add_argument("--host-rpm", type=float, default=600.0, help="单主机每分钟请求数（本地站点默认放宽）")
+    parser.add_argument("--skip-policy", type=str, default=None, help="覆盖已有输出的跳过策略")
+    parser.add_argument("--stream", action="store_true", help="流式生成并写入整合结果")
+    parser.add_argument("--batch-api", action="store_true", help="使用批处理接口延迟提取")
+    parser.add_argument("--report", type=str, default="", help="JSON报告路径，默认写入工作目录")
+    return parser.parse_args()
+
+
+def get_peak_rss_mb(children: bool = False) -> Optional[float]:
+    """
+    获取进程的内存峰值
+
+    Args:
+        children: 是否统计已退出的子进程（浏览器进程关闭后才会计入）
+
+    Returns:
+        float: 内存峰值（MB），平台不支持时返回None
+    """
+    if resource is None:
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS单位为字节
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(usage / divisor, 1)
+
+
+def write_benchmark_config(workspace: Path, doc_server: FakeDocServer, module_limit: int) -> Path:
+    """
+    基于项目模块配置生成指向本地站点的配置文件
+
+    Args:
+        workspace: 工作目录
+        doc_server: 模拟文档站点
+        module_limit: 模块数量上限，0表示不限制
+
+    Returns:
+        Path: 生成的配置文件路径
+    """
+    with open(PROJECT_ROOT / "harmony_modules_config.json", 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    remaining = module_limit if module_limit > 0 else sys.maxsize
+    modules = {}
+    for category_name, category_info in config["modules"].items():
+        sub_modules = {}
+        for sub_module_name, sub_module_info in category_info["sub_modules"].items():
+            if remaining <= 0:
+                break
+            sub_modules[sub_module_name] = {
+                **sub_module_info,
+                "url": doc_server.get_page_url(sub_module_info["module_name"])
+            }
+            remaining -= 1
+        if sub_modules:
+            modules[category_name] = {**category_info, "sub_modules": sub_modules}
+
+    config_file = workspace / "benchmark_modules_config.json"
+    config_file.write_text(json.dumps({**config, "modules": modules}, ensure_ascii=False, indent=2), encoding='utf-8')
+    return config_file
+
+
+async def run_once(args: argparse.Namespace, workspace: Path, config_file: Path) -> Dict[str, Any]:
+    """
+    执行一次完整的爬取与整合
+
+    Args:
+        args: 命令行参数
+        workspace: 工作目录
+        config_file: 模块配置文件
+
+    Returns:
+        Dict: 本次运行的测量结果
+    """
+    # 延迟导入，保证模拟服务的环境变量已设置
+    from config import ConfigManager
+    from ai import ContentProcessor
+    from crawler import WebCrawler
+    from batch import BatchProcessor
+    from utils import StatisticsHelper
+
+    config_manager = ConfigManager.from_settings(
+        output_dir=str(workspace / "output"),
+        config_file=str(config_file)
+    )
+    config = config_manager.config
+    config.page_cache_dir = str(workspace / ".cache" / "pages")
+    config.state_dir = str(workspace / ".cache" / "state")
+    config.per_host_requests_per_minute = args.host_rpm
+    config.per_host_burst = max(config.per_host_burst, config.crawl_concurrency)
+    config.pipeline_monitor_interval = 0
+    if args.crawl_concurrency:
+        config.crawl_concurrency = args.crawl_concurrency
+        config.browser_pool_size = max(config.browser_pool_size, args.crawl_concurrency)
+    if args.llm_concurrency:
+        config.llm_concurrency = args.llm_concurrency
+    if args.skip_policy:
+        config.skip_policy = args.skip_policy
+    config.stream_integration = args.stream
+    if args.batch_api:
+        config.deferred_extraction = True
+        config.batch_poll_interval = 1.0
+
+    if args.llm_pool_size:
+        config.llm_http_pool_size = args.llm_pool_size
+        config.llm_http_keepalive_connections = args.llm_pool_size
+    if args.no_keepalive:
+        config.llm_http_keepalive_expiry = 0
+
+    content_processor = ContentProcessor(
+        result_cache_dir=workspace / ".cache" / "llm_results",
+        http_settings=config_manager.get_llm_http_settings()
+    )
+    web_crawler = WebCrawler(config_manager=config_manager, content_processor=content_processor)
+    batch_processor = BatchProcessor(web_crawler=web_crawler, output_dir=config_manager.get_output_directory())
+
+    started_at = time.monotonic()
+    try:
+        results = await batch_processor.process_harmony_modules(str(config_file))
+        crawl_time = time.monotonic() - started_at
+
+        integration_started_at = time.monotonic()
+        integration_results = await batch_processor.integrate_all_best_practices(str(config_file))
+        integration_time = time.monotonic() - integration_started_at
+        browser_stats = web_crawler.browser_pool.get_pool_stats()
+    finally:
+        await web_crawler.close()
+
+    final_stats = StatisticsHelper.generate_final_statistics(results)
+    return {
+        'crawl_time': round(crawl_time, 2),
+        'integration_time': round(integration_time, 2),
+        'wall_time': round(time.monotonic() - started_at, 2),
+        'modules': final_stats,
+        'pages_per_minute': round(final_stats['new'] / crawl_time * 60, 2) if crawl_time > 0 else 0.0,
+        'integrations': {
+            'total': len(integration_results),
+            'successful': len([r for r in integration_results if r.get('success')]),
+            'skipped': len([r for r in integration_results if r.get('skipped')])
+        },
+        'pipeline_stages': batch_processor.last_pipeline_stats,
+        'timings': batch_processor.last_timing_report.get('summary', {}),
+        'llm_usage': content_processor.get_usage_summary(),
+        'browser_pool': browser_stats,
+        'page_cache': web_crawler.page_cache.get_cache_stats() if web_crawler.page_cache else None,
+        'peak_rss_mb': get_peak_rss_mb()
+    }
+
+
+def print_run_report(index: int, report: Dict[str, Any]) -> None:
+    """
+    打印单次运行的测量结果
+
+    Args:
+        index: 运行序号
+        report: 测量结果
+    """
+    modules = report['modules']
+    print("\n" + "=" * 60)
+    print(f"📏 第 {index} 次运行")
+    print("=" * 60)
+    print(f"⏱️ 总耗时 {report['wall_time']:.1f}秒 (爬取 {report['crawl_time']:.1f}秒, 整合 {report['integration_time']:.1f}秒)")
+    print(f"📄 模块: 新处理 {modules['new']} | 跳过 {modules['skipped']} | 失败 {modules['failed']} | "
+          f"{report['pages_per_minute']:.1f} 页/分钟")
+    print(f"🧩 整合: 成功 {report['integrations']['successful']}/{report['integrations']['total']} "
+          f"(未变化跳过 {report['integrations']['skipped']})")
+    print(f"💾 内存峰值: {report['peak_rss_mb']} MB")
+    connections = (report['llm_usage'] or {}).get('connections')
+    if connections:
+        print(f"🔌 模型接口连接: {connections['requests']} 次请求新建 {connections['new_connections']} 个连接 | "
+              f"复用率 {connections['reuse_rate']:.0%} | 建连合计 {connections['connect_time_total']:.2f}秒")
+
+    for stage in report['pipeline_stages']:
+        print(f"  - {stage['stage']}: 处理 {stage['processed']} | 忙碌 {stage['busy_time']:.1f}秒 | "
+              f"吞吐 {stage['throughput_per_minute']:.1f} 个/分钟 | 最大队列 {stage['max_queue_depth']}")
+    for stage, stats in report['timings'].items():
+        print(f"  - {stage}: p50 {stats['p50']:.2f}秒 | p95 {stats['p95']:.2f}秒 | 最长 {stats['max']:.2f}秒")
+
+
+async def main():
+    """主函数"""
+    args = parse_args()
+
+    workspace = Path(args.workspace) if args.workspace else Path(tempfile.mkdtemp(prefix="harmony-bench-"))
+    workspace.mkdir(parents=True, exist_ok=True)
+    print(f"📁 基准测试工作目录: {workspace}")
+
+    pages_dir = Path(args.pages_dir) if args.pages_dir else None
+    doc_server = FakeDocServer(pages_dir=pages_dir, render_delay_ms=args.render_delay_ms)
+    gemini_server = FakeGeminiServer(
+        base_latency_ms=args.llm_latency_ms,
+        per_token_latency_ms=args.llm_token_latency_ms,
+        output_tokens=args.llm_output_tokens,
+        rpm_limit=args.llm_rpm_limit,
+        failure_rate=args.llm_failure_rate,
+        seed=args.llm_seed
+    )
+    await doc_server.start()
+    await gemini_server.start()
+
+    # 所有Gemini调用指向模拟服务；客户端默认不限流，限流行为由模拟服务的429注入决定
+    os.environ["GEMINI_API_KEY"] = "benchmark-key"
+    os.environ["GEMINI_BASE_URL"] = gemini_server.base_url
+
+    # OpenAI兼容后端指向同一模拟服务；进程内模拟后端使用相同的延迟与失败注入参数
+    os.environ["LLM_BACKEND"] = args.backend
+    os.environ["OPENAI_API_KEY"] = "benchmark-key"
+    os.environ["OPENAI_BASE_URL"] = f"{gemini_server.base_url}/v1"
+    os.environ.setdefault("OPENAI_MODEL", "fake-model")
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["FAKE_LLM_TOKEN_LATENCY_MS"] = str(args.llm_token_latency_ms)
+    os.environ["FAKE_LLM_OUTPUT_TOKENS"] = str(args.llm_output_tokens)
+    os.environ["FAKE_LLM_RPM"] = str(args.llm_rpm_limit)
+    os.environ["FAKE_LLM_FAILURE_RATE"] = str(args.llm_failure_rate)
+    os.environ["FAKE_LLM_SEED"] = str(args.llm_seed)
+
+    runs = []
+    try:
+        config_file = write_benchmark_config(workspace, doc_server, args.modules)
+        for index in range(1, args.runs + 1):
+            report = await run_once(args, workspace, config_file)
+            runs.append(report)
+            print_run_report(index, report)
+    finally:
+        await doc_server.close()
+        await gemini_server.close()
+
+    full_report = {
+        'settings': vars(args),
+        'runs': runs,
+        'doc_server': {'requests': doc_server.requests, 'not_modified': doc_server.not_modified},
+        'gemini_server': gemini_server.get_server_stats(),
+        'peak_rss_mb': get_peak_rss_mb(),
+        'peak_rss_children_mb': get_peak_rss_mb(children=True)
+    }
+
+    report_path = Path(args.report) if args.report else workspace / "benchmark_report.json"
+    report_path.write_text(json.dumps(full_report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n📊 模拟站点请求 {doc_server.requests} 次 (304: {doc_server.not_modified}) | "
+          f"模拟Gemini请求 {gemini_server.requests} 次 (最大并发 {gemini_server.max_concurrent}, "
+          f"429: {gemini_server.rate_limited}, 503: {gemini_server.injected_failures})")
+    print(f"💾 内存峰值: 主进程 {full_report['peak_rss_mb']} MB | 浏览器等子进程 {full_report['peak_rss_children_mb']} MB")
+    print(f"📄 完整报告: {report_path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,6 +9,14 @@ from pathlib import Path
 from crawl4ai import BrowserConfig, CrawlerRunConfig, CacheMode
 
 
+# --cascade 使用的模型路由：提取与规则解析先用低成本模型，整合直接使用默认模型
+CASCADE_MODEL_ROUTES = {
+    'extraction': ['gemini-2.5-flash-lite', 'gemini-2.5-flash'],
+    'integration': ['gemini-2.5-flash'],
+    'lint_rules': ['gemini-2.5-flash-lite', 'gemini-2.5-flash'],
+}
+
+
 class CrawlerConfig:
     """爬虫配置类"""
 
@@ -17,6 +25,61 @@ class CrawlerConfig:
         self.output_dir = "harmony_cursor_rules"
         self.config_file = "harmony_modules_config.json"
 
+        # 浏览器池配置
+        self.browser_pool_size = 2  # 同时打开的标签页数量
+        self.max_pages_per_context = 10  # 每个标签页服务多少页面后回收
+
+        # SPA页面就绪判定模式: adaptive(按就绪信号等待) / fixed(固定15秒延迟)
+        self.spa_readiness_mode = "adaptive"
+
+        # 页面缓存配置
+        self.page_cache_enabled = True
+        self.page_cache_dir = ".cache/pages"
+        self.page_cache_ttl = 86400.0  # 缓存有效期（秒），过期后重新渲染并比较内容哈希
+
+        # 运行状态目录：运行日志、提取记录、批处理任务状态与构建清单，不写入受版本管理的输出目录
+        self.state_dir = ".cache/state"
+
+        # 批量爬取调度配置
+        self.crawl_concurrency = 2  # 全局并发爬取数
+        self.per_host_requests_per_minute = 20.0  # 每个主机每分钟请求数
+        self.per_host_burst = 2.0  # 每个主机允许的突发请求数
+
+        # 流水线配置
+        self.llm_concurrency = 4  # AI提取阶段并发数
+        self.pipeline_queue_size = 4  # 阶段间队列容量
+        self.pipeline_monitor_interval = 30.0  # 队列深度打印间隔（秒），0为关闭
+
+        # 延迟提取配置：渲染完成后把提取请求作为一个Gemini批处理任务提交，适合对时延不敏感的定时全量刷新
+        self.deferred_extraction = False
+        self.batch_poll_interval = 30.0  # 批处理任务状态轮询间隔（秒）
+
+        # 整合阶段配置
+        self.integration_concurrency = 3  # 同时整合的一级模块数
+        self.stream_integration = False  # 是否流式生成并逐块写入整合结果
+
+        # 已有输出的跳过策略: never / if-unchanged / max-age / force
+        self.skip_policy = "if-unchanged"
+        self.skip_max_age_days = 30.0  # max-age策略下提取结果的有效天数
+
+        # AI提取模式: markdown(直接生成文档) / structured(生成结构化实践记录，整合时本地合并去重)
+        self.extraction_mode = "markdown"
+
+        # 模型路由: 路由名称(extraction/integration/lint_rules) -> 按升级顺序排列的模型列表，
+        # 前面的模型输出未通过校验时升级到下一个；为空时所有任务使用默认模型
+        self.model_routes: Dict[str, list] = {}
+
+        # 模型接口HTTP连接配置：经代理访问时建连开销大，复用连接可省去每次请求的TCP与TLS握手
+        self.llm_http_pool_size = 16  # 最大连接数，应不小于AI调用的并发数
+        self.llm_http_keepalive_connections = 16  # 保持的空闲连接数，0表示不保活
+        self.llm_http_keepalive_expiry = 60.0  # 空闲连接保持时间（秒）
+        self.llm_http_connect_timeout = 10.0  # 建立连接超时（秒）
+        self.llm_http_request_timeout = 600.0  # 单次请求超时（秒）
+        self.llm_http2 = False  # 是否启用HTTP/2（需要安装h2），同一连接可并发多个请求
+
+        # 分阶段耗时导出路径，.csv为逐页面明细，其余为JSON，空字符串表示不导出
+        self.timings_export_path = ""
+
     @property
     def browser_config(self) -> BrowserConfig:
         """
@@ -88,6 +151,49 @@ class ConfigManager:
         manager = cls()
         debug_mode = "--debug" in sys.argv
         manager._config = CrawlerConfig(debug=debug_mode)
+
+        # --refresh=<策略> 覆盖默认跳过策略，单独的--refresh等同于force
+        # --timings-export=<路径> 导出分阶段耗时
+        # --structured 使用结构化提取模式
+        # --stream 流式写入整合结果
+        # --batch-api 使用批处理任务延迟提取
+        # --cascade 提取与规则解析先用低成本模型，校验失败再升级
+        # --http2 模型接口使用HTTP/2
+        # --llm-pool-size=<n> 模型接口最大连接数
+        # --llm-keepalive=<秒> 空闲连接保持时间，0表示不保活
+        # --llm-connect-timeout=<秒> / --llm-request-timeout=<秒> 建连与单次请求超时
+        for arg in sys.argv[1:]:
+            if arg == "--refresh":
+                manager._config.skip_policy = "force"
+            elif arg.startswith("--refresh="):
+                manager._config.skip_policy = arg.split("=", 1)[1]
+            elif arg.startswith("--timings-export="):
+                manager._config.timings_export_path = arg.split("=", 1)[1]
+            elif arg == "--structured":
+                manager._config.extraction_mode = "structured"
+            elif arg == "--stream":
+                manager._config.stream_integration = True
+            elif arg == "--batch-api":
+                manager._config.deferred_extraction = True
+            elif arg == "--cascade":
+                manager._config.model_routes = {
+                    route: list(models) for route, models in CASCADE_MODEL_ROUTES.items()
+                }
+            elif arg == "--http2":
+                manager._config.llm_http2 = True
+            elif arg.startswith("--llm-pool-size="):
+                pool_size = int(arg.split("=", 1)[1])
+                manager._config.llm_http_pool_size = pool_size
+                manager._config.llm_http_keepalive_connections = pool_size
+            elif arg.startswith("--llm-keepalive="):
+                keepalive_expiry = float(arg.split("=", 1)[1])
+                manager._config.llm_http_keepalive_expiry = keepalive_expiry
+                if keepalive_expiry <= 0:
+                    manager._config.llm_http_keepalive_connections = 0
+            elif arg.startswith("--llm-connect-timeout="):
+                manager._config.llm_http_connect_timeout = float(arg.split("=", 1)[1])
+            elif arg.startswith("--llm-request-timeout="):
+                manager._config.llm_http_request_timeout = float(arg.split("=", 1)[1])
         return manager
 
     @classmethod
@@ -134,6 +240,17 @@ class ConfigManager:
         output_dir.mkdir(exist_ok=True)
         return output_dir
 
+    def get_state_directory(self) -> Path:
+        """
+        获取运行状态目录路径
+
+        Returns:
+            Path: 运行状态目录路径对象
+        """
+        state_dir = Path(self.config.state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        return state_dir
+
     def is_debug_mode(self) -> bool:
         """
         检查是否为调试模式
@@ -179,11 +296,196 @@ class ConfigManager:
         """
         return self.config.crawler_run_config
 
+    def get_browser_pool_size(self) -> int:
+        """
+        获取浏览器池标签页数量
+
+        Returns:
+            int: 标签页数量
+        """
+        return self.config.browser_pool_size
+
+    def get_max_pages_per_context(self) -> int:
+        """
+        获取每个标签页回收前最多服务的页面数
+
+        Returns:
+            int: 页面数量
+        """
+        return self.config.max_pages_per_context
+
+    def get_spa_readiness_mode(self) -> str:
+        """
+        获取SPA页面就绪判定模式
+
+        Returns:
+            str: 就绪判定模式
+        """
+        return self.config.spa_readiness_mode
+
+    def is_page_cache_enabled(self) -> bool:
+        """
+        检查是否启用页面缓存
+
+        Returns:
+            bool: 是否启用页面缓存
+        """
+        return self.config.page_cache_enabled
+
+    def get_page_cache_directory(self) -> Path:
+        """
+        获取页面缓存目录
+
+        Returns:
+            Path: 页面缓存目录路径
+        """
+        return Path(self.config.page_cache_dir)
+
+    def get_page_cache_ttl(self) -> float:
+        """
+        获取页面缓存有效期
+
+        Returns:
+            float: 有效期秒数
+        """
+        return self.config.page_cache_ttl
+
+    def get_crawl_concurrency(self) -> int:
+        """
+        获取全局并发爬取数
+
+        Returns:
+            int: 并发数
+        """
+        return self.config.crawl_concurrency
+
+    def get_host_rate_limit(self) -> Dict[str, float]:
+        """
+        获取按主机的限流配置
+
+        Returns:
+            Dict: 包含requests_per_minute和burst的字典
+        """
+        return {
+            'requests_per_minute': self.config.per_host_requests_per_minute,
+            'burst': self.config.per_host_burst
+        }
+
+    def get_pipeline_settings(self) -> Dict[str, Any]:
+        """
+        获取流水线配置
+
+        Returns:
+            Dict: 包含llm_concurrency、queue_size、monitor_interval的字典
+        """
+        return {
+            'llm_concurrency': self.config.llm_concurrency,
+            'queue_size': self.config.pipeline_queue_size,
+            'monitor_interval': self.config.pipeline_monitor_interval
+        }
+
+    def get_deferred_extraction_settings(self) -> Dict[str, Any]:
+        """
+        获取延迟提取（批处理任务）配置
+
+        Returns:
+            Dict: 包含enabled和poll_interval的字典
+        """
+        return {
+            'enabled': self.config.deferred_extraction,
+            'poll_interval': self.config.batch_poll_interval
+        }
+
+    def get_integration_concurrency(self) -> int:
+        """
+        获取同时整合的一级模块数
+
+        Returns:
+            int: 并发数
+        """
+        return max(1, self.config.integration_concurrency)
+
+    def is_stream_integration(self) -> bool:
+        """
+        是否流式生成并逐块写入整合结果
+
+        Returns:
+            bool: 是否启用流式整合
+        """
+        return self.config.stream_integration
+
+    def get_skip_policy(self) -> Dict[str, Any]:
+        """
+        获取已有输出的跳过策略配置
+
+        Returns:
+            Dict: 包含mode和max_age_seconds的字典
+        """
+        return {
+            'mode': self.config.skip_policy,
+            'max_age_seconds': self.config.skip_max_age_days * 86400
+        }
+
+    def get_extraction_mode(self) -> str:
+        """
+        获取AI提取模式
+
+        Returns:
+            str: markdown或structured
+        """
+        return self.config.extraction_mode
+
+    def get_model_routes(self) -> Dict[str, list]:
+        """
+        获取模型路由配置
+
+        Returns:
+            Dict: 路由名称 -> 模型列表，为空时所有任务使用默认模型
+        """
+        return self.config.model_routes
+
+    def get_llm_http_settings(self) -> Dict[str, Any]:
+        """
+        获取模型接口的HTTP连接配置
+
+        Returns:
+            Dict: 包含pool_size、keepalive_connections、keepalive_expiry、connect_timeout、request_timeout、http2的字典
+        """
+        keepalive_connections = self.config.llm_http_keepalive_connections
+        if self.config.llm_http_keepalive_expiry <= 0:
+            keepalive_connections = 0
+        return {
+            'pool_size': max(1, self.config.llm_http_pool_size),
+            'keepalive_connections': keepalive_connections,
+            'keepalive_expiry': max(0.0, self.config.llm_http_keepalive_expiry),
+            'connect_timeout': self.config.llm_http_connect_timeout,
+            'request_timeout': self.config.llm_http_request_timeout,
+            'http2': self.config.llm_http2
+        }
+
+    def get_timings_export_path(self) -> Optional[Path]:
+        """
+        获取分阶段耗时导出路径
+
+        Returns:
+            Path: 导出路径，未配置时返回None
+        """
+        if not self.config.timings_export_path:
+            return None
+        return Path(self.config.timings_export_path)
+
     def print_startup_info(self) -> None:
         """打印启动信息"""
         print("🚀 开始HarmonyOS界面开发最佳实践完整爬取")
         if self.is_debug_mode():
             print("🔧 调试模式已启用")
+        print(f"♻️ 已有输出跳过策略: {self.config.skip_policy}")
+        if self.config.extraction_mode == "structured":
+            print("🧱 结构化提取模式已启用")
+        for route, models in self.config.model_routes.items():
+            print(f"🔀 模型路由 {route}: {' → '.join(models)}")
+        if self.config.llm_http2:
+            print("🌐 模型接口HTTP/2已启用")
         print("=" * 80)
 
     def get_settings_summary(self) -> Dict[str, Any]:
@@ -197,5 +499,12 @@ class ConfigManager:
             'debug_mode': self.is_debug_mode(),
             'output_directory': str(self.get_output_directory()),
             'config_file': self.get_config_file_path(),
-            'save_html': self.should_save_html()
+            'save_html': self.should_save_html(),
+            'browser_pool_size': self.get_browser_pool_size(),
+            'max_pages_per_context': self.get_max_pages_per_context(),
+            'crawl_concurrency': self.get_crawl_concurrency(),
+            'skip_policy': self.config.skip_policy,
+            'extraction_mode': self.config.extraction_mode,
+            'model_routes': self.config.model_routes,
+            'llm_http': self.get_llm_http_settings()
         }
\ No newline at end of file
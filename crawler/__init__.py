@@ -6,5 +6,8 @@
 from .core import WebCrawler
 from .spa_handler import SPAHandler
 from .file_saver import FileSaver
+from .browser_pool import BrowserPool
+from .page_cache import PageCache
+from .skip_policy import SkipPolicy
 
-__all__ = ['WebCrawler', 'SPAHandler', 'FileSaver']
\ No newline at end of file
+__all__ = ['WebCrawler', 'SPAHandler', 'FileSaver', 'BrowserPool', 'PageCache', 'SkipPolicy']
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+浏览器池模块
+维护一个长期存活的Chromium实例，为每次爬取分配独立的会话标签页
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator
+from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
+
+
+class BrowserSlot:
+    """浏览器池中的一个标签页槽位"""
+
+    def __init__(self, slot_id: int):
+        """
+        初始化槽位
+
+        Args:
+            slot_id: 槽位编号
+        """
+        self.slot_id = slot_id
+        self.generation = 0
+        self.pages_served = 0
+        self.broken = False
+
+    @property
+    def session_id(self) -> str:
+        """
+        获取当前槽位对应的crawl4ai会话ID
+
+        Returns:
+            str: 会话ID，回收后代数递增从而得到全新的标签页
+        """
+        return f"pool-slot-{self.slot_id}-gen-{self.generation}"
+
+
+class BrowserLease:
+    """从浏览器池借出的标签页租约"""
+
+    def __init__(self, pool: 'BrowserPool', slot: BrowserSlot):
+        """
+        初始化租约
+
+        Args:
+            pool: 所属浏览器池
+            slot: 借出的槽位
+        """
+        self.pool = pool
+        self.slot = slot
+        self.pages_served = 0
+
+        # 借出耗时：等待浏览器启动、等待空闲标签页
+        self.launch_time = 0.0
+        self.wait_time = 0.0
+
+    @property
+    def session_id(self) -> str:
+        """当前租约使用的会话ID"""
+        return self.slot.session_id
+
+    async def run(self, url: str, run_config: CrawlerRunConfig):
+        """
+        在租约对应的标签页中爬取页面
+
+        Args:
+            url: 目标URL
+            run_config: 爬虫运行配置
+
+        Returns:
+            crawl4ai的爬取结果
+        """
+        session_config = run_config.clone(session_id=self.session_id)
+        try:
+            result = await self.pool.crawler.arun(url=url, config=session_config)
+        except Exception:
+            self.slot.broken = True
+            raise
+
+        self.slot.pages_served += 1
+        self.pages_served += 1
+        if not result.success:
+            # 页面级失败同样可能意味着标签页已崩溃，回收后再复用
+            self.slot.broken = True
+        return result
+
+
+class BrowserPool:
+    """共享浏览器池，整个运行期间只启动一次Chromium"""
+
+    def __init__(
+        self,
+        browser_config: BrowserConfig,
+        max_tabs: int = 2,
+        max_pages_per_context: int = 10
+    ):
+        """
+        初始化浏览器池
+
+        Args:
+            browser_config: 浏览器配置
+            max_tabs: 同时可借出的标签页数量
+            max_pages_per_context: 每个标签页在回收前最多服务的页面数
+        """
+        self.browser_config = browser_config
+        self.max_tabs = max(1, max_tabs)
+        self.max_pages_per_context = max(1, max_pages_per_context)
+
+        self.crawler: Optional[AsyncWebCrawler] = None
+        self._slots: asyncio.Queue = asyncio.Queue()
+        self._start_lock = asyncio.Lock()
+        self._started = False
+
+        # 运行统计
+        self.browser_launches = 0
+        self.contexts_recycled = 0
+        self.pages_served = 0
+
+    @property
+    def is_started(self) -> bool:
+        """浏览器池是否已启动"""
+        return self._started
+
+    async def start(self) -> None:
+        """启动浏览器并初始化标签页槽位（重复调用无副作用）"""
+        async with self._start_lock:
+            if self._started:
+                return
+
+            self.crawler = AsyncWebCrawler(config=self.browser_config)
+            await self.crawler.start()
+            self.browser_launches += 1
+
+            for slot_id in range(self.max_tabs):
+                self._slots.put_nowait(BrowserSlot(slot_id))
+
+            self._started = True
+            print(f"🌐 浏览器池已启动 (标签页: {self.max_tabs}, 回收阈值: {self.max_pages_per_context}页)")
+
+    async def close(self) -> None:
+        """关闭浏览器池及其Chromium实例"""
+        async with self._start_lock:
+            if not self._started:
+                return
+
+            try:
+                await self.crawler.close()
+            except Exception as e:
+                print(f"⚠️ 浏览器关闭失败: {e}")
+
+            self.crawler = None
+            self._slots = asyncio.Queue()
+            self._started = False
+            print(f"🌐 浏览器池已关闭 (共服务 {self.pages_served} 个页面, 回收标签页 {self.contexts_recycled} 次)")
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[BrowserLease]:
+        """
+        借出一个标签页，使用完毕后自动归还
+
+        Yields:
+            BrowserLease: 标签页租约
+        """
+        started_at = time.monotonic()
+        await self.start()
+        launched_at = time.monotonic()
+        slot = await self._slots.get()
+
+        lease = BrowserLease(self, slot)
+        lease.launch_time = launched_at - started_at
+        lease.wait_time = time.monotonic() - launched_at
+        try:
+            yield lease
+        finally:
+            self.pages_served += lease.pages_served
+            await self._release(slot)
+
+    async def _release(self, slot: BrowserSlot) -> None:
+        """
+        归还槽位，按需回收标签页
+
+        Args:
+            slot: 待归还的槽位
+        """
+        if slot.broken or slot.pages_served >= self.max_pages_per_context:
+            await self._recycle(slot)
+
+        if self._started:
+            self._slots.put_nowait(slot)
+
+    async def _recycle(self, slot: BrowserSlot) -> None:
+        """
+        关闭槽位当前的标签页，下次使用时创建新标签页
+
+        Args:
+            slot: 待回收的槽位
+        """
+        old_session_id = slot.session_id
+        slot.generation += 1
+        slot.pages_served = 0
+        slot.broken = False
+        self.contexts_recycled += 1
+
+        if not self._started or self.crawler is None:
+            return
+
+        try:
+            await self.crawler.crawler_strategy.kill_session(old_session_id)
+        except Exception as e:
+            # 会话无法关闭通常意味着浏览器本身已经崩溃，重启整个浏览器
+            print(f"⚠️ 标签页回收失败，重启浏览器: {e}")
+            await self._restart_browser()
+
+    async def _restart_browser(self) -> None:
+        """重启底层Chromium实例，保留现有槽位"""
+        try:
+            await self.crawler.close()
+        except Exception:
+            pass
+
+        self.crawler = AsyncWebCrawler(config=self.browser_config)
+        await self.crawler.start()
+        self.browser_launches += 1
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        获取浏览器池统计信息
+
+        Returns:
+            Dict: 统计信息
+        """
+        return {
+            'started': self._started,
+            'max_tabs': self.max_tabs,
+            'max_pages_per_context': self.max_pages_per_context,
+            'browser_launches': self.browser_launches,
+            'contexts_recycled': self.contexts_recycled,
+            'pages_served': self.pages_served
+        }
@@ -4,14 +4,18 @@
 """
 
 import asyncio
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional
-from crawl4ai import AsyncWebCrawler
+from typing import Dict, Any, Optional, Callable, Awaitable
+from crawl4ai import CrawlerRunConfig
 from config import ConfigManager
 from ai import ContentProcessor
-from utils import URLHelper
+from utils import URLHelper, TimingSpans
 from .spa_handler import SPAHandler
 from .file_saver import FileSaver
+from .browser_pool import BrowserPool
+from .page_cache import PageCache
+from .skip_policy import SkipPolicy
 
 
 class WebCrawler:
@@ -29,13 +33,168 @@ class WebCrawler:
         self.content_processor = content_processor
 
         # 初始化组件
-        self.spa_handler = SPAHandler()
-        self.file_saver = FileSaver(debug_mode=config_manager.is_debug_mode())
+        self.spa_handler = SPAHandler(readiness_mode=config_manager.get_spa_readiness_mode())
+        self.file_saver = FileSaver(
+            debug_mode=config_manager.is_debug_mode(),
+            record_dir=config_manager.get_state_directory() / "extraction_records"
+        )
+        self.skip_policy = SkipPolicy(**config_manager.get_skip_policy())
 
         # 获取配置
         self.output_dir = config_manager.get_output_directory()
         self.debug_mode = config_manager.is_debug_mode()
 
+        # 共享浏览器池，首次爬取时启动，由调用方在运行结束时关闭
+        self.browser_pool = BrowserPool(
+            browser_config=config_manager.get_browser_config(),
+            max_tabs=config_manager.get_browser_pool_size(),
+            max_pages_per_context=config_manager.get_max_pages_per_context()
+        )
+
+        # 持久化页面缓存，未变化的页面无需重新渲染
+        self.page_cache: Optional[PageCache] = None
+        if config_manager.is_page_cache_enabled():
+            self.page_cache = PageCache(
+                cache_dir=config_manager.get_page_cache_directory(),
+                ttl_seconds=config_manager.get_page_cache_ttl()
+            )
+
+        # 可选的主机级限流钩子，在真正发起页面请求前调用
+        self.host_throttle: Optional[Callable[[str], Awaitable[float]]] = None
+
+    async def close(self) -> None:
+        """关闭爬虫持有的浏览器池"""
+        await self.browser_pool.close()
+
+    async def _render_page(self, url: str, run_config: CrawlerRunConfig, timings: Optional[TimingSpans] = None):
+        """
+        从浏览器池借出标签页并渲染页面
+
+        Args:
+            url: 目标URL
+            run_config: 爬虫运行配置
+            timings: 分阶段耗时记录，为None时不记录
+
+        Returns:
+            Tuple: (crawl4ai的爬取结果, 渲染耗时秒数)
+        """
+        if self.host_throttle:
+            await self.host_throttle(url)
+
+        async with self.browser_pool.acquire() as lease:
+            started_at = time.monotonic()
+            result = await lease.run(url, run_config)
+            render_time = time.monotonic() - started_at
+
+        if timings is not None:
+            timings.add('browser_launch', lease.launch_time)
+            timings.add('tab_wait', lease.wait_time)
+            self._add_render_timings(timings, result, render_time)
+
+        return result, round(render_time, 2)
+
+    def _add_render_timings(self, timings: TimingSpans, result, render_time: float) -> None:
+        """
+        根据就绪报告把渲染耗时拆分为导航、SPA等待和页面交互三段
+
+        Args:
+            timings: 分阶段耗时记录
+            result: crawl4ai的爬取结果
+            render_time: 渲染总耗时（秒）
+        """
+        report = self.spa_handler.extract_readiness_report(result) if result.success else None
+        if not report:
+            # 固定等待模式或脚本未返回报告时无法拆分
+            timings.add('navigation', render_time)
+            return
+
+        spa_wait = report.get('quiet_ms', 0) / 1000
+        js_interactions = max(0.0, report.get('total_ms', 0) / 1000 - spa_wait)
+        timings.add('navigation', render_time - spa_wait - js_interactions)
+        timings.add('spa_wait', spa_wait)
+        timings.add('js_interactions', js_interactions)
+
+    async def fetch_page(self, url: str, use_spa_mode: bool = True) -> Dict[str, Any]:
+        """
+        获取页面内容，优先复用页面缓存，必要时渲染页面
+
+        Args:
+            url: 目标URL
+            use_spa_mode: 是否使用SPA模式
+
+        Returns:
+            Dict: 包含success、page_content、metadata、render_time、from_cache、content_hash、timings等字段
+        """
+        timings = TimingSpans()
+
+        # 页面缓存在有效期内时跳过渲染
+        if self.page_cache:
+            with timings.span('cache_lookup'):
+                cached = await self.page_cache.lookup(url)
+            if cached:
+                return {
+                    "success": True,
+                    "page_content": cached['html'],
+                    "metadata": {**cached['metadata'], 'url': url},
+                    "render_time": 0.0,
+                    "from_cache": True,
+                    "content_hash": cached['content_hash'],
+                    "timings": timings
+                }
+
+        # 选择爬虫配置
+        if use_spa_mode:
+            run_config = self.spa_handler.create_spa_crawler_config()
+        else:
+            run_config = self.config_manager.get_crawler_run_config()
+
+        result, render_time = await self._render_page(url, run_config, timings)
+
+        if not result.success:
+            return {
+                "success": False,
+                "error": f"页面访问失败: {result.error_message}"
+            }
+
+        # 获取页面内容
+        page_content = result.cleaned_html or result.html
+
+        # 验证内容有效性
+        if use_spa_mode and not self.spa_handler.validate_spa_content(page_content):
+            return {
+                "success": False,
+                "error": "SPA页面内容验证失败或内容过少"
+            }
+        elif not use_spa_mode and len(page_content) < 1000:
+            return {
+                "success": False,
+                "error": "页面内容获取失败或内容过少"
+            }
+
+        # 提取元数据
+        if use_spa_mode:
+            metadata = self.spa_handler.extract_spa_metadata(result)
+        else:
+            metadata = {
+                'title': result.metadata.get('title', '未知标题') if result.metadata else '未知标题',
+                'content_type': 'standard'
+            }
+        metadata['url'] = url
+
+        content_hash = PageCache.hash_content(page_content)
+        if self.page_cache:
+            self.page_cache.put(url=url, html=page_content, metadata=metadata)
+
+        return {
+            "success": True,
+            "page_content": page_content,
+            "metadata": metadata,
+            "render_time": render_time,
+            "from_cache": False,
+            "content_hash": content_hash,
+            "timings": timings
+        }
+
     async def crawl_single_page(
         self,
         url: str,
@@ -59,64 +218,33 @@ class WebCrawler:
         if not module_name:
             module_name = URLHelper.get_module_name_from_url(url)
 
-        # 选择爬虫配置
-        if use_spa_mode:
-            run_config = self.spa_handler.create_spa_crawler_config()
-        else:
-            run_config = self.config_manager.get_crawler_run_config()
-
         try:
-            async with AsyncWebCrawler(config=self.config_manager.get_browser_config()) as crawler:
-                result = await crawler.arun(url=url, config=run_config)
-
-                if not result.success:
-                    return {
-                        "success": False,
-                        "error": f"页面访问失败: {result.error_message}",
-                        "url": url,
-                        "module_name": module_name
-                    }
-
-                # 获取页面内容
-                page_content = result.cleaned_html or result.html
-
-                # 验证内容有效性
-                if use_spa_mode and not self.spa_handler.validate_spa_content(page_content):
-                    return {
-                        "success": False,
-                        "error": "SPA页面内容验证失败或内容过少",
-                        "url": url,
-                        "module_name": module_name
-                    }
-                elif not use_spa_mode and len(page_content) < 1000:
-                    return {
-                        "success": False,
-                        "error": "页面内容获取失败或内容过少",
-                        "url": url,
-                        "module_name": module_name
-                    }
-
-                # 提取元数据
-                if use_spa_mode:
-                    metadata = self.spa_handler.extract_spa_metadata(result)
-                else:
-                    metadata = {
-                        'title': result.metadata.get('title', '未知标题') if result.metadata else '未知标题',
-                        'url': url,
-                        'content_type': 'standard'
-                    }
-
-                # 根据开关决定是否使用AI处理器提取最佳实践
-                markdown_content = ""
-                if extract_best_practices and self.content_processor.is_api_available():
-                    markdown_content = self.content_processor.extract_best_practices(
-                        html_content=page_content,
-                        module_name=module_name,
-                        title=metadata['title'],
-                        url=url
-                    )
-
-                # 保存文件
+            page = await self.fetch_page(url, use_spa_mode=use_spa_mode)
+
+            if not page["success"]:
+                return {
+                    "success": False,
+                    "error": page["error"],
+                    "url": url,
+                    "module_name": module_name
+                }
+
+            page_content = page["page_content"]
+            metadata = page["metadata"]
+
+            # 根据开关决定是否使用AI处理器提取最佳实践
+            markdown_content = ""
+            if extract_best_practices and self.content_processor.is_api_available():
+                markdown_content = await self.content_processor.aextract_best_practices(
+                    html_content=page_content,
+                    module_name=module_name,
+                    title=metadata['title'],
+                    url=url,
+                    timings=page['timings']
+                )
+
+            # 保存文件
+            with page['timings'].span('file_write'):
                 save_result = self.file_saver.save_crawl_result(
                     target_dir=self.output_dir,
                     module_name=module_name,
@@ -126,12 +254,16 @@ class WebCrawler:
                     metadata=metadata
                 )
 
-                # 在返回结果中添加原始HTML内容
-                save_result['html_content'] = page_content
-                save_result['url'] = url
-                save_result['module_name'] = module_name
+            # 在返回结果中添加原始HTML内容
+            save_result['html_content'] = page_content
+            save_result['url'] = url
+            save_result['module_name'] = module_name
+            save_result['render_time'] = page['render_time']
+            save_result['from_cache'] = page['from_cache']
+            save_result['readiness'] = metadata.get('readiness')
+            save_result['timings'] = page['timings'].to_dict()
 
-                return save_result
+            return save_result
 
         except Exception as e:
             return {
@@ -141,6 +273,225 @@ class WebCrawler:
                 "module_name": module_name
             }
 
+    def check_skip_before_fetch(
+        self,
+        target_dir: Path,
+        url: str,
+        module_name: str,
+        sub_module_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        获取页面前按跳过策略检查已有输出
+
+        Args:
+            target_dir: 目标目录
+            url: 目标URL
+            module_name: 模块名称（用于文件命名）
+            sub_module_name: 子模块中文名称
+
+        Returns:
+            Dict: 可以跳过时返回已有文件信息，否则返回None
+        """
+        existing_result = self.file_saver.check_existing_files(target_dir, module_name, sub_module_name)
+        if self.skip_policy.mode == 'force' or not existing_result:
+            return None
+
+        record = self.file_saver.load_extraction_record(target_dir, module_name)
+        should_skip, reason = self.skip_policy.check_before_fetch(True, record)
+        if not should_skip:
+            return None
+
+        if record is None and self.skip_policy.mode == 'max-age':
+            self._seed_extraction_record(target_dir, module_name, url, None, existing_result)
+
+        existing_result["url"] = url
+        existing_result["skip_reason"] = reason
+        return existing_result
+
+    def check_skip_after_fetch(
+        self,
+        target_dir: Path,
+        url: str,
+        module_name: str,
+        sub_module_name: str,
+        page: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        获取页面后按页面内容哈希检查已有输出是否仍然有效（if-unchanged策略）
+
+        Args:
+            target_dir: 目标目录
+            url: 目标URL
+            module_name: 模块名称（用于文件命名）
+            sub_module_name: 子模块中文名称
+            page: fetch_page返回的页面信息
+
+        Returns:
+            Dict: 页面未变化可以跳过提取时返回已有文件信息，否则返回None
+        """
+        if not self.skip_policy.needs_page_content:
+            return None
+
+        existing_result = self.file_saver.check_existing_files(target_dir, module_name, sub_module_name)
+        if not existing_result:
+            return None
+
+        record = self.file_saver.load_extraction_record(target_dir, module_name)
+        if record is not None and not record.get('complete', True):
+            return None
+
+        fingerprint = self.content_processor.get_extraction_fingerprint()
+        should_skip, reason = self.skip_policy.check_after_fetch(
+            record, page["content_hash"], fingerprint['prompt_version'], fingerprint['model']
+        )
+        if not should_skip:
+            return None
+
+        if record is None or not record.get('content_hash'):
+            self._seed_extraction_record(target_dir, module_name, url, page["content_hash"], existing_result)
+
+        existing_result["url"] = url
+        existing_result["skip_reason"] = reason
+        existing_result["render_time"] = page["render_time"]
+        existing_result["from_cache"] = page["from_cache"]
+        existing_result["timings"] = page["timings"].to_dict()
+        return existing_result
+
+    def _seed_extraction_record(
+        self,
+        target_dir: Path,
+        module_name: str,
+        url: str,
+        content_hash: Optional[str],
+        existing_result: Dict[str, Any]
+    ) -> None:
+        """
+        为没有提取记录的已有输出补记记录，之后按记录正常判定是否刷新
+
+        Args:
+            target_dir: 目标目录
+            module_name: 模块名称（用于文件命名）
+            url: 源URL
+            content_hash: 当前页面内容哈希，未获取页面时为None
+            existing_result: check_existing_files返回的已有文件信息
+        """
+        try:
+            extracted_at = Path(existing_result["markdown_file"]).stat().st_mtime
+        except OSError:
+            extracted_at = time.time()
+
+        self.file_saver.save_extraction_record(target_dir, module_name, {
+            'url': url,
+            'content_hash': content_hash,
+            **self.content_processor.get_extraction_fingerprint(),
+            'served_models': [],
+            'extracted_at': extracted_at,
+            'complete': True,
+            'seeded': True
+        })
+
+    def _build_extraction_record(self, url: str, page: Dict[str, Any], markdown_content: str) -> Dict[str, Any]:
+        """
+        构建子模块的提取记录
+
+        Args:
+            url: 源URL
+            page: fetch_page返回的页面信息
+            markdown_content: 最佳实践markdown内容
+
+        Returns:
+            Dict: 提取记录
+        """
+        return {
+            'url': url,
+            'content_hash': page["content_hash"],
+            **self.content_processor.get_extraction_fingerprint(),
+            'served_models': page.get("served_models", []),
+            'extracted_at': time.time(),
+            'complete': bool(markdown_content) and not self.content_processor.is_fallback_content(markdown_content)
+        }
+
+    async def extract_page(self, page: Dict[str, Any], sub_module_name: str, url: str) -> str:
+        """
+        使用AI内容处理器从已获取的页面中提取最佳实践
+
+        Args:
+            page: fetch_page返回的页面信息
+            sub_module_name: 子模块中文名称
+            url: 源URL
+
+        Returns:
+            str: 最佳实践markdown内容，AI不可用时返回空字符串；
+                 结构化模式下实践记录文档写入page["practice_records"]，保存时一并写入
+        """
+        if not self.content_processor.is_api_available():
+            return ""
+
+        # 记录实际完成调用的模型（级联路由下可能升级），保存时写入提取记录
+        with self.content_processor.track_served_models() as served_models:
+            if self.content_processor.is_structured_mode():
+                markdown_content, page["practice_records"] = await self.content_processor.aextract_structured_practices(
+                    html_content=page["page_content"],
+                    module_name=sub_module_name,
+                    title=page["metadata"]['title'],
+                    url=url,
+                    timings=page.get("timings")
+                )
+            else:
+                markdown_content = await self.content_processor.aextract_best_practices(
+                    html_content=page["page_content"],
+                    module_name=sub_module_name,  # 使用中文名称
+                    title=page["metadata"]['title'],
+                    url=url,
+                    timings=page.get("timings")
+                )
+        page["served_models"] = served_models
+        return markdown_content
+
+    def save_page(
+        self,
+        target_dir: Path,
+        module_name: str,
+        sub_module_name: str,
+        page: Dict[str, Any],
+        markdown_content: str
+    ) -> Dict[str, Any]:
+        """
+        保存页面的爬取与提取结果
+
+        Args:
+            target_dir: 目标目录
+            module_name: 模块名称（用于文件命名）
+            sub_module_name: 子模块中文名称
+            page: fetch_page返回的页面信息
+            markdown_content: 最佳实践markdown内容
+
+        Returns:
+            Dict: 保存结果
+        """
+        timings = page.get("timings") or TimingSpans()
+        with timings.span('file_write'):
+            save_result = self.file_saver.save_crawl_result(
+                target_dir=target_dir,
+                module_name=module_name,
+                sub_module_name=sub_module_name,
+                html_content=page["page_content"],
+                markdown_content=markdown_content,
+                metadata=page["metadata"],
+                extraction_record=self._build_extraction_record(
+                    page["metadata"].get('url', ''), page, markdown_content
+                ),
+                practice_records=page.get("practice_records")
+            )
+        save_result['render_time'] = page['render_time']
+        save_result['from_cache'] = page['from_cache']
+        save_result['readiness'] = page['metadata'].get('readiness')
+        save_result['timings'] = timings.to_dict()
+        if page.get("served_models"):
+            save_result['served_models'] = page["served_models"]
+
+        return save_result
+
     async def crawl_with_directory_structure(
         self,
         target_dir: Path,
@@ -160,69 +511,32 @@ class WebCrawler:
         Returns:
             Dict: 爬取结果
         """
-        # 检查文件是否已存在
-        existing_result = self.file_saver.check_existing_files(
-            target_dir, module_name, sub_module_name
-        )
+        # 按跳过策略检查已有输出
+        existing_result = self.check_skip_before_fetch(target_dir, url, module_name, sub_module_name)
         if existing_result:
-            existing_result["url"] = url  # 补充URL信息
             return existing_result
 
-        # 获取SPA爬虫配置
-        run_config = self.spa_handler.create_spa_crawler_config()
-
         try:
-            async with AsyncWebCrawler(config=self.config_manager.get_browser_config()) as crawler:
-                result = await crawler.arun(url=url, config=run_config)
-
-                if not result.success:
-                    return {
-                        "success": False,
-                        "error": f"页面访问失败: {result.error_message}",
-                        "url": url,
-                        "module_name": module_name,
-                        "sub_module_name": sub_module_name
-                    }
-
-                # 获取页面内容
-                page_content = result.cleaned_html or result.html
-
-                # 验证SPA页面内容
-                if not self.spa_handler.validate_spa_content(page_content):
-                    return {
-                        "success": False,
-                        "error": "SPA页面内容验证失败或内容过少",
-                        "url": url,
-                        "module_name": module_name,
-                        "sub_module_name": sub_module_name
-                    }
-
-                # 提取元数据
-                metadata = self.spa_handler.extract_spa_metadata(result)
-                metadata['url'] = url
-
-                # 使用AI内容处理器提取最佳实践
-                markdown_content = ""
-                if self.content_processor.is_api_available():
-                    markdown_content = self.content_processor.extract_best_practices(
-                        html_content=page_content,
-                        module_name=sub_module_name,  # 使用中文名称
-                        title=metadata['title'],
-                        url=url
-                    )
-
-                # 创建临时文件保存器（使用目标目录）
-                temp_file_saver = FileSaver(debug_mode=self.debug_mode)
-                save_result = temp_file_saver.save_crawl_result(
-                    target_dir=target_dir,
-                    module_name=module_name,
-                    sub_module_name=sub_module_name,
-                    html_content=page_content,
-                    markdown_content=markdown_content,
-                    metadata=metadata
-                )
+            page = await self.fetch_page(url, use_spa_mode=True)
+
+            if not page["success"]:
+                return {
+                    "success": False,
+                    "error": page["error"],
+                    "url": url,
+                    "module_name": module_name,
+                    "sub_module_name": sub_module_name
+                }
+
+            # 页面内容未变化时复用已有的最佳实践
+            unchanged_result = self.check_skip_after_fetch(target_dir, url, module_name, sub_module_name, page)
+            if unchanged_result:
+                return unchanged_result
+
+            # 使用AI内容处理器提取最佳实践
+            markdown_content = await self.extract_page(page, sub_module_name, url)
 
-                return save_result
+            return self.save_page(target_dir, module_name, sub_module_name, page, markdown_content)
 
         except Exception as e:
             return {
@@ -268,7 +582,9 @@ class WebCrawler:
             'spa_handler_ready': self.spa_handler is not None,
             'file_saver_ready': self.file_saver is not None,
             'debug_mode': self.debug_mode,
-            'output_directory': str(self.output_dir)
+            'output_directory': str(self.output_dir),
+            'browser_pool': self.browser_pool.get_pool_stats(),
+            'page_cache': self.page_cache.get_cache_stats() if self.page_cache else None
         }
 
     async def batch_crawl_urls(
@@ -3,6 +3,7 @@
 处理HTML文件、markdown文件的保存逻辑
 """
 
+import json
 import time
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -12,14 +13,16 @@ from utils import FileHelper
 class FileSaver:
     """文件保存处理器"""
 
-    def __init__(self, debug_mode: bool = False):
+    def __init__(self, debug_mode: bool = False, record_dir: Optional[Path] = None):
         """
         初始化文件保存器
 
         Args:
             debug_mode: 是否启用调试模式（保存HTML文件）
+            record_dir: 提取记录目录，按输出子目录名分开保存；为None时与输出文件放在同一目录
         """
         self.debug_mode = debug_mode
+        self.record_dir = Path(record_dir) if record_dir else None
 
     def check_existing_files(
         self,
@@ -28,7 +31,7 @@ class FileSaver:
         sub_module_name: str
     ) -> Optional[Dict[str, Any]]:
         """
-        检查是否已存在相关文件
+        检查是否已存在相关文件（只读取文件状态，不读取内容）
 
         Args:
             target_dir: 目标目录
@@ -40,25 +43,110 @@ class FileSaver:
         """
         markdown_file = target_dir / f"{module_name}.md"
 
-        if markdown_file.exists():
-            # 读取文件信息
-            file_info = FileHelper.get_file_info(markdown_file)
-            html_file = target_dir / f"{module_name}.html" if self.debug_mode else None
+        try:
+            markdown_stat = markdown_file.stat()
+        except OSError:
+            return None
 
-            return {
-                "success": True,
-                "url": "",  # 这里没有URL信息，调用者需要填充
-                "title": sub_module_name,
-                "module_name": module_name,
-                "sub_module_name": sub_module_name,
-                "html_file": str(html_file) if (html_file and html_file.exists()) else None,
-                "markdown_file": str(markdown_file),
-                "content_length": file_info.get('content_length', 0),
-                "has_best_practices": True,
-                "skipped": True  # 标记为跳过
-            }
+        html_file = target_dir / f"{module_name}.html" if self.debug_mode else None
 
-        return None
+        return {
+            "success": True,
+            "url": "",  # 这里没有URL信息，调用者需要填充
+            "title": sub_module_name,
+            "module_name": module_name,
+            "sub_module_name": sub_module_name,
+            "html_file": str(html_file) if (html_file and html_file.exists()) else None,
+            "markdown_file": str(markdown_file),
+            "content_length": markdown_stat.st_size,
+            "has_best_practices": True,
+            "skipped": True  # 标记为跳过
+        }
+
+    def _record_path(self, target_dir: Path, module_name: str) -> Path:
+        """获取子模块提取记录文件路径"""
+        if self.record_dir is None:
+            return self._legacy_record_path(target_dir, module_name)
+        return self.record_dir / Path(target_dir).name / f"{module_name}.meta.json"
+
+    @staticmethod
+    def _legacy_record_path(target_dir: Path, module_name: str) -> Path:
+        """获取旧版本写在输出目录中的提取记录文件路径"""
+        return Path(target_dir) / f"{module_name}.meta.json"
+
+    def load_extraction_record(self, target_dir: Path, module_name: str) -> Optional[Dict[str, Any]]:
+        """
+        读取子模块的提取记录
+
+        Args:
+            target_dir: 目标目录
+            module_name: 模块名称
+
+        Returns:
+            Dict: 提取记录（源URL、页面内容哈希、提示词版本、模型、提取时间等），不存在或损坏时返回None
+        """
+        record_path = self._record_path(target_dir, module_name)
+        if not record_path.exists():
+            # 兼容旧版本写在输出目录中的记录，下次保存时迁移到记录目录
+            record_path = self._legacy_record_path(target_dir, module_name)
+        try:
+            return json.loads(record_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 提取记录读取失败 {record_path.name}: {e}")
+            return None
+
+    def save_extraction_record(self, target_dir: Path, module_name: str, record: Dict[str, Any]) -> None:
+        """
+        写入子模块的提取记录
+
+        Args:
+            target_dir: 目标目录
+            module_name: 模块名称
+            record: 提取记录
+        """
+        record_path = self._record_path(target_dir, module_name)
+        try:
+            record_path.parent.mkdir(parents=True, exist_ok=True)
+            FileHelper.atomic_write_text(record_path, json.dumps(record, ensure_ascii=False, indent=2))
+            legacy_path = self._legacy_record_path(target_dir, module_name)
+            if legacy_path != record_path:
+                legacy_path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"⚠️ 提取记录保存失败 {record_path.name}: {e}")
+
+    def _practices_path(self, target_dir: Path, module_name: str) -> Path:
+        """获取子模块结构化实践记录文件路径"""
+        return target_dir / f"{module_name}.practices.json"
+
+    def save_practice_records(
+        self,
+        target_dir: Path,
+        module_name: str,
+        practice_records: Optional[Dict[str, Any]]
+    ) -> Optional[Path]:
+        """
+        写入子模块的结构化实践记录，没有记录时删除旧文件，避免整合时读到过期记录
+
+        Args:
+            target_dir: 目标目录
+            module_name: 模块名称
+            practice_records: 实践记录文档，为None时删除已有记录文件
+
+        Returns:
+            Path: 保存的文件路径，未保存时返回None
+        """
+        practices_path = self._practices_path(target_dir, module_name)
+        try:
+            if practice_records is None:
+                practices_path.unlink(missing_ok=True)
+                return None
+            FileHelper.atomic_write_text(practices_path, json.dumps(practice_records, ensure_ascii=False, indent=2))
+            return practices_path
+        except OSError as e:
+            print(f"⚠️ 实践记录保存失败 {practices_path.name}: {e}")
+            return None
 
     def save_html_file(
         self,
@@ -128,9 +216,7 @@ class FileSaver:
         markdown_file = target_dir / f"{module_name}.md"
 
         try:
-            with open(markdown_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-
+            FileHelper.atomic_write_text(markdown_file, content)
             return markdown_file
 
         except Exception as e:
@@ -144,10 +230,12 @@ class FileSaver:
         sub_module_name: str,
         html_content: str,
         markdown_content: str,
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        extraction_record: Optional[Dict[str, Any]] = None,
+        practice_records: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        保存爬取结果（HTML + Markdown）
+        保存爬取结果（HTML + Markdown + 提取记录 + 结构化实践记录）
 
         Args:
             target_dir: 目标目录
@@ -156,6 +244,8 @@ class FileSaver:
             html_content: HTML内容
             markdown_content: Markdown内容
             metadata: 元数据
+            extraction_record: 提取记录，Markdown保存成功时一并写入
+            practice_records: 结构化实践记录文档，Markdown保存成功时一并写入
 
         Returns:
             Dict: 保存结果信息
@@ -175,6 +265,12 @@ class FileSaver:
             content=markdown_content
         )
 
+        practices_file = None
+        if markdown_file:
+            if extraction_record is not None:
+                self.save_extraction_record(target_dir, module_name, extraction_record)
+            practices_file = self.save_practice_records(target_dir, module_name, practice_records)
+
         return {
             "success": True,
             "url": metadata.get('url', ''),
@@ -183,6 +279,7 @@ class FileSaver:
             "sub_module_name": sub_module_name,
             "html_file": str(html_file) if html_file else None,
             "markdown_file": str(markdown_file) if markdown_file else None,
+            "practices_file": str(practices_file) if practices_file else None,
             "content_length": len(html_content),
             "has_best_practices": bool(markdown_content and markdown_file),
             "skipped": False  # 标记为新保存
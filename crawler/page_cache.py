@@ -0,0 +1,190 @@
+"""
+页面缓存模块
+以URL为键在磁盘上缓存渲染后的HTML，有效期内直接复用，过期后重新渲染并按内容哈希判断页面是否变化
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+class PageCache:
+    """持久化页面缓存"""
+
+    def __init__(self, cache_dir: Path, ttl_seconds: float = 86400):
+        """
+        初始化页面缓存
+
+        文档页面的正文由前端脚本加载，页面外壳的ETag/Last-Modified在正文更新后保持不变，
+        因此过期条目不做条件请求，而是重新渲染后比较内容哈希
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_seconds: 缓存有效期（秒），过期后重新渲染
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+
+        # 运行统计: 有效期内命中、过期后重新渲染、无缓存；过期重渲染后内容未变化/已变化
+        self.hits = 0
+        self.expired = 0
+        self.misses = 0
+        self.unchanged = 0
+        self.changed = 0
+
+    @staticmethod
+    def hash_content(content: str) -> str:
+        """
+        计算内容哈希
+
+        Args:
+            content: 页面内容
+
+        Returns:
+            str: SHA256十六进制摘要
+        """
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, url: str) -> Path:
+        """
+        获取URL对应的缓存文件路径
+
+        Args:
+            url: 页面URL
+
+        Returns:
+            Path: 缓存文件路径
+        """
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存条目
+
+        Args:
+            url: 页面URL
+
+        Returns:
+            Dict: 缓存条目，不存在或损坏时返回None
+        """
+        entry_path = self._entry_path(url)
+        if not entry_path.exists():
+            return None
+
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        return entry if entry.get('url') == url else None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """
+        判断缓存条目是否仍在有效期内
+
+        Args:
+            entry: 缓存条目
+
+        Returns:
+            bool: 是否无需重新渲染即可使用
+        """
+        return time.time() - entry.get('fetched_at', 0) < self.ttl_seconds
+
+    async def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        查找有效期内可直接复用的缓存条目
+
+        Args:
+            url: 页面URL
+
+        Returns:
+            Dict: 可复用的缓存条目，无缓存或已过期需要重新渲染时返回None
+        """
+        entry = self.get(url)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if self.is_fresh(entry):
+            self.hits += 1
+            return entry
+
+        self.expired += 1
+        return None
+
+    def put(
+        self,
+        url: str,
+        html: str,
+        metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        写入缓存条目，已有旧条目时按内容哈希统计页面是否变化
+
+        Args:
+            url: 页面URL
+            html: 渲染后的HTML
+            metadata: 页面元数据（仅保存可序列化的基础字段）
+
+        Returns:
+            Dict: 写入的缓存条目
+        """
+        previous = self.get(url)
+        content_hash = self.hash_content(html)
+        if previous is not None:
+            if previous.get('content_hash') == content_hash:
+                self.unchanged += 1
+            else:
+                self.changed += 1
+
+        entry = {
+            'url': url,
+            'html': html,
+            'content_hash': content_hash,
+            'metadata': {
+                'title': metadata.get('title', '未知标题'),
+                'content_type': metadata.get('content_type', 'spa')
+            },
+            'fetched_at': time.time()
+        }
+
+        self._write_entry(entry)
+        return entry
+
+    def _write_entry(self, entry: Dict[str, Any]) -> None:
+        """
+        原子写入缓存条目
+
+        Args:
+            entry: 缓存条目
+        """
+        entry_path = self._entry_path(entry['url'])
+        temp_path = entry_path.with_suffix('.tmp')
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            temp_path.replace(entry_path)
+        except OSError as e:
+            print(f"⚠️ 页面缓存写入失败: {e}")
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            Dict: 统计信息
+        """
+        return {
+            'cache_dir': str(self.cache_dir),
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'expired': self.expired,
+            'misses': self.misses,
+            'unchanged_after_render': self.unchanged,
+            'changed_after_render': self.changed
+        }
@@ -0,0 +1,104 @@
+"""
+跳过策略模块
+根据子模块的提取记录判断已有的最佳实践文件是否需要重新生成；
+没有提取记录的已有输出（如升级前生成的文件）视为有效并补记记录，不会因缺少记录而全部重新提取
+"""
+
+import time
+from typing import Dict, Any, Optional, Tuple
+
+
+class SkipPolicy:
+    """已有输出的跳过策略"""
+
+    # never: 已有输出即跳过，从不刷新
+    # if-unchanged: 页面内容、提示词版本和模型都未变化时跳过
+    # max-age: 提取记录未超过最大时长时跳过
+    # force: 始终重新提取
+    MODES = ('never', 'if-unchanged', 'max-age', 'force')
+
+    def __init__(self, mode: str = "if-unchanged", max_age_seconds: float = 30 * 86400):
+        """
+        初始化跳过策略
+
+        Args:
+            mode: 策略模式，取值见MODES
+            max_age_seconds: max-age模式下提取记录的最大有效时长（秒）
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"不支持的跳过策略: {mode}，可选值: {', '.join(self.MODES)}")
+
+        self.mode = mode
+        self.max_age_seconds = max_age_seconds
+
+    @property
+    def needs_page_content(self) -> bool:
+        """是否需要获取页面内容后才能判定（页面缓存有效期内无需渲染）"""
+        return self.mode == 'if-unchanged'
+
+    def check_before_fetch(
+        self,
+        markdown_exists: bool,
+        record: Optional[Dict[str, Any]]
+    ) -> Tuple[Optional[bool], str]:
+        """
+        获取页面之前的判定，只依赖文件状态和提取记录
+
+        Args:
+            markdown_exists: 最佳实践文件是否存在
+            record: 子模块的提取记录，不存在时为None
+
+        Returns:
+            Tuple: (是否跳过，None表示需要获取页面后再判定, 判定原因)
+        """
+        if not markdown_exists:
+            return False, "输出文件不存在"
+
+        if self.mode == 'force':
+            return False, "强制刷新"
+
+        if record is not None and not record.get('complete', True):
+            return False, "上次提取未成功"
+
+        if self.mode == 'never':
+            return True, "已存在"
+
+        if record is None and self.mode == 'max-age':
+            return True, "已存在，补记提取记录"
+
+        if self.mode == 'max-age':
+            age = time.time() - record.get('extracted_at', 0)
+            if age <= self.max_age_seconds:
+                return True, f"提取于{age / 86400:.1f}天前"
+            return False, f"已超过{self.max_age_seconds / 86400:g}天"
+
+        return None, "需要比较页面内容"
+
+    def check_after_fetch(
+        self,
+        record: Optional[Dict[str, Any]],
+        content_hash: str,
+        prompt_version: str,
+        model_name: str
+    ) -> Tuple[bool, str]:
+        """
+        获取页面之后的判定（if-unchanged模式）
+
+        Args:
+            record: 子模块的提取记录
+            content_hash: 当前页面内容哈希
+            prompt_version: 当前提示词模板版本
+            model_name: 当前模型名称
+
+        Returns:
+            Tuple: (是否跳过, 判定原因)
+        """
+        if record is None or (record.get('seeded') and not record.get('content_hash')):
+            return True, "已存在，按当前页面补记提取记录"
+        if record.get('content_hash') != content_hash:
+            return False, "页面内容已变化"
+        if record.get('prompt_version') != prompt_version:
+            return False, "提示词版本已变化"
+        if record.get('model') != model_name:
+            return False, "模型已变化"
+        return True, "页面内容未变化"
@@ -3,21 +3,39 @@ SPA页面处理器模块
 专门处理Single Page Application的爬取需求
 """
 
-import asyncio
-from typing import Dict, Any, Optional
+import json
+from typing import Dict, Any, Optional, List
 from crawl4ai import CrawlerRunConfig, CacheMode
 
 
 class SPAHandler:
     """SPA页面处理器"""
 
-    def __init__(self):
-        """初始化SPA处理器"""
+    def __init__(self, readiness_mode: str = "adaptive"):
+        """
+        初始化SPA处理器
+
+        Args:
+            readiness_mode: 页面就绪判定模式，"adaptive"按内容就绪信号等待，"fixed"使用固定延迟
+        """
+        self.readiness_mode = readiness_mode
         self.default_wait_time = 15.0
         self.page_timeout = 60000
         self.scroll_delay = 3000  # 滚动延迟毫秒
         self.interaction_delay = 2000  # 交互延迟毫秒
 
+        # 自适应就绪模式配置
+        self.content_selectors: List[str] = [
+            '.markdown-body', '.doc-content', '.document-content',
+            '#doc-content', 'article', 'main'
+        ]
+        self.min_content_text_length = 200  # 正文容器至少包含的文本长度
+        self.readiness_timeout = 15000  # 就绪等待上限毫秒
+        self.quiet_period = 800  # DOM与网络无变化持续多久视为稳定（毫秒）
+        self.scroll_settle_delay = 400  # 每次滚动后等待懒加载的时间（毫秒）
+        self.max_scroll_rounds = 12  # 最多滚动次数
+        self.adaptive_return_delay = 0.2  # 就绪后返回HTML前的额外延迟（秒）
+
     def get_spa_javascript_code(self) -> str:
         """
         获取SPA页面专用的JavaScript代码
@@ -49,6 +67,92 @@ class SPAHandler:
         await new Promise(resolve => setTimeout(resolve, 1000));
         """
 
+    def get_adaptive_javascript_code(self) -> str:
+        """
+        获取自适应就绪等待的JavaScript代码
+
+        依次等待正文选择器出现、DOM变更与网络请求静默、页面高度不再增长，
+        全程受就绪等待上限约束，并返回实际耗时供调用方统计。
+
+        Returns:
+            str: JavaScript代码字符串
+        """
+        return f"""
+        const startedAt = performance.now();
+        const ceiling = {self.readiness_timeout};
+        const quietPeriod = {self.quiet_period};
+        const selectors = {json.dumps(self.content_selectors)};
+        const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+        const elapsed = () => performance.now() - startedAt;
+
+        // 等待正文容器出现并包含足够文本
+        let matchedSelector = null;
+        while (elapsed() < ceiling) {{
+            matchedSelector = selectors.find(selector => {{
+                const element = document.querySelector(selector);
+                return element && (element.innerText || '').trim().length >= {self.min_content_text_length};
+            }}) || null;
+            if (matchedSelector) break;
+            await sleep(100);
+        }}
+        const contentReadyMs = elapsed();
+
+        // 等待DOM变更与资源请求静默
+        const waitForQuiet = async (limit) => {{
+            let lastActivity = performance.now();
+            let resourceCount = performance.getEntriesByType('resource').length;
+            const observer = new MutationObserver(() => {{ lastActivity = performance.now(); }});
+            observer.observe(document.body, {{ childList: true, subtree: true, characterData: true }});
+            while (elapsed() < limit && performance.now() - lastActivity < quietPeriod) {{
+                await sleep(100);
+                const currentCount = performance.getEntriesByType('resource').length;
+                if (currentCount !== resourceCount) {{
+                    resourceCount = currentCount;
+                    lastActivity = performance.now();
+                }}
+            }}
+            observer.disconnect();
+        }};
+        await waitForQuiet(ceiling);
+        const quietMs = elapsed();
+
+        // 滚动触发懒加载，直到页面高度不再增长
+        let scrollRounds = 0;
+        let lastHeight = -1;
+        while (scrollRounds < {self.max_scroll_rounds} && elapsed() < ceiling) {{
+            const height = document.body.scrollHeight;
+            if (height === lastHeight) break;
+            lastHeight = height;
+            window.scrollTo(0, height);
+            scrollRounds++;
+            await sleep({self.scroll_settle_delay});
+        }}
+        window.scrollTo(0, 0);
+
+        // 尝试点击可能的展开按钮，并等待展开内容稳定
+        const expandButtons = document.querySelectorAll('[class*="expand"], [class*="more"], [class*="show"]');
+        for (let button of expandButtons) {{
+            if (button.click) button.click();
+        }}
+        if (expandButtons.length > 0) {{
+            await waitForQuiet(Math.min(ceiling, elapsed() + quietPeriod * 2));
+        }}
+
+        const report = {{
+            readiness_mode: 'adaptive',
+            content_ready: matchedSelector !== null,
+            matched_selector: matchedSelector,
+            content_ready_ms: Math.round(contentReadyMs),
+            quiet_ms: Math.round(quietMs),
+            scroll_rounds: scrollRounds,
+            expand_buttons: expandButtons.length,
+            total_ms: Math.round(elapsed()),
+            timed_out: elapsed() >= ceiling
+        }};
+        window.__spaReadiness = report;
+        return report;
+        """
+
     def create_spa_crawler_config(
         self,
         custom_js_code: Optional[str] = None,
@@ -60,14 +164,18 @@ class SPAHandler:
 
         Args:
             custom_js_code: 自定义JavaScript代码
-            wait_time: 等待时间（秒）
+            wait_time: 等待时间（秒），自适应模式下默认为就绪后的极短延迟
             timeout: 页面超时时间（毫秒）
 
         Returns:
             CrawlerRunConfig: 爬虫运行配置
         """
-        js_code = custom_js_code or self.get_spa_javascript_code()
-        wait_time = wait_time or self.default_wait_time
+        if self.readiness_mode == "adaptive":
+            js_code = custom_js_code or self.get_adaptive_javascript_code()
+            wait_time = wait_time or self.adaptive_return_delay
+        else:
+            js_code = custom_js_code or self.get_spa_javascript_code()
+            wait_time = wait_time or self.default_wait_time
         timeout = timeout or self.page_timeout
 
         return CrawlerRunConfig(
@@ -145,8 +253,37 @@ class SPAHandler:
         if hasattr(crawler_result, 'status_code'):
             metadata['status_code'] = crawler_result.status_code
 
+        readiness = self.extract_readiness_report(crawler_result)
+        if readiness:
+            metadata['readiness'] = readiness
+
         return metadata
 
+    def extract_readiness_report(self, crawler_result) -> Optional[Dict[str, Any]]:
+        """
+        从爬取结果中提取自适应就绪脚本返回的耗时报告
+
+        Args:
+            crawler_result: crawl4ai的爬取结果
+
+        Returns:
+            Dict: 就绪报告，未找到时返回None
+        """
+        js_result = getattr(crawler_result, 'js_execution_result', None)
+
+        # crawl4ai不同版本对脚本返回值的包装层级不同，递归查找报告字典
+        pending = [js_result]
+        while pending:
+            item = pending.pop()
+            if isinstance(item, dict):
+                if item.get('readiness_mode') == 'adaptive':
+                    return item
+                pending.extend(item.values())
+            elif isinstance(item, list):
+                pending.extend(item)
+
+        return None
+
     def get_spa_processing_stats(self, content: str) -> Dict[str, Any]:
         """
         获取SPA页面处理统计信息
@@ -160,7 +297,10 @@ class SPAHandler:
         return {
             'content_length': len(content),
             'content_valid': self.validate_spa_content(content),
-            'estimated_load_time': self.default_wait_time,
+            'estimated_load_time': (
+                self.readiness_timeout / 1000 if self.readiness_mode == "adaptive" else self.default_wait_time
+            ),
+            'readiness_mode': self.readiness_mode,
             'processing_type': 'spa',
             'javascript_executed': True,
             'scroll_interactions': 3,  # 滚动操作次数
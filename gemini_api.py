@@ -1,17 +1,82 @@
 import os
+import re
+import time
+import asyncio
+import threading
 from dotenv import load_dotenv
 from google import genai  # 使用新的导入方式
 from google.genai import types
+from utils import TokenBucket, TokenHelper
+from backends.base import (
+    GenerationBackend, GenerationError, GenerationRateLimitError, GenerationTimeoutError,
+    GenerationServerError, GenerationContentBlockedError
+)
+from backends.http_client import HTTPClientOptions
 
-class GeminiAPI:
+
+class GeminiAPIError(GenerationError):
+    """Gemini API调用失败的基础异常"""
+
+
+class GeminiRateLimitError(GeminiAPIError, GenerationRateLimitError):
+    """请求频率或配额超限（429）"""
+    retryable = True
+
+
+class GeminiTimeoutError(GeminiAPIError, GenerationTimeoutError):
+    """请求超时"""
+    retryable = True
+
+
+class GeminiServerError(GeminiAPIError, GenerationServerError):
+    """服务端错误（5xx）"""
+    retryable = True
+
+
+class GeminiContentBlockedError(GeminiAPIError, GenerationContentBlockedError):
+    """提示词或生成内容被安全策略拦截，重试无意义"""
+
+
+class GeminiAPI(GenerationBackend):
     """Google Gemini API封装，使用Google Gen AI SDK"""
 
-    def __init__(self, api_key=None):
+    backend_name = "Gemini API"
+    supports_batch = True
+
+    # 批处理任务的终止状态
+    BATCH_DONE_STATES = ('JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED')
+
+    # 客户端配额因账号层级而异，默认不在客户端限流，由服务端429与Retry-After控制节奏；
+    # 按模型配置GEMINI_RPM_<模型>、GEMINI_TPM_<模型>（如GEMINI_RPM_GEMINI_2_5_FLASH），
+    # 未按模型配置时使用GEMINI_RPM、GEMINI_TPM，0或留空表示不限流
+    RATE_LIMIT_ENV_VARS = {'rpm': 'GEMINI_RPM', 'tpm': 'GEMINI_TPM'}
+
+    # 错误分类使用Gemini的异常类型，配额超限时gRPC状态为RESOURCE_EXHAUSTED
+    error_types = {
+        'error': GeminiAPIError,
+        'rate_limit': GeminiRateLimitError,
+        'timeout': GeminiTimeoutError,
+        'server': GeminiServerError
+    }
+    rate_limit_markers = ('RESOURCE_EXHAUSTED',)
+    network_error_names = ('ConnectError', 'RemoteProtocolError', 'ReadError')
+
+    # 表示生成内容被安全策略终止的结束原因
+    BLOCKED_FINISH_REASONS = ('SAFETY', 'BLOCKLIST', 'PROHIBITED_CONTENT', 'RECITATION')
+
+    # 同一模型的所有实例共享限流器: (模型, rpm, tpm) -> (请求令牌桶, token令牌桶)，不限流的一项为None
+    _shared_rate_limiters = {}
+
+    def __init__(self, api_key=None, max_in_flight=None, max_retries=None, model_name=None, http_client_options=None):
         """
         初始化Google Gemini API
 
         Args:
             api_key (str, optional): API密钥，如果为None则从环境变量中读取
+            max_in_flight (int, optional): 异步调用的最大并发请求数，如果为None则从环境变量GEMINI_MAX_IN_FLIGHT读取，默认4
+            max_retries (int, optional): 可重试错误的最大重试次数，如果为None则从环境变量GEMINI_MAX_RETRIES读取，默认4
+            model_name (str, optional): 模型名称，默认gemini-2.5-flash
+            http_client_options (HTTPClientOptions, optional): HTTP连接池、保活、超时与HTTP/2配置，默认使用默认配置
         """
         # 加载环境变量
         load_dotenv()
@@ -21,47 +86,591 @@ class GeminiAPI:
         if not self.api_key:
             raise ValueError("未提供Gemini API密钥，也未在环境变量中找到GEMINI_API_KEY")
 
-        # 默认模型和配置
-        self.model_name = "gemini-2.5-flash"
-        self.temperature = 0.7  # 默认温度参数
+        # 默认模型、并发与重试配置
+        super().__init__(
+            model_name=model_name or "gemini-2.5-flash",
+            max_in_flight=max_in_flight or os.getenv('GEMINI_MAX_IN_FLIGHT') or 4,
+            max_retries=max_retries if max_retries is not None else os.getenv('GEMINI_MAX_RETRIES') or 4
+        )
+
+        # 流式调用超过该秒数没有新内容时视为卡住，按超时重试
+        self.stream_idle_timeout = float(os.getenv('GEMINI_STREAM_IDLE_TIMEOUT') or 60)
+
+        # 上下文缓存：注册的固定指令前缀在首次使用时创建一次缓存，之后的请求只发送前缀之后的内容
+        self.context_cache_enabled = os.getenv('GEMINI_CONTEXT_CACHE', 'true').lower() not in ('0', 'false', 'no')
+        self.context_cache_ttl = int(os.getenv('GEMINI_CONTEXT_CACHE_TTL') or 3600)
+        self.context_cache_min_tokens = int(os.getenv('GEMINI_CONTEXT_CACHE_MIN_TOKENS') or 1024)
+        self._shared_prefixes = []
+        self._context_caches = {}  # 前缀 -> 缓存名称，None表示不可用、退回内联提示词
+        self._context_cache_lock = threading.Lock()
+
+        # 客户端限流
+        self.expected_output_tokens = 2048  # 调用前为输出预占的token数，返回后按实际用量修正
 
         # 设置API选项并初始化客户端
+        self.http_client_options = http_client_options or HTTPClientOptions()
         self._configure_gemini_api()
 
 
     def _configure_gemini_api(self):
         """配置Google Gemini API客户端"""
-        # 创建客户端实例
+        # 创建客户端实例，同步与异步调用各自使用一个复用连接的连接池
+        # 显式传入transport，异步调用也走httpx而不是aiohttp，连接配置与复用统计对两者一致
         proxy_url = os.getenv('GEMINI_BASE_URL')
-        self.client = genai.Client(api_key=self.api_key, http_options=types.HttpOptions(api_version='v1beta', base_url=proxy_url))
+        http_options = types.HttpOptions(
+            api_version='v1beta',
+            base_url=proxy_url,
+            timeout=int(self.http_client_options.request_timeout * 1000),
+            client_args=self.http_client_options.get_client_args(),
+            async_client_args=self.http_client_options.get_client_args(asynchronous=True)
+        )
+        self.client = genai.Client(api_key=self.api_key, http_options=http_options)
 
         print(f"已初始化Gemini API客户端，使用模型: {self.model_name}")
 
-    def generate_text(self, prompt):
+    def for_model(self, model_name):
+        """
+        创建使用另一个模型、其余配置相同的实例，共享用量统计与已注册的共用前缀
+
+        Args:
+            model_name (str): 模型名称
+
+        Returns:
+            GeminiAPI: 新实例
+        """
+        api = GeminiAPI(
+            api_key=self.api_key,
+            max_in_flight=self.max_in_flight,
+            max_retries=self.max_retries,
+            model_name=model_name,
+            http_client_options=self.http_client_options
+        )
+        api.temperature = self.temperature
+        api.usage = self.usage
+        for prefix in self._shared_prefixes:
+            api.register_shared_prefix(prefix)
+        return api
+
+    def get_rate_limits(self):
+        """
+        获取当前模型的限流配额，优先使用按模型配置的环境变量
+
+        Returns:
+            dict: 包含rpm和tpm的字典，未配置的一项为inf
+        """
+        model_suffix = re.sub(r'[^0-9A-Za-z]+', '_', self.model_name).upper()
+        limits = {}
+        for name, env_var in self.RATE_LIMIT_ENV_VARS.items():
+            value = os.getenv(f"{env_var}_{model_suffix}") or os.getenv(env_var)
+            limits[name] = float(value) if value and float(value) > 0 else float('inf')
+        return limits
+
+    def _get_rate_limiters(self):
+        """
+        获取当前模型共享的请求数与token数令牌桶
+
+        Returns:
+            tuple: (请求令牌桶, token令牌桶)，不限流的一项为None
+        """
+        limits = self.get_rate_limits()
+        key = (self.model_name, limits['rpm'], limits['tpm'])
+        if key not in self._shared_rate_limiters:
+            self._shared_rate_limiters[key] = (
+                TokenBucket.per_minute(limits['rpm'], burst=1) if limits['rpm'] != float('inf') else None,
+                TokenBucket.per_minute(limits['tpm']) if limits['tpm'] != float('inf') else None
+            )
+        return self._shared_rate_limiters[key]
+
+    def _reserve_quota(self, prompt):
+        """
+        按估算用量预占请求数与token数配额
+
+        Args:
+            prompt (str): 提示词
+
+        Returns:
+            tuple: (需要等待的秒数, 预占的token数)
+        """
+        request_bucket, token_bucket = self._get_rate_limiters()
+        reserved_tokens = TokenHelper.estimate_tokens(prompt) + self.expected_output_tokens
+        wait_time = max(
+            request_bucket.reserve(1) if request_bucket else 0.0,
+            token_bucket.reserve(reserved_tokens) if token_bucket else 0.0
+        )
+        if wait_time > 0:
+            self.usage.record_wait(wait_time)
+        return wait_time, reserved_tokens
+
+    def _record_usage(self, response, call_state, latency):
+        """
+        记录实际用量并修正token配额
+
+        Args:
+            response: generate_content返回的响应对象
+            call_state (dict): 本次尝试的状态，reservation为调用前预占的token数
+            latency (float): 调用耗时（秒）
+        """
+        reserved_tokens = call_state['reservation']
+        usage_metadata = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage_metadata, 'prompt_token_count', None) or 0
+        output_tokens = (
+            (getattr(usage_metadata, 'candidates_token_count', None) or 0)
+            + (getattr(usage_metadata, 'thoughts_token_count', None) or 0)
+        )
+        if usage_metadata is None:
+            # 响应没有用量信息时按预占量计
+            prompt_tokens, output_tokens = reserved_tokens - self.expected_output_tokens, self.expected_output_tokens
+
+        cached_tokens = getattr(usage_metadata, 'cached_content_token_count', None) or 0
+
+        self._adjust_token_quota(prompt_tokens + output_tokens - reserved_tokens)
+        self.usage.record(prompt_tokens, output_tokens, latency, cached_tokens)
+        call_state['usage_recorded'] = True
+
+    def _record_failed_call(self, call_state, latency):
+        """
+        记录失败调用并退还预占的token配额
+
+        Args:
+            call_state (dict): 本次尝试的状态，reservation为调用前预占的token数
+            latency (float): 调用耗时（秒）
+        """
+        self._adjust_token_quota(-call_state['reservation'])
+        self.usage.record_failure(latency)
+
+    def _adjust_token_quota(self, tokens):
+        """
+        修正token令牌桶中已预占的配额，未限制token数时忽略
+
+        Args:
+            tokens (int): 修正的token数，正数表示多扣，负数表示退还
+        """
+        token_bucket = self._get_rate_limiters()[1]
+        if token_bucket:
+            token_bucket.adjust(tokens)
+
+    def _extract_text(self, response):
+        """
+        从API响应中提取生成的文本
+
+        Args:
+            response: generate_content返回的响应对象
+
+        Returns:
+            str: 生成的文本
+        """
+        # 提示词被拦截时没有候选结果
+        prompt_feedback = getattr(response, 'prompt_feedback', None)
+        block_reason = getattr(prompt_feedback, 'block_reason', None)
+        if block_reason:
+            raise GeminiContentBlockedError(f"提示词被拦截: {block_reason}")
+
+        text = getattr(response, 'text', None)
+        if text:
+            return text
+
+        if hasattr(response, 'parts'):
+            text = ''.join([part.text for part in response.parts if getattr(part, 'text', None)])
+            if text:
+                return text
+
+        # 没有文本时检查是否因安全策略终止
+        for candidate in getattr(response, 'candidates', None) or []:
+            finish_reason = str(getattr(candidate, 'finish_reason', '') or '')
+            if any(reason in finish_reason for reason in self.BLOCKED_FINISH_REASONS):
+                raise GeminiContentBlockedError(f"生成内容被拦截: {finish_reason}")
+
+        raise GeminiAPIError("API响应格式异常，无法提取生成的文本")
+
+    @staticmethod
+    def _parse_retry_after(error):
+        """
+        从异常中解析服务端建议的重试等待时间，响应头没有时读取错误详情中的RetryInfo
+
+        Args:
+            error (Exception): SDK抛出的异常
+
+        Returns:
+            float: 等待秒数，无法解析时返回None
+        """
+        retry_after = GenerationBackend._parse_retry_after(error)
+        if retry_after is not None:
+            return retry_after
+
+        # google.rpc.RetryInfo 形如 "retryDelay": "30s"
+        match = re.search(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", str(getattr(error, 'details', '') or error))
+        if match:
+            return float(match.group(1))
+        return None
+
+    def _build_generate_config(self, response_schema=None, cached_content=None):
+        """
+        构建生成配置
+
+        Args:
+            response_schema (optional): 响应结构（pydantic模型），设置后以JSON模式输出
+            cached_content (str, optional): 上下文缓存名称，设置后请求引用该缓存中的固定指令
+
+        Returns:
+            types.GenerateContentConfig: 生成配置
+        """
+        options = {'temperature': self.temperature}
+        if cached_content:
+            options['cached_content'] = cached_content
+        if response_schema is not None:
+            options['response_mime_type'] = 'application/json'
+            options['response_schema'] = response_schema
+        return types.GenerateContentConfig(**options)
+
+    def register_shared_prefix(self, prefix):
+        """
+        注册多个请求共用的固定提示词前缀（如提取指令），以该前缀开头的请求会引用同一个上下文缓存
+
+        Args:
+            prefix (str): 固定前缀
+        """
+        if prefix and prefix not in self._shared_prefixes:
+            self._shared_prefixes.append(prefix)
+            # 优先匹配更长的前缀
+            self._shared_prefixes.sort(key=len, reverse=True)
+
+    def _split_shared_prefix(self, prompt):
+        """
+        拆分出提示词开头的已注册前缀
+
+        Args:
+            prompt (str): 完整提示词
+
+        Returns:
+            tuple: (前缀, 其余内容)，没有匹配的前缀时为 (None, 完整提示词)
+        """
+        if self.context_cache_enabled:
+            for prefix in self._shared_prefixes:
+                if prompt.startswith(prefix) and len(prompt) > len(prefix):
+                    return prefix, prompt[len(prefix):]
+        return None, prompt
+
+    def _get_context_cache(self, prefix):
+        """
+        获取前缀对应的上下文缓存，本次运行首次使用时创建；前缀过短或创建失败时记为不可用
+
+        Args:
+            prefix (str): 固定前缀
+
+        Returns:
+            str: 缓存名称，不可用时返回None
+        """
+        with self._context_cache_lock:
+            if prefix in self._context_caches:
+                return self._context_caches[prefix]
+
+            cache_name = None
+            prefix_tokens = TokenHelper.estimate_tokens(prefix)
+            if prefix_tokens < self.context_cache_min_tokens:
+                print(f"ℹ️ 固定指令约{prefix_tokens} tokens，低于上下文缓存下限"
+                      f"{self.context_cache_min_tokens}，使用内联提示词")
+            else:
+                try:
+                    cache = self.client.caches.create(
+                        model=self.model_name,
+                        config=types.CreateCachedContentConfig(
+                            system_instruction=prefix,
+                            display_name='harmony-shared-instructions',
+                            ttl=f"{self.context_cache_ttl}s"
+                        )
+                    )
+                    cache_name = cache.name
+                    print(f"🗂️ 已创建上下文缓存 {cache_name}（约{prefix_tokens} tokens）")
+                except Exception as e:
+                    print(f"⚠️ 创建上下文缓存失败，使用内联提示词: {e}")
+
+            self._context_caches[prefix] = cache_name
+            return cache_name
+
+    def _prepare_request(self, prompt, response_schema=None, context_cache=True):
+        """
+        构建请求内容与生成配置，匹配到可用的上下文缓存时只发送前缀之后的内容
+
+        Args:
+            prompt (str): 完整提示词
+            response_schema (optional): 响应结构（pydantic模型）
+            context_cache (bool): 是否尝试使用上下文缓存
+
+        Returns:
+            tuple: (请求内容, 生成配置, 使用的前缀)，未使用缓存时前缀为None
         """
-        使用Gemini API生成文本
+        prefix, remainder = self._split_shared_prefix(prompt) if context_cache else (None, prompt)
+        cache_name = self._get_context_cache(prefix) if prefix else None
+        if not cache_name:
+            return prompt, self._build_generate_config(response_schema), None
+        return remainder, self._build_generate_config(response_schema, cache_name), prefix
+
+    def _invalidate_context_cache(self, prefix, error):
+        """
+        引用上下文缓存的请求因缓存本身被拒绝时作废该缓存：过期（404）时下次重新创建，其他错误时退回内联提示词；
+        错误信息没有提到缓存内容时视为与缓存无关，不作废
+
+        Args:
+            prefix (str): 请求使用的前缀
+            error (GeminiAPIError): 分类后的错误
+
+        Returns:
+            bool: 是否作废了缓存，为True时可以内联提示词重试一次
+        """
+        if prefix is None or error.retryable or error.status_code not in (400, 403, 404):
+            return False
+
+        with self._context_cache_lock:
+            cache_name = self._context_caches.get(prefix)
+            message = str(error).lower()
+            if not (re.search(r'cached[\s_]?content', message) or (cache_name and cache_name.lower() in message)):
+                return False
+            if error.status_code == 404:
+                self._context_caches.pop(prefix, None)
+            else:
+                self._context_caches[prefix] = None
+        print(f"⚠️ 上下文缓存不可用（{error.status_code}），以内联提示词重试")
+        return True
+
+    def _recover_from_error(self, error, call_state):
+        """
+        请求引用的上下文缓存被拒绝时作废该缓存，由重试循环以内联提示词立即重试一次
+
+        Args:
+            error (GeminiAPIError): 分类后的错误
+            call_state (dict): 本次尝试的状态，prefix为请求使用的前缀
+
+        Returns:
+            bool: 是否作废了缓存
+        """
+        return self._invalidate_context_cache(call_state.get('prefix'), error)
+
+    def delete_context_caches(self):
+        """删除本次运行创建的上下文缓存，避免缓存在过期前持续计费"""
+        with self._context_cache_lock:
+            cache_names = [name for name in self._context_caches.values() if name]
+            self._context_caches.clear()
+        for cache_name in cache_names:
+            try:
+                self.client.caches.delete(name=cache_name)
+            except Exception as e:
+                print(f"⚠️ 删除上下文缓存 {cache_name} 失败: {e}")
+
+    def generate_text(self, prompt, response_schema=None):
+        """
+        使用Gemini API生成文本，可重试错误按指数退避重试
 
         Args:
             prompt (str): 提示词
+            response_schema (optional): 响应结构（pydantic模型），设置后返回符合该结构的JSON文本
 
         Returns:
             str: 生成的文本
+
+        Raises:
+            GeminiAPIError: 重试耗尽或遇到不可重试错误时抛出
         """
+        return self._run_with_retry(lambda call_state: self._generate_once(prompt, response_schema, call_state), prompt)
+
+    def _generate_once(self, prompt, response_schema, call_state):
+        """
+        执行一次不重试的同步生成，使用的上下文缓存前缀记录在call_state的prefix中
+
+        Args:
+            prompt (str): 提示词
+            response_schema (optional): 响应结构（pydantic模型）
+            call_state (dict): 本次尝试的状态
+
+        Returns:
+            str: 生成的文本
+        """
+        contents, config, call_state['prefix'] = self._prepare_request(prompt, response_schema)
+        started_at = time.monotonic()
+        response = self.client.models.generate_content(
+            model=self.model_name,
+            contents=contents,
+            config=config
+        )
+        self._record_usage(response, call_state, time.monotonic() - started_at)
+        return self._extract_text(response)
+
+    async def agenerate_text(self, prompt, response_schema=None):
+        """
+        异步使用Gemini API生成文本，不阻塞事件循环；退避与熔断等待期间不占用并发名额
+
+        Args:
+            prompt (str): 提示词
+            response_schema (optional): 响应结构（pydantic模型），设置后返回符合该结构的JSON文本
+
+        Returns:
+            str: 生成的文本
+
+        Raises:
+            GeminiAPIError: 重试耗尽或遇到不可重试错误时抛出
+        """
+        return await self._arun_with_retry(
+            lambda call_state: self._agenerate_once(prompt, response_schema, call_state), prompt
+        )
+
+    async def _agenerate_once(self, prompt, response_schema, call_state):
+        """
+        执行一次不重试的异步生成，旧版SDK没有异步客户端时在线程中执行同步调用
+
+        Args:
+            prompt (str): 提示词
+            response_schema (optional): 响应结构（pydantic模型）
+            call_state (dict): 本次尝试的状态
+
+        Returns:
+            str: 生成的文本
+        """
+        aio_client = getattr(self.client, 'aio', None)
+        if aio_client is None:
+            return await asyncio.to_thread(self._generate_once, prompt, response_schema, call_state)
+
+        # 首次使用某个前缀时创建上下文缓存，放到线程中避免阻塞事件循环
+        contents, config, call_state['prefix'] = await asyncio.to_thread(
+            self._prepare_request, prompt, response_schema
+        )
+        started_at = time.monotonic()
+        response = await aio_client.models.generate_content(
+            model=self.model_name,
+            contents=contents,
+            config=config
+        )
+        self._record_usage(response, call_state, time.monotonic() - started_at)
+        return self._extract_text(response)
+
+    async def _astream_text(self, prompt, call_state):
+        """
+        以流式接口逐块产生文本，结束时记录用量；旧版SDK没有异步客户端时一次性返回非流式结果
+
+        Args:
+            prompt (str): 提示词
+            call_state (dict): 本次尝试的状态
+
+        Yields:
+            str: 文本块
+
+        Raises:
+            GeminiContentBlockedError: 提示词或生成内容被安全策略拦截时抛出
+        """
+        aio_client = getattr(self.client, 'aio', None)
+        if aio_client is None:
+            yield await asyncio.to_thread(self._generate_once, prompt, None, call_state)
+            return
+
+        # 与非流式调用一样引用共用前缀的上下文缓存，缓存被拒绝时由重试循环作废并以内联提示词重试
+        contents, config, call_state['prefix'] = await asyncio.to_thread(self._prepare_request, prompt)
+        started_at = time.monotonic()
+        stream = await aio_client.models.generate_content_stream(
+            model=self.model_name,
+            contents=contents,
+            config=config
+        )
+        has_text = False
+        last_chunk = None
+        try:
+            async for chunk in stream:
+                last_chunk = chunk
+                text = getattr(chunk, 'text', None)
+                if text:
+                    has_text = True
+                    yield text
+        finally:
+            # 提前结束（空闲超时、取消）时关闭SDK的响应流，释放连接
+            aclose = getattr(stream, 'aclose', None)
+            if aclose:
+                await aclose()
+
+        if not has_text:
+            # 没有任何内容时按完整响应的规则判断是否被拦截
+            if last_chunk is None:
+                raise GeminiAPIError("流式响应为空")
+            self._extract_text(last_chunk)
+
+        # 已输出部分内容后被安全策略终止时，结果不完整
+        for candidate in getattr(last_chunk, 'candidates', None) or []:
+            finish_reason = str(getattr(candidate, 'finish_reason', '') or '')
+            if any(reason in finish_reason for reason in self.BLOCKED_FINISH_REASONS):
+                raise GeminiContentBlockedError(f"生成内容被拦截: {finish_reason}")
+
+        self._record_usage(last_chunk, call_state, time.monotonic() - started_at)
+
+    def submit_batch(self, prompts, display_name):
+        """
+        以内联请求提交批处理任务，批处理使用独立配额，不经过客户端限流
+
+        Args:
+            prompts (list): 提示词列表
+            display_name (str): 任务显示名称
+
+        Returns:
+            str: 批处理任务名称，用于查询结果
+
+        Raises:
+            GeminiAPIError: 提交失败时抛出
+        """
+        requests = [
+            {
+                'contents': [{'parts': [{'text': prompt}], 'role': 'user'}],
+                'config': {'temperature': self.temperature}
+            }
+            for prompt in prompts
+        ]
         try:
-            # 使用新的SDK调用方式
-            response = self.client.models.generate_content(
+            batch_job = self.client.batches.create(
                 model=self.model_name,
-                contents=prompt,
-                config=types.GenerateContentConfig(temperature= self.temperature)
+                src=requests,
+                config={'display_name': display_name}
             )
+        except Exception as e:
+            raise self._classify_error(e) from e
 
-            # 提取并返回生成的文本
-            if hasattr(response, 'text'):
-                return response.text
-            elif hasattr(response, 'parts'):
-                return ''.join([part.text for part in response.parts if hasattr(part, 'text')])
-            else:
-                raise RuntimeError("API响应格式异常，无法提取生成的文本")
+        print(f"📦 已提交批处理任务 {batch_job.name}，共 {len(prompts)} 个请求")
+        return batch_job.name
 
+    def get_batch_results(self, job_name):
+        """
+        查询批处理任务状态，任务成功时解析每个请求的结果
+
+        Args:
+            job_name (str): 批处理任务名称
+
+        Returns:
+            dict: 包含state、done和results；results与提交顺序一致，
+                  每个元素为{'text': 生成文本}或{'error': 错误信息}，任务未成功时为空列表
+
+        Raises:
+            GeminiAPIError: 查询失败时抛出
+        """
+        try:
+            batch_job = self.client.batches.get(name=job_name)
         except Exception as e:
-            raise RuntimeError(f"Gemini API调用失败: {str(e)}")
\ No newline at end of file
+            raise self._classify_error(e) from e
+
+        state = getattr(batch_job.state, 'name', str(batch_job.state))
+        status = {'state': state, 'done': state in self.BATCH_DONE_STATES, 'results': []}
+        if state != 'JOB_STATE_SUCCEEDED':
+            return status
+
+        dest = getattr(batch_job, 'dest', None)
+        for inlined in getattr(dest, 'inlined_responses', None) or []:
+            if getattr(inlined, 'error', None):
+                status['results'].append({'error': str(inlined.error)})
+                continue
+            try:
+                text = self._extract_text(inlined.response)
+            except GeminiAPIError as e:
+                status['results'].append({'error': str(e)})
+                continue
+
+            usage_metadata = getattr(inlined.response, 'usage_metadata', None)
+            self.usage.record_batch(
+                getattr(usage_metadata, 'prompt_token_count', None) or 0,
+                (getattr(usage_metadata, 'candidates_token_count', None) or 0)
+                + (getattr(usage_metadata, 'thoughts_token_count', None) or 0)
+            )
+            status['results'].append({'text': text})
+
+        return status
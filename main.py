@@ -6,6 +6,7 @@ HarmonyOS界面开发最佳实践爬虫
 用法：
 - 默认运行：python main.py
 - 调试模式：python main.py --debug  (保存HTML文件)
+- 结构化提取：python main.py --structured  (额外保存结构化实践记录，整合时本地合并去重)
 """
 
 import asyncio
@@ -33,7 +34,11 @@ class SPACrawler:
         self.debug = self.config_manager.is_debug_mode()
 
         # 初始化AI内容处理器
-        self.content_processor = ContentProcessor()
+        self.content_processor = ContentProcessor(
+            extraction_mode=self.config_manager.get_extraction_mode(),
+            model_routes=self.config_manager.get_model_routes(),
+            http_settings=self.config_manager.get_llm_http_settings()
+        )
         if self.content_processor.is_api_available():
             print("✅ AI内容处理器初始化成功")
         else:
@@ -57,7 +62,9 @@ class SPACrawler:
         self.arkts_extractor = ArkTSRulesExtractor(
             web_crawler=self.web_crawler,
             gemini_api=self.content_processor.gemini_api,
-            output_dir=self.output_dir
+            output_dir=self.output_dir,
+            result_cache=self.content_processor.result_cache,
+            model_router=self.content_processor.model_router
         )
         print("✅ ArkTS规则提取器初始化成功")
 
@@ -155,21 +162,22 @@ class SPACrawler:
 
         return result
 
+    async def close(self) -> None:
+        """释放爬虫持有的浏览器与本次运行创建的上下文缓存"""
+        await self.web_crawler.close()
+        await asyncio.to_thread(self.content_processor.delete_context_caches)
 
 
 
 
-async def main():
-    """主函数"""
-    # 创建配置管理器
-    config_manager = ConfigManager.from_command_line()
 
-    # 创建爬虫实例
-    crawler = SPACrawler(config_manager)
-
-    # 打印启动信息
-    config_manager.print_startup_info()
+async def run_pipeline(crawler: SPACrawler):
+    """
+    执行完整的爬取、整合与ArkTS规则提取流程
 
+    Args:
+        crawler: 爬虫实例
+    """
     results = await crawler.crawl_all_harmony_modules()
 
     if results:
@@ -180,8 +188,12 @@ async def main():
         print(f"📊 成功率: {successful_count}/{total_count} ({successful_count/total_count*100:.1f}%)")
         print("\n✨ 所有HarmonyOS界面开发最佳实践已整理完成！")
 
-        # 执行最佳实践整合，生成Cursor Rules
-        if successful_count > 0:
+        # 执行最佳实践整合，生成Cursor Rules（没有模块输入变化时整体跳过）
+        dirty_categories = crawler.batch_processor.find_dirty_categories() if successful_count > 0 else []
+        if successful_count > 0 and not dirty_categories:
+            print(f"\n⏭️ 所有一级模块的最佳实践均未变化，跳过Cursor Rules整合")
+        elif successful_count > 0:
+            print(f"\n🔄 需要重新整合的一级模块: {', '.join(dirty_categories)}")
             integration_results = await crawler.integrate_best_practices()
             if integration_results:
                 successful_integrations = len([r for r in integration_results if r['success']])
@@ -199,9 +211,33 @@ async def main():
                 print(f"📊 提取了 {arkts_result.get('rules_count', 0)} 个规则")
         else:
             print(f"\n⚠️ ArkTS规则提取失败: {arkts_result.get('error', '未知错误')}")
+
+        # 整个运行（提取、整合、ArkTS规则）的AI用量
+        usage = crawler.content_processor.get_usage_summary()
+        if usage and usage['requests']:
+            print(f"\n🤖 本次运行AI用量: {usage['requests']} 次请求 | {usage['total_tokens']} tokens | "
+                  f"限流等待 {usage['rate_limit_wait']:.1f}秒")
     else:
         print("\n❌ 爬取任务失败，请检查配置文件和网络连接")
 
+
+async def main():
+    """主函数"""
+    # 创建配置管理器
+    config_manager = ConfigManager.from_command_line()
+
+    # 创建爬虫实例
+    crawler = SPACrawler(config_manager)
+
+    # 打印启动信息
+    config_manager.print_startup_info()
+
+    try:
+        await run_pipeline(crawler)
+    finally:
+        # 整个运行只启动一次浏览器，结束时统一关闭
+        await crawler.close()
+
     # 如果需要单独测试某个URL，可以使用以下代码：
     # test_url = "https://developer.huawei.com/consumer/cn/doc/best-practices/bpta-ui-dynamic-operations"
     # result = await crawler.crawl_spa_page(test_url, "test_module")
@@ -3,6 +3,11 @@
 提供各种辅助工具函数
 """
 
-from .helpers import URLHelper, DisplayHelper, StatisticsHelper, FileHelper
+from .helpers import URLHelper, DisplayHelper, StatisticsHelper, FileHelper, TokenHelper
+from .rate_limiter import TokenBucket
+from .circuit_breaker import CircuitBreaker
+from .usage_tracker import UsageTracker
+from .timing import TimingSpans, TimingAggregator
 
-__all__ = ['URLHelper', 'DisplayHelper', 'StatisticsHelper', 'FileHelper']
\ No newline at end of file
+__all__ = ['URLHelper', 'DisplayHelper', 'StatisticsHelper', 'FileHelper', 'TokenHelper', 'TokenBucket',
+           'CircuitBreaker', 'UsageTracker', 'TimingSpans', 'TimingAggregator']
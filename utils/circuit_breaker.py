@@ -0,0 +1,88 @@
+"""
+熔断器工具模块
+连续失败达到阈值后暂停调用一段时间，到期后放行试探请求
+"""
+
+import threading
+import time
+from typing import Dict, Any
+
+
+class CircuitBreaker:
+    """连续失败计数熔断器"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 触发熔断的连续失败次数
+            reset_timeout: 熔断持续秒数，到期后进入半开状态
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.open_count = 0
+        self._lock = threading.Lock()
+
+    def remaining_open_time(self) -> float:
+        """
+        获取熔断剩余时间，到期时转为半开状态
+
+        Returns:
+            float: 需要等待的秒数，0表示可以调用
+        """
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining <= 0:
+                self.state = self.HALF_OPEN
+                return 0.0
+            return remaining
+
+    def record_success(self) -> None:
+        """记录一次成功调用，关闭熔断器"""
+        with self._lock:
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self) -> bool:
+        """
+        记录一次失败调用
+
+        Returns:
+            bool: 本次失败是否使熔断器打开
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            should_open = (
+                self.state == self.HALF_OPEN
+                or (self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold)
+            )
+            if should_open:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.open_count += 1
+            return should_open
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取熔断器状态
+
+        Returns:
+            Dict: 状态信息
+        """
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'open_count': self.open_count
+        }
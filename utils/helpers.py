@@ -3,6 +3,8 @@
 提供URL处理、显示格式化、统计计算等工具函数
 """
 
+import hashlib
+import re
 import time
 from typing import List, Dict, Any, Tuple
 from pathlib import Path
@@ -81,10 +83,15 @@ class DisplayHelper:
             return f"❌ 失败: {result.get('error', '未知错误')}"
 
         if result.get("skipped"):
-            return f"⏭️ 跳过 | 已存在文件 | 内容:{result.get('content_length', 0)}字符"
+            return f"⏭️ 跳过 | {result.get('skip_reason', '已存在文件')} | 文件:{result.get('content_length', 0)}字节"
         else:
             has_practices = '已生成' if result.get('has_best_practices') else '未生成'
-            return f"✅ 完成 | 内容:{result.get('content_length', 0)}字符 | 最佳实践:{has_practices}"
+            display_text = f"✅ 完成 | 内容:{result.get('content_length', 0)}字符 | 最佳实践:{has_practices}"
+            if result.get('from_cache'):
+                display_text += " | 页面缓存命中"
+            elif result.get('render_time') is not None:
+                display_text += f" | 渲染:{result['render_time']:.1f}秒"
+            return display_text
 
     @staticmethod
     def format_category_summary(category_name: str, successful: int, total: int,
@@ -187,6 +194,56 @@ class StatisticsHelper:
         }
 
 
+class TokenHelper:
+    """Token估算工具类"""
+
+    # 中日韩字符大致按每字1个token计算，其余字符按每4个字符1个token计算
+    CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]')
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """
+        粗略估算文本的token数量
+
+        Args:
+            text: 文本内容
+
+        Returns:
+            int: 估算的token数量
+        """
+        if not text:
+            return 0
+
+        cjk_count = len(TokenHelper.CJK_PATTERN.findall(text))
+        other_count = len(text) - cjk_count
+        return cjk_count + (other_count + 3) // 4
+
+    @staticmethod
+    def truncate_to_tokens(text: str, max_tokens: int) -> str:
+        """
+        按估算的token数截断文本
+
+        Args:
+            text: 文本内容
+            max_tokens: 最大token数
+
+        Returns:
+            str: 截断后的文本
+        """
+        if TokenHelper.estimate_tokens(text) <= max_tokens:
+            return text
+
+        # 二分查找满足预算的最长前缀
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if TokenHelper.estimate_tokens(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low]
+
+
 class FileHelper:
     """文件处理工具类"""
 
@@ -248,4 +305,35 @@ class FileHelper:
         if exclude_pattern:
             md_files = [f for f in md_files if exclude_pattern not in f.name]
 
-        return md_files
\ No newline at end of file
+        return md_files
+
+    @staticmethod
+    def hash_file(file_path: Path) -> str:
+        """
+        计算文件内容的SHA-256哈希
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            str: 十六进制哈希值
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(65536), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def atomic_write_text(file_path: Path, content: str) -> None:
+        """
+        先写入临时文件再替换，避免中断时留下半写的文件
+
+        Args:
+            file_path: 目标文件路径
+            content: 文件内容
+        """
+        file_path = Path(file_path)
+        temp_path = file_path.with_name(f".{file_path.name}.tmp")
+        temp_path.write_text(content, encoding='utf-8')
+        temp_path.replace(file_path)
@@ -0,0 +1,110 @@
+"""
+限流工具模块
+提供基于令牌桶的异步限流器
+"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """异步令牌桶限流器"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发量）
+        """
+        if rate <= 0:
+            raise ValueError("令牌补充速率必须大于0")
+
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.total_wait_time = 0.0
+        self._lock = asyncio.Lock()
+        self._reserve_lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, amount: float, burst: float = None) -> 'TokenBucket':
+        """
+        按每分钟配额创建令牌桶
+
+        Args:
+            amount: 每分钟允许的令牌数
+            burst: 突发容量，默认等于每分钟配额
+
+        Returns:
+            TokenBucket: 令牌桶实例
+        """
+        return cls(rate=amount / 60.0, capacity=burst if burst is not None else amount)
+
+    def _refill(self) -> None:
+        """根据流逝时间补充令牌"""
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，不足时等待补充
+
+        Args:
+            tokens: 需要的令牌数，超过桶容量时按容量计算
+
+        Returns:
+            float: 本次等待的秒数
+        """
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+
+        # 持锁等待保证先到先得
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.total_wait_time += waited
+                    return waited
+
+                wait_time = (tokens - self.tokens) / self.rate
+                await asyncio.sleep(wait_time)
+                waited += wait_time
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        立即预占令牌并返回调用方需要等待的秒数，令牌余额允许为负
+
+        与acquire不同，reserve不持有事件循环锁，可同时用于同步和异步调用方：
+        同步代码time.sleep返回值，异步代码asyncio.sleep返回值
+
+        Args:
+            tokens: 需要的令牌数，超过桶容量时按容量计算
+
+        Returns:
+            float: 需要等待的秒数
+        """
+        tokens = min(tokens, self.capacity)
+        with self._reserve_lock:
+            self._refill()
+            self.tokens -= tokens
+            wait_time = max(0.0, -self.tokens / self.rate)
+            self.total_wait_time += wait_time
+            return wait_time
+
+    def adjust(self, tokens: float) -> None:
+        """
+        按实际用量修正已预占的令牌，正数表示多扣，负数表示退还
+
+        Args:
+            tokens: 修正的令牌数
+        """
+        with self._reserve_lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - tokens)
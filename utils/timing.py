@@ -0,0 +1,138 @@
+"""
+耗时统计模块
+记录单个页面在各阶段的耗时，并汇总为分位数统计
+"""
+
+import csv
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Iterator
+
+
+class TimingSpans:
+    """单个页面的分阶段耗时记录"""
+
+    # 阶段名称，按流程顺序排列
+    STAGES = [
+        'cache_lookup', 'browser_launch', 'tab_wait', 'navigation', 'spa_wait', 'js_interactions',
+        'html_cleanup', 'prompt_build', 'llm_call', 'file_write'
+    ]
+
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        """
+        累加阶段耗时
+
+        Args:
+            name: 阶段名称
+            seconds: 耗时秒数
+        """
+        if seconds < 0:
+            seconds = 0.0
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        记录代码块耗时
+
+        Args:
+            name: 阶段名称
+        """
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - started_at)
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        导出耗时记录
+
+        Returns:
+            Dict: 阶段名称 -> 耗时秒数
+        """
+        return {name: round(seconds, 3) for name, seconds in self.spans.items()}
+
+
+class TimingAggregator:
+    """多个页面的阶段耗时汇总"""
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+
+    def add(self, label: str, timings: Dict[str, float]) -> None:
+        """
+        添加一个页面的耗时记录
+
+        Args:
+            label: 页面标识（如模块名）
+            timings: 阶段名称 -> 耗时秒数
+        """
+        if timings:
+            self.rows.append({'label': label, 'timings': dict(timings)})
+
+    @staticmethod
+    def _percentile(values: List[float], ratio: float) -> float:
+        """按最近排名法计算分位数（values需已排序）"""
+        return values[min(len(values) - 1, int(len(values) * ratio))]
+
+    def _ordered_stages(self) -> List[str]:
+        """按流程顺序列出出现过的阶段"""
+        seen = {name for row in self.rows for name in row['timings']}
+        stages = [name for name in TimingSpans.STAGES if name in seen]
+        stages.extend(sorted(seen - set(stages)))
+        return stages
+
+    def summarize(self) -> Dict[str, Dict[str, float]]:
+        """
+        汇总各阶段耗时
+
+        Returns:
+            Dict: 阶段名称 -> {count, total, p50, p95, max}
+        """
+        summary = {}
+        for stage in self._ordered_stages():
+            values = sorted(row['timings'][stage] for row in self.rows if stage in row['timings'])
+            summary[stage] = {
+                'count': len(values),
+                'total': round(sum(values), 2),
+                'p50': round(self._percentile(values, 0.5), 2),
+                'p95': round(self._percentile(values, 0.95), 2),
+                'max': round(values[-1], 2)
+            }
+        return summary
+
+    def export(self, export_path: Path, extra: Dict[str, Any] = None) -> Path:
+        """
+        导出耗时数据，按扩展名选择格式：.csv为逐页面明细，其余为包含汇总与明细的JSON
+
+        Args:
+            export_path: 导出文件路径
+            extra: JSON格式下附加的运行级信息（如吞吐量）
+
+        Returns:
+            Path: 导出文件路径
+        """
+        export_path = Path(export_path)
+        export_path.parent.mkdir(parents=True, exist_ok=True)
+        stages = self._ordered_stages()
+
+        if export_path.suffix.lower() == '.csv':
+            with open(export_path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['label'] + stages)
+                for row in self.rows:
+                    writer.writerow([row['label']] + [row['timings'].get(stage, '') for stage in stages])
+        else:
+            export_path.write_text(json.dumps({
+                **(extra or {}),
+                'summary': self.summarize(),
+                'pages': self.rows
+            }, ensure_ascii=False, indent=2), encoding='utf-8')
+
+        return export_path
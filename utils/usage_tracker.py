@@ -0,0 +1,118 @@
+"""
+用量统计模块
+记录每次大模型调用的token用量与耗时，用于运行汇总
+"""
+
+import threading
+from typing import Dict, Any, List
+
+
+class UsageTracker:
+    """大模型调用用量统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.failed_requests = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0  # 输入token中命中上下文缓存的部分
+        self.rate_limit_wait = 0.0
+        self.latencies: List[float] = []
+        self.ttfts: List[float] = []  # 流式调用的首token耗时
+        self.batch_requests = 0  # 通过批处理任务完成的请求数
+        self._lock = threading.Lock()
+
+    def record(self, prompt_tokens: int, output_tokens: int, latency: float, cached_tokens: int = 0) -> None:
+        """
+        记录一次成功调用
+
+        Args:
+            prompt_tokens: 输入token数
+            output_tokens: 输出token数（含思考token）
+            latency: 调用耗时（秒）
+            cached_tokens: 输入token中命中上下文缓存的token数
+        """
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+            self.cached_tokens += cached_tokens
+            self.latencies.append(latency)
+
+    def record_batch(self, prompt_tokens: int, output_tokens: int) -> None:
+        """
+        记录一个批处理请求的用量（批处理没有单次调用耗时）
+
+        Args:
+            prompt_tokens: 输入token数
+            output_tokens: 输出token数（含思考token）
+        """
+        with self._lock:
+            self.batch_requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+
+    def record_failure(self, latency: float) -> None:
+        """
+        记录一次失败调用
+
+        Args:
+            latency: 调用耗时（秒）
+        """
+        with self._lock:
+            self.failed_requests += 1
+            self.latencies.append(latency)
+
+    def record_ttft(self, seconds: float) -> None:
+        """
+        记录一次流式调用的首token耗时
+
+        Args:
+            seconds: 从发出请求到收到首个内容块的秒数
+        """
+        with self._lock:
+            self.ttfts.append(seconds)
+
+    def record_wait(self, seconds: float) -> None:
+        """
+        记录因客户端限流而等待的时间
+
+        Args:
+            seconds: 等待秒数
+        """
+        with self._lock:
+            self.rate_limit_wait += seconds
+
+    def get_summary(self) -> Dict[str, Any]:
+        """
+        获取用量汇总
+
+        Returns:
+            Dict: 请求数、token用量、耗时分位数、限流等待时间与流式调用的首token耗时分位数
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            ttfts = sorted(self.ttfts)
+
+        def percentile(ratio: float, values: List[float] = latencies) -> float:
+            if not values:
+                return 0.0
+            return round(values[min(len(values) - 1, int(len(values) * ratio))], 2)
+
+        return {
+            'requests': self.requests,
+            'failed_requests': self.failed_requests,
+            'prompt_tokens': self.prompt_tokens,
+            'output_tokens': self.output_tokens,
+            'cached_tokens': self.cached_tokens,
+            'total_tokens': self.prompt_tokens + self.output_tokens,
+            'latency_avg': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_max': round(latencies[-1], 2) if latencies else 0.0,
+            'rate_limit_wait': round(self.rate_limit_wait, 2),
+            'batch_requests': self.batch_requests,
+            'streamed_requests': len(ttfts),
+            'ttft_p50': percentile(0.5, ttfts),
+            'ttft_p95': percentile(0.95, ttfts)
+        }